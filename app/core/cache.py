@@ -0,0 +1,125 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class ResultCache:
+    """Size-bounded LRU cache with a per-entry TTL.
+
+    Concurrent misses for the same key share one computation: the first caller
+    starts it as a task and later callers await that task instead of starting
+    their own. A later caller waits at most ``wait_seconds`` and takes the
+    shared value only if ``reusable`` accepts it; otherwise it computes its own
+    (counted in ``fallbacks``). ``set_version`` drops every entry when the index
+    version moves.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version = None
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.fallbacks = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool] | None = None,
+        wait_seconds: float | None = None,
+        reusable: Callable[[Any], bool] | None = None,
+    ):
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.create_task(self._compute(key, compute, cacheable))
+            self._inflight[key] = task
+            # shield: a caller that disconnects must not cancel the shared run.
+            return await asyncio.shield(task)
+
+        self.coalesced += 1
+        try:
+            value = await asyncio.wait_for(asyncio.shield(task), wait_seconds)
+            if reusable is None or reusable(value):
+                return value
+        except asyncio.TimeoutError:
+            pass
+        self.fallbacks += 1
+        value = await compute()
+        if cacheable is None or cacheable(value):
+            self.put(key, value)
+        return value
+
+    async def _compute(self, key: Hashable, compute, cacheable):
+        try:
+            value = await compute()
+            if cacheable is None or cacheable(value):
+                self.put(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def set_version(self, version):
+        if version == self.version:
+            return
+        if self.version is not None:
+            self.clear()
+        self.version = version
+
+    def clear(self):
+        self._entries.clear()
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "fallbacks": self.fallbacks,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "hit_rate": round((self.hits + self.coalesced - self.fallbacks) / lookups, 4) if lookups else 0.0,
+        }
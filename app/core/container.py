@@ -0,0 +1,101 @@
+import asyncio
+import importlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict
+
+
+class Container:
+    """Lazily built network clients and models.
+
+    Each dependency is registered with the module it needs and a factory; the
+    module is imported and the object built on first ``get`` (or during
+    ``warm_up``), and both steps are timed so cold-start cost is visible per
+    dependency instead of being hidden in ``import app.main``.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, tuple[str, Callable[[Any], Any]]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._timings: Dict[str, dict] = {}
+        self._errors: Dict[str, str] = {}
+        self.warm_up_started = False
+        self.warm_up_finished = False
+
+    def register(self, name: str, module: str, factory: Callable[[Any], Any]):
+        self._factories[name] = (module, factory)
+        self._locks.setdefault(name, threading.Lock())
+
+    def override(self, name: str, instance: Any):
+        self._instances[name] = instance
+
+    def get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._locks[name]:
+            if name not in self._instances:
+                self._instances[name] = self._build(name)
+                self._errors.pop(name, None)
+        return self._instances[name]
+
+    async def aget(self, name: str) -> Any:
+        """``get`` for async code: a dependency that is not built yet is
+        imported and built (or its warm-up build waited for) in a worker
+        thread, so the event loop keeps serving other requests."""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        return await asyncio.to_thread(self.get, name)
+
+    async def prepare(self, *names: str):
+        """Build ``names`` off the event loop before sync code uses them on it.
+
+        Build errors are not raised here; the sync ``get`` at the call site
+        retries and handles them as it would without ``prepare``.
+        """
+        missing = [name for name in names if self._instances.get(name) is None]
+        if missing:
+            await asyncio.gather(*(self.aget(name) for name in missing), return_exceptions=True)
+
+    def _build(self, name: str) -> Any:
+        module_name, factory = self._factories[name]
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        imported = time.perf_counter()
+        instance = factory(module)
+        built = time.perf_counter()
+        self._timings[name] = {
+            "module": module_name,
+            "import_ms": round((imported - start) * 1000, 1),
+            "build_ms": round((built - imported) * 1000, 1),
+        }
+        return instance
+
+    def warm_up(self):
+        self.warm_up_started = True
+        for name in self._factories:
+            try:
+                self.get(name)
+            except Exception as e:
+                logging.exception("Failed to initialize %s", name)
+                self._errors[name] = repr(e)
+        self.warm_up_finished = True
+
+    def is_ready(self) -> bool:
+        return self.warm_up_finished and all(name in self._instances for name in self._factories)
+
+    def report(self) -> dict:
+        return {
+            name: {
+                "loaded": name in self._instances,
+                **self._timings.get(name, {"module": module}),
+                **({"error": self._errors[name]} if name in self._errors else {}),
+            }
+            for name, (module, _) in self._factories.items()
+        }
+
+
+container = Container()
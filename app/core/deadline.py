@@ -0,0 +1,76 @@
+import asyncio
+import inspect
+import math
+import os
+import time
+from typing import Any, Awaitable, List
+
+from app.core.metrics import registry
+
+REQUEST_BUDGET_MS = float(os.getenv("REQUEST_BUDGET_MS", "15000"))
+# Share of the budget kept back for the stages that still have to run after
+# each step, so a tight budget shrinks every stage instead of starving the last.
+ENRICH_RESERVE = float(os.getenv("ENRICH_RESERVE", "0.35"))
+RETRIEVAL_RESERVE = float(os.getenv("RETRIEVAL_RESERVE", "0.25"))
+SELECT_RESERVE = float(os.getenv("SELECT_RESERVE", "0.02"))
+# Once less than this share of the budget is left only the top
+# DEGRADED_RERANK_DEPTH candidates are sent to the reranker.
+RERANK_FULL_DEPTH = float(os.getenv("RERANK_FULL_DEPTH", "0.2"))
+DEGRADED_RERANK_DEPTH = int(os.getenv("DEGRADED_RERANK_DEPTH", "20"))
+# A request that joins an identical one already in flight waits for it only
+# until this share of its own budget is left, then runs the pipeline itself.
+COALESCE_RESERVE = float(os.getenv("COALESCE_RESERVE", "0.5"))
+
+DEGRADED_STAGES = registry.counter(
+    "pipeline_degraded_total", "Stages skipped or cut short to stay within the request budget.")
+
+
+class Deadline:
+    """Latency budget for one request.
+
+    ``run`` awaits a stage with whatever budget is left after keeping a
+    ``reserve`` share of the budget back for the stages that follow; if that runs out the stage
+    is cancelled, recorded in ``degraded`` and its ``default`` returned, so the
+    pipeline can carry on with what it already has.
+    """
+
+    def __init__(self, budget_ms: float | None):
+        self.budget_ms = budget_ms
+        self.expires_at = math.inf if budget_ms is None else time.perf_counter() + budget_ms / 1000
+        self.degraded: List[str] = []
+
+    def remaining_ms(self) -> float:
+        return (self.expires_at - time.perf_counter()) * 1000
+
+    def remaining_share(self) -> float:
+        if self.budget_ms is None:
+            return 1.0
+        return max(self.remaining_ms(), 0.0) / self.budget_ms
+
+    def timeout_seconds(self, reserve: float = 0.0) -> float | None:
+        """Time left after keeping ``reserve`` of the budget back; None without a budget."""
+        timeout_ms = self.remaining_ms() - reserve * (self.budget_ms or 0.0)
+        return None if math.isinf(timeout_ms) else max(timeout_ms, 0.0) / 1000
+
+    def degrade(self, stage: str):
+        if stage not in self.degraded:
+            self.degraded.append(stage)
+        DEGRADED_STAGES.inc(stage=stage)
+
+    async def run(self, stage: str, awaitable: Awaitable, reserve: float = 0.0, default: Any = None):
+        timeout = self.timeout_seconds(reserve)
+        if timeout == 0:
+            # A task that already finished costs nothing to use.
+            if isinstance(awaitable, asyncio.Future) and awaitable.done():
+                return awaitable.result()
+            if inspect.iscoroutine(awaitable):
+                awaitable.close()
+            elif isinstance(awaitable, asyncio.Future):
+                awaitable.cancel()
+            self.degrade(stage)
+            return default
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError:
+            self.degrade(stage)
+            return default
@@ -1,14 +1,61 @@
 import os
-from typing import Dict
-import google.genai as genai
+from typing import Dict, Optional
 from dotenv import load_dotenv
+from app.core.container import container
+from app.core.metrics import LLM_TOKENS, track_external
+from app.core.rate_limit import rate_limited
 load_dotenv()
 
-client = genai.Client(api_key=os.getenv("GOOGLE_GENAI_API_KEY"))
+LLM_MODEL = os.getenv("LLM_MODEL", 'gemma-3-27b-it')
+# "auto" uses the SDK's JSON mode with a response schema where the model
+# supports it; Gemma models reject response_mime_type, so they get the schema
+# spelled out in the prompt instead.
+LLM_STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "auto").lower()
 
-def call_llm(query:str)->str:
-    response = client.models.generate_content(
-        model='gemma-3-27b-it',
-        contents = query
+container.register("genai", "google.genai", lambda genai: genai.Client(api_key=os.getenv("GOOGLE_GENAI_API_KEY")))
+
+
+def structured_output_enabled() -> bool:
+    if LLM_STRUCTURED_OUTPUT == "auto":
+        return not LLM_MODEL.startswith("gemma")
+    return LLM_STRUCTURED_OUTPUT in ("1", "true", "yes")
+
+
+def _config(schema):
+    if schema is None or not structured_output_enabled():
+        return None
+    from google.genai import types
+    return types.GenerateContentConfig(response_mime_type="application/json", response_schema=schema)
+
+
+def _record_usage(response):
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    LLM_TOKENS.inc(usage.prompt_token_count or 0, model=LLM_MODEL, kind="prompt")
+    LLM_TOKENS.inc(usage.candidates_token_count or 0, model=LLM_MODEL, kind="output")
+
+
+@rate_limited("gemini")
+@track_external("gemini", "generate_content")
+def call_llm(query:str, schema:Optional[type]=None)->str:
+    response = container.get("genai").models.generate_content(
+        model=LLM_MODEL,
+        contents = query,
+        config=_config(schema),
+    )
+    _record_usage(response)
+    return response.text
+
+
+@rate_limited("gemini")
+@track_external("gemini", "generate_content")
+async def call_llm_async(query:str, schema:Optional[type]=None)->str:
+    client = await container.aget("genai")
+    response = await client.aio.models.generate_content(
+        model=LLM_MODEL,
+        contents = query,
+        config=_config(schema),
     )
+    _record_usage(response)
     return response.text
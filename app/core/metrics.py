@@ -0,0 +1,181 @@
+import asyncio
+import bisect
+import functools
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 5, 10, 20, 40, 60, 100, 200)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: LabelKey, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0.0)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(key)} {_format_value(value)}"
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        # per label set: [count per bucket (+Inf last), sum, count]
+        self._values: Dict[LabelKey, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][idx] += 1
+            state[1] += value
+            state[2] += 1
+
+    def totals(self, **labels) -> Tuple[float, int]:
+        """(sum, count) of the observations with these labels."""
+        state = self._values.get(tuple(sorted(labels.items())))
+        return (state[1], state[2]) if state else (0.0, 0)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for key, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                le_label = f'le="{le}"'
+                yield f"{self.name}_bucket{_format_labels(key, le_label)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(key)} {count}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def counter(self, name: str, help: str) -> Counter:
+        metric = Counter(name, help)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[str]]):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram(
+    "pipeline_stage_seconds", "Wall time spent in each recommendation pipeline stage.")
+MARK_SECONDS = registry.histogram(
+    "pipeline_mark_seconds", "Time from request start to a pipeline milestone (e.g. first_result).")
+STAGE_CANDIDATES = registry.histogram(
+    "pipeline_stage_candidates", "Number of candidates leaving each pipeline stage.", COUNT_BUCKETS)
+EXTERNAL_CALL_SECONDS = registry.histogram(
+    "external_call_seconds", "Latency of calls to external providers.")
+EXTERNAL_CALLS = registry.counter(
+    "external_calls_total", "Calls made to external providers.")
+EXTERNAL_CALL_ERRORS = registry.counter(
+    "external_call_errors_total", "Calls to external providers that raised.")
+EXTERNAL_CALLS_CANCELLED = registry.counter(
+    "external_calls_cancelled_total", "Calls to external providers cancelled before they finished, e.g. by a request deadline.")
+ENRICHMENT_FALLBACKS = registry.counter(
+    "llm_enrichment_fallbacks_total",
+    "LLM enrichments that failed and fell back to the parsed intent, by reason (call or parse).")
+ENRICHMENT_SOURCES = registry.counter(
+    "intent_enrichment_source_total", "Where each intent enrichment came from: cache, local model, llm or fallback.")
+LLM_TOKENS = registry.counter(
+    "llm_tokens_total", "Tokens billed by the LLM provider, by model and kind (prompt or output).")
+
+
+def observe_candidates(stage: str, candidates) -> None:
+    STAGE_CANDIDATES.observe(len(candidates), stage=stage)
+
+
+def track_external(provider: str, operation: str):
+    """Count calls, errors and latency of a function that talks to a provider."""
+
+    def decorate(fn):
+        def record(start: float, failed: bool):
+            EXTERNAL_CALLS.inc(provider=provider, operation=operation)
+            EXTERNAL_CALL_SECONDS.observe(time.perf_counter() - start, provider=provider, operation=operation)
+            if failed:
+                EXTERNAL_CALL_ERRORS.inc(provider=provider, operation=operation)
+
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    result = await fn(*args, **kwargs)
+                except asyncio.CancelledError:
+                    # Cut off by our own deadline, not a provider failure.
+                    EXTERNAL_CALLS_CANCELLED.inc(provider=provider, operation=operation)
+                    raise
+                except Exception:
+                    record(start, True)
+                    raise
+                record(start, False)
+                return result
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception:
+                record(start, True)
+                raise
+            record(start, False)
+            return result
+        return wrapper
+
+    return decorate
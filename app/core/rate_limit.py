@@ -0,0 +1,206 @@
+import asyncio
+import functools
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from app.core.metrics import registry
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Published free/trial-tier quotas; raise them through the environment on
+# paid keys. A rate of 0 turns the token bucket off for that provider.
+DEFAULT_LIMITS = {
+    "gemini": {"rpm": 30, "burst": 5, "max_concurrency": 8},
+    "zeroentropy": {"rpm": 60, "burst": 10, "max_concurrency": 8},
+    "cohere": {"rpm": 10, "burst": 2, "max_concurrency": 4},
+    # Local ONNX cross-encoder: no quota, only CPU-bound inferences at once.
+    "cross_encoder": {"rpm": 0, "burst": 1, "max_concurrency": 2},
+}
+
+RATE_LIMIT_QUEUE_SECONDS = registry.histogram(
+    "rate_limit_queue_seconds", "Time a provider call waited for a rate-limit token and a concurrency slot.")
+RATE_LIMIT_RETRIES = registry.counter(
+    "rate_limit_retries_total", "Provider calls retried after a 429/5xx response, by status.")
+
+
+@dataclass
+class ProviderLimits:
+    rpm: float
+    burst: int
+    max_concurrency: int
+    max_retries: int = 3
+    backoff_base_seconds: float = 1.0
+    backoff_max_seconds: float = 30.0
+
+    @classmethod
+    def from_env(cls, provider: str) -> "ProviderLimits":
+        defaults = DEFAULT_LIMITS.get(provider, {"rpm": 0, "burst": 1, "max_concurrency": 8})
+        prefix = f"{provider.upper()}_"
+        return cls(
+            rpm=float(os.getenv(prefix + "RPM", defaults["rpm"])),
+            burst=int(os.getenv(prefix + "BURST", defaults["burst"])),
+            max_concurrency=int(os.getenv(prefix + "MAX_CONCURRENCY", defaults["max_concurrency"])),
+            max_retries=int(os.getenv(prefix + "MAX_RETRIES", "3")),
+            backoff_base_seconds=float(os.getenv(prefix + "BACKOFF_BASE_SECONDS", "1.0")),
+            backoff_max_seconds=float(os.getenv(prefix + "BACKOFF_MAX_SECONDS", "30.0")),
+        )
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by the sync and async call paths.
+
+    ``reserve`` takes a token immediately, letting the balance go negative, and
+    returns how long the caller has to wait before using it, so waiters queue
+    up in arrival order without polling.
+    """
+
+    def __init__(self, rate_per_second: float, burst: int):
+        self.rate = rate_per_second
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class ProviderLimiter:
+    def __init__(self, provider: str, limits: ProviderLimits):
+        self.provider = provider
+        self.limits = limits
+        self.bucket = TokenBucket(limits.rpm / 60.0, limits.burst)
+        # One cap for the sync and async paths together. Async callers wait
+        # for a slot on a single thread of their own, queueing behind it
+        # rather than tying up the default executor.
+        self._slots = threading.BoundedSemaphore(limits.max_concurrency)
+        self._acquirer = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{provider}-slots")
+
+    async def _acquire_async(self):
+        if self._slots.acquire(blocking=False):
+            return
+        acquired = self._acquirer.submit(self._slots.acquire)
+        try:
+            await asyncio.wrap_future(acquired)
+        except asyncio.CancelledError:
+            # A wait already under way still takes the slot; give it back.
+            if not acquired.cancel():
+                acquired.add_done_callback(lambda _: self._slots.release())
+            raise
+
+    def backoff(self, attempt: int, exc: BaseException) -> float:
+        retry_after = retry_after_seconds(exc)
+        if retry_after is not None:
+            return min(retry_after, self.limits.backoff_max_seconds)
+        ceiling = min(self.limits.backoff_max_seconds, self.limits.backoff_base_seconds * 2 ** attempt)
+        return random.uniform(0, ceiling)
+
+    def should_retry(self, attempt: int, exc: BaseException) -> bool:
+        status = status_code(exc)
+        if status not in RETRYABLE_STATUS or attempt >= self.limits.max_retries:
+            return False
+        RATE_LIMIT_RETRIES.inc(provider=self.provider, status=str(status))
+        return True
+
+    def call(self, fn, *args, **kwargs):
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            time.sleep(self.bucket.reserve())
+            with self._slots:
+                RATE_LIMIT_QUEUE_SECONDS.observe(time.perf_counter() - start, provider=self.provider)
+                try:
+                    return fn(*args, **kwargs)
+                except Exception as exc:
+                    if not self.should_retry(attempt, exc):
+                        raise
+                    delay = self.backoff(attempt, exc)
+            time.sleep(delay)
+            attempt += 1
+
+    async def call_async(self, fn, *args, **kwargs):
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.bucket.reserve())
+            await self._acquire_async()
+            try:
+                RATE_LIMIT_QUEUE_SECONDS.observe(time.perf_counter() - start, provider=self.provider)
+                try:
+                    return await fn(*args, **kwargs)
+                except Exception as exc:
+                    if not self.should_retry(attempt, exc):
+                        raise
+                    delay = self.backoff(attempt, exc)
+            finally:
+                self._slots.release()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+def status_code(exc: BaseException) -> Optional[int]:
+    # google-genai errors carry ``code``; the zeroentropy/cohere SDKs carry
+    # ``status_code``, and httpx errors hang it off the response.
+    for attr in ("status_code", "code", "status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+_limiters: Dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = _limiters[provider] = ProviderLimiter(provider, ProviderLimits.from_env(provider))
+        return limiter
+
+
+def rate_limited(provider: str):
+    """Pace calls to ``provider`` and retry them on 429/5xx with jittered backoff.
+
+    Apply it outside ``track_external`` so each attempt is counted on its own
+    and queueing time is not reported as provider latency.
+    """
+
+    def decorate(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                return await get_limiter(provider).call_async(fn, *args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return get_limiter(provider).call(fn, *args, **kwargs)
+        return wrapper
+
+    return decorate
@@ -0,0 +1,51 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+from app.core.metrics import MARK_SECONDS, STAGE_SECONDS
+
+
+class StageTimer:
+    """Records when each pipeline stage started and finished, relative to the
+    start of the request, so overlapping stages show up as overlapping spans.
+    Every finished stage is also observed into the /metrics histograms."""
+
+    def __init__(self, pipeline: str = "single"):
+        self.pipeline = pipeline
+        self.origin = time.perf_counter()
+        self.spans: Dict[str, Tuple[float, float]] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.spans[name] = (start - self.origin, end - self.origin)
+            STAGE_SECONDS.observe(end - start, stage=name, pipeline=self.pipeline)
+
+    def mark(self, name: str):
+        now = time.perf_counter() - self.origin
+        self.spans[name] = (now, now)
+        MARK_SECONDS.observe(now, mark=name, pipeline=self.pipeline)
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.origin) * 1000, 2)
+
+    def report(self) -> dict:
+        stages = {
+            name: {
+                "start_ms": round(start * 1000, 2),
+                "end_ms": round(end * 1000, 2),
+                "duration_ms": round((end - start) * 1000, 2),
+            }
+            for name, (start, end) in sorted(self.spans.items(), key=lambda kv: kv[1][0])
+        }
+        wall = max((end for _, end in self.spans.values()), default=0.0)
+        serial = sum(end - start for start, end in self.spans.values())
+        return {
+            "stages": stages,
+            "wall_ms": round(wall * 1000, 2),
+            "serial_ms": round(serial * 1000, 2),
+        }
@@ -1,16 +1,81 @@
+import asyncio
+import json
+import logging
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
 
-from scripts.full_pipeline import run_pipeline
+from app.core.cache import ResultCache, normalize_query
+from app.core.container import container
+from app.core.deadline import COALESCE_RESERVE, REQUEST_BUDGET_MS, Deadline
+from app.core.metrics import registry
+from app.core.timing import StageTimer
+from app.retrieval.embedding_cache import embedding_cache
+from app.retrieval.qdrant_search import get_index_version_async
+from scripts.full_pipeline import run_pipeline_async, run_pipeline_batch_async, stream_pipeline_async
 
-app = FastAPI(title="SHL Recommender API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so /health answers immediately; /ready flips
+    # once every client and model has been built.
+    warm_up = asyncio.create_task(asyncio.to_thread(container.warm_up))
+    yield
+    warm_up.cancel()
+
+
+app = FastAPI(title="SHL Recommender API", lifespan=lifespan)
+
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+
+result_cache = ResultCache(
+    max_entries=int(os.getenv("RESULT_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.getenv("RESULT_CACHE_TTL_SECONDS", "3600")),
+)
+
+
+def result_cache_metrics():
+    stats = result_cache.stats()
+    yield "# HELP result_cache_events_total /recommend result cache lookups and evictions by outcome."
+    yield "# TYPE result_cache_events_total counter"
+    for event in ("hits", "misses", "coalesced", "fallbacks", "evictions", "expirations", "invalidations"):
+        yield f'result_cache_events_total{{event="{event}"}} {stats[event]}'
+    yield "# HELP result_cache_entries Entries currently held by the /recommend result cache."
+    yield "# TYPE result_cache_entries gauge"
+    yield f"result_cache_entries {stats['entries']}"
+
+
+def embedding_cache_metrics():
+    stats = embedding_cache.stats()
+    yield "# HELP embedding_cache_events_total Query embedding cache lookups and evictions by outcome."
+    yield "# TYPE embedding_cache_events_total counter"
+    for event in ("hits", "disk_hits", "misses", "evictions"):
+        yield f'embedding_cache_events_total{{event="{event}"}} {stats[event]}'
+    yield "# HELP embedding_cache_bytes Bytes of embeddings held in memory by the query embedding cache."
+    yield "# TYPE embedding_cache_bytes gauge"
+    yield f"embedding_cache_bytes {stats['bytes']}"
+
+
+registry.register_collector(result_cache_metrics)
+registry.register_collector(embedding_cache_metrics)
 
 
 class RecommendRequest(BaseModel):
     query: str
-    top_k: Optional[int] = 50
-    final_k: Optional[int] = 10
+    top_k: int = Field(50, ge=1)
+    final_k: int = Field(10, ge=1)
+    include_timings: Optional[bool] = False
+    budget_ms: Optional[int] = None
+
+
+class BatchRecommendRequest(BaseModel):
+    queries: List[str]
+    top_k: int = Field(50, ge=1)
+    final_k: int = Field(10, ge=1)
+    budget_ms: Optional[int] = None
 
 
 class Assessment(BaseModel):
@@ -25,6 +90,14 @@ class Assessment(BaseModel):
 
 class ResponseWrapper(BaseModel):
     recommended_assessments: List[Assessment]
+    degraded_stages: List[str] = []
+    timings: Optional[Dict[str, Any]] = None
+
+
+class BatchResponseWrapper(BaseModel):
+    results: List[ResponseWrapper]
+    degraded_stages: List[str] = []
+    timings: Dict[str, Any]
 
 
 @app.get("/health")
@@ -32,29 +105,124 @@ def health():
     return {"status": "healthy"}
 
 
+def to_assessment(c: dict) -> dict:
+    adaptive_val = c.get("adaptive_testing") or c.get("adaptive_support") or "No"
+    remote_val = c.get("remote_testing") or c.get("remote_support") or "No"
+
+    return {
+        "url": c.get("url"),
+        "name": c.get("name"),
+        "adaptive_support": adaptive_val,
+        "description": c.get("description"),
+        "duration": c.get("duration") or c.get("assessment_duration"),
+        "remote_support": remote_val,
+        "test_type": c.get("test_type")
+    }
+
+
+@app.get("/ready")
+def ready():
+    body = {
+        "status": "ready" if container.is_ready() else "starting",
+        "dependencies": container.report(),
+    }
+    return JSONResponse(body, status_code=200 if container.is_ready() else 503)
+
+
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    return {**result_cache.stats(), "embeddings": embedding_cache.stats()}
+
+
 @app.post("/recommend", response_model=ResponseWrapper)
-def recommend(req: RecommendRequest):
+async def recommend(req: RecommendRequest):
     if not req.query:
         raise HTTPException(status_code=400, detail="query is required")
     
-    results = run_pipeline(req.query, top_k=req.top_k, final_k=req.final_k)
-
-    out = []
-    for c in results:
-        adaptive_val = c.get("adaptive_testing") or c.get("adaptive_support") or "No"
-        remote_val = c.get("remote_testing") or c.get("remote_support") or "No"
-
-        out.append({
-            "url": c.get("url"),
-            "name": c.get("name"),
-            "adaptive_support": adaptive_val,
-            "description": c.get("description"),
-            "duration": c.get("duration") or c.get("assessment_duration"),
-            "remote_support": remote_val,
-            "test_type": c.get("test_type")
-        })
-
-    return {"recommended_assessments": out}
+    timer = StageTimer()
+    deadline = Deadline(req.budget_ms or REQUEST_BUDGET_MS)
+    ran_pipeline = False
+
+    async def compute():
+        nonlocal ran_pipeline
+        ran_pipeline = True
+        results = await run_pipeline_async(
+            req.query, top_k=req.top_k, final_k=req.final_k, timer=timer, deadline=deadline)
+        return {"results": results, "degraded_stages": list(deadline.degraded), "budget_ms": deadline.budget_ms}
+
+    result_cache.set_version(await get_index_version_async())
+    key = (normalize_query(req.query), req.top_k, req.final_k, result_cache.version)
+    # A degraded answer is only good enough for this request; the next one
+    # gets a fresh chance at the full pipeline. A request joining an identical
+    # one in flight waits within its own budget, and does not take a result
+    # degraded under a tighter budget than its own.
+    outcome = await result_cache.get_or_compute(
+        key, compute,
+        cacheable=lambda value: not value["degraded_stages"],
+        wait_seconds=deadline.timeout_seconds(COALESCE_RESERVE),
+        reusable=lambda value: not value["degraded_stages"] or value["budget_ms"] >= deadline.budget_ms,
+    )
+
+    response = {
+        "recommended_assessments": [to_assessment(c) for c in outcome["results"]],
+        "degraded_stages": outcome["degraded_stages"],
+    }
+    if req.include_timings:
+        response["timings"] = timer.report()
+        response["timings"]["cache"] = "miss" if ran_pipeline else "hit"
+    return response
+
+
+@app.post("/recommend/stream")
+async def recommend_stream(req: RecommendRequest):
+    if not req.query:
+        raise HTTPException(status_code=400, detail="query is required")
+
+    timer = StageTimer(pipeline="stream")
+    deadline = Deadline(req.budget_ms or REQUEST_BUDGET_MS)
+
+    async def events():
+        async for event, data in stream_pipeline_async(
+                req.query, top_k=req.top_k, final_k=req.final_k, timer=timer, deadline=deadline):
+            body = {"event": event, "elapsed_ms": timer.elapsed_ms()}
+            if event in ("intent", "enriched_intent"):
+                body["intent"] = data
+            else:
+                body["recommended_assessments"] = [to_assessment(c) for c in data]
+            if event == "final":
+                body["degraded_stages"] = deadline.degraded
+                body["timings"] = timer.report()
+            yield json.dumps(body) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@app.post("/recommend/batch", response_model=BatchResponseWrapper)
+async def recommend_batch(req: BatchRecommendRequest):
+    if not req.queries or not all(q.strip() for q in req.queries):
+        raise HTTPException(status_code=400, detail="queries must be a non-empty list of non-empty strings")
+
+    timer = StageTimer(pipeline="batch")
+    deadline = Deadline(req.budget_ms or REQUEST_BUDGET_MS)
+    batch_results = await run_pipeline_batch_async(
+        req.queries, top_k=req.top_k, final_k=req.final_k, timer=timer, deadline=deadline)
+
+    timings = timer.report()
+    timings["batch_size"] = len(req.queries)
+    timings["per_query_ms"] = round(timings["wall_ms"] / len(req.queries), 2)
+    return {
+        "results": [
+            {"recommended_assessments": [to_assessment(c) for c in results]}
+            for results in batch_results
+        ],
+        "degraded_stages": deadline.degraded,
+        "timings": timings,
+    }
 
 
 if __name__ == "__main__":
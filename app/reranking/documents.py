@@ -0,0 +1,13 @@
+def build_document(item:dict)->str:
+    parts = []
+
+    if item.get("name"):    
+        parts.append(f"Title: {item['name']}")
+
+    if item.get("description"):
+        parts.append(f"Description: {item['description']}")
+
+    if item.get("test_type"):
+        parts.append(f"Type: {', '.join(item['test_type'])}")
+
+    return "\n".join(parts)
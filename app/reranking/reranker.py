@@ -0,0 +1,28 @@
+import importlib
+import os
+from dotenv import load_dotenv
+load_dotenv()
+
+# RERANKER picks the backend the pipeline reranks with. Each backend is a
+# module with a sync and an async function taking (query, candidates) and
+# returning every candidate with "rerank_score" set, best first. Only the
+# chosen module is imported, so the other SDKs and models are never loaded
+# (or required by /ready).
+RERANKERS = {
+    "zerank": ("app.reranking.reranking_zerank", "zerank_rerank", "zerank_rerank_async"),
+    "cohere": ("app.reranking.reranking_cohere", "rerank_all", "rerank_all_async"),
+    "local": ("app.reranking.reranking_local", "local_rerank", "local_rerank_async"),
+}
+RERANKER = os.getenv("RERANKER", "zerank")
+
+
+def load_reranker(name: str):
+    """The (sync, async) rerank functions of backend ``name``."""
+    if name not in RERANKERS:
+        raise ValueError(f"Unknown reranker {name!r}, expected one of {', '.join(RERANKERS)}")
+    module, sync_name, async_name = RERANKERS[name]
+    backend = importlib.import_module(module)
+    return getattr(backend, sync_name), getattr(backend, async_name)
+
+
+rerank, rerank_async = load_reranker(RERANKER)
@@ -1,10 +1,13 @@
 import os
-import cohere 
 from dotenv import load_dotenv
+from app.core.container import container
+from app.core.metrics import track_external
+from app.core.rate_limit import rate_limited
 load_dotenv()
 
 COHERE_API_KEY = os.getenv("COHERE_API_KEY")
-co = cohere.Client(COHERE_API_KEY)
+container.register("cohere", "cohere", lambda m: m.Client(COHERE_API_KEY))
+container.register("cohere_async", "cohere", lambda m: m.AsyncClient(COHERE_API_KEY))
 
 def _format_candidate(candidate:dict)->str:
     parts = [
@@ -19,21 +22,50 @@ def _format_candidate(candidate:dict)->str:
 
     return "\n".join(parts)
 
+def _to_reranked(response, candidates: list[dict]) -> list[dict]:
+    reranked = []
+    for item in response.results:
+        candidate = candidates[item.index]
+        candidate = dict(candidate)
+        candidate["rerank_score"] = item.relevance_score
+        reranked.append(candidate)
+
+    return reranked
+
+@rate_limited("cohere")
+@track_external("cohere", "rerank")
 def rerank(query:str,candidates:list[dict], top_n:int=10 )->list[dict]:
     if not candidates:
         return []
     documents = [_format_candidate(c) for c in candidates] 
-    response = co.rerank(
+    response = container.get("cohere").rerank(
         model="rerank-english-v3.0",
         query=query,
         documents=documents,
         top_n=min(top_n, len(candidates)),
     )
-    reranked = []
-    for item in response.results:
-        candidate = candidates[item.index]
-        candidate = dict(candidate)
-        candidate["rerank_score"] = item.relevance_score
-        reranked.append(candidate)
+    return _to_reranked(response, candidates)
 
-    return reranked
+@rate_limited("cohere")
+@track_external("cohere", "rerank")
+async def rerank_async(query:str,candidates:list[dict], top_n:int=10 )->list[dict]:
+    if not candidates:
+        return []
+    documents = [_format_candidate(c) for c in candidates]
+    client = await container.aget("cohere_async")
+    response = await client.rerank(
+        model="rerank-english-v3.0",
+        query=query,
+        documents=documents,
+        top_n=min(top_n, len(candidates)),
+    )
+    return _to_reranked(response, candidates)
+
+
+# The pipeline selects from every reranked candidate, not just the top 10.
+def rerank_all(query:str, candidates:list[dict])->list[dict]:
+    return rerank(query, candidates, top_n=len(candidates))
+
+
+async def rerank_all_async(query:str, candidates:list[dict])->list[dict]:
+    return await rerank_async(query, candidates, top_n=len(candidates))
@@ -0,0 +1,53 @@
+import asyncio
+import math
+import os
+from typing import Dict, List
+from app.core.container import container
+from app.core.metrics import track_external
+from app.core.rate_limit import rate_limited
+from app.reranking.documents import build_document
+
+# ONNX cross-encoder on CPU through fastembed. The query and each document are
+# scored together in batches of CROSS_ENCODER_BATCH_SIZE pairs, truncated to
+# CROSS_ENCODER_MAX_LENGTH word pieces. CROSS_ENCODER_THREADS caps the
+# onnxruntime threads per inference (0: onnxruntime's default) and
+# CROSS_ENCODER_MAX_CONCURRENCY (app/core/rate_limit.py) the inferences at once.
+CROSS_ENCODER_MODEL = os.getenv("CROSS_ENCODER_MODEL", "Xenova/ms-marco-MiniLM-L-6-v2")
+CROSS_ENCODER_BATCH_SIZE = int(os.getenv("CROSS_ENCODER_BATCH_SIZE", "32"))
+CROSS_ENCODER_MAX_LENGTH = int(os.getenv("CROSS_ENCODER_MAX_LENGTH", "256"))
+CROSS_ENCODER_THREADS = int(os.getenv("CROSS_ENCODER_THREADS", "0")) or None
+
+
+def load_cross_encoder(m):
+    encoder = m.TextCrossEncoder(CROSS_ENCODER_MODEL, threads=CROSS_ENCODER_THREADS)
+    tokenizer = encoder.model.tokenizer
+    # fastembed truncates at the model's own limit; never go past it.
+    tokenizer.enable_truncation(max_length=min(CROSS_ENCODER_MAX_LENGTH, tokenizer.truncation["max_length"]))
+    return encoder
+
+
+container.register("cross_encoder", "fastembed.rerank.cross_encoder", load_cross_encoder)
+
+
+def _score(query:str, candidates: List[Dict])->List[Dict]:
+    if not candidates:
+        return []
+    scores = container.get("cross_encoder").rerank(
+        query, [build_document(c) for c in candidates], batch_size=CROSS_ENCODER_BATCH_SIZE)
+    for candidate, score in zip(candidates, scores):
+        # Logits squashed to 0-1 like the hosted rerankers' relevance scores,
+        # so select_assessments' bonuses keep their weight.
+        candidate["rerank_score"] = 1.0 / (1.0 + math.exp(-float(score)))
+    return sorted(candidates, key=lambda c: c["rerank_score"], reverse=True)
+
+
+@rate_limited("cross_encoder")
+@track_external("cross_encoder", "rerank")
+def local_rerank(query:str, candidates: List[Dict])->List[Dict]:
+    return _score(query, candidates)
+
+
+@rate_limited("cross_encoder")
+@track_external("cross_encoder", "rerank")
+async def local_rerank_async(query:str, candidates: List[Dict])->List[Dict]:
+    return await asyncio.to_thread(_score, query, candidates)
@@ -1,33 +1,17 @@
-from zeroentropy import ZeroEntropy
 from typing import List,Dict
 from dotenv import load_dotenv
+from app.core.container import container
+from app.core.metrics import track_external
+from app.core.rate_limit import rate_limited
+from app.reranking.documents import build_document
 import os
 load_dotenv()
 
 ZEROENTROPY_API_KEY = os.getenv("ZEROENTROPY_API_KEY")
-zclient = ZeroEntropy(api_key=ZEROENTROPY_API_KEY)
+container.register("zeroentropy", "zeroentropy", lambda m: m.ZeroEntropy(api_key=ZEROENTROPY_API_KEY))
+container.register("zeroentropy_async", "zeroentropy", lambda m: m.AsyncZeroEntropy(api_key=ZEROENTROPY_API_KEY))
 
-def build_document(item:dict)->str:
-    parts = []
-
-    if item.get("name"):    
-        parts.append(f"Title: {item['name']}")
-
-    if item.get("description"):
-        parts.append(f"Description: {item['description']}")
-
-    if item.get("test_type"):
-        parts.append(f"Type: {', '.join(item['test_type'])}")
-
-    return "\n".join(parts)
-
-def zerank_rerank(query:str, candidates: List[Dict])->List[Dict]:
-    documents = [build_document(c) for c in candidates]
-    response = zclient.models.rerank(
-        model = 'zerank-2',
-        query = query,
-        documents = documents
-    )
+def apply_scores(response, candidates: List[Dict]) -> List[Dict]:
     for result in response.results:
         idx = getattr(result, "index", None)
         try:
@@ -45,3 +29,26 @@ def zerank_rerank(query:str, candidates: List[Dict])->List[Dict]:
         key=lambda c: c.get('zerank_score', 0),
         reverse=True
     )
+
+@rate_limited("zeroentropy")
+@track_external("zeroentropy", "rerank")
+def zerank_rerank(query:str, candidates: List[Dict])->List[Dict]:
+    documents = [build_document(c) for c in candidates]
+    response = container.get("zeroentropy").models.rerank(
+        model = 'zerank-2',
+        query = query,
+        documents = documents
+    )
+    return apply_scores(response, candidates)
+
+@rate_limited("zeroentropy")
+@track_external("zeroentropy", "rerank")
+async def zerank_rerank_async(query:str, candidates: List[Dict])->List[Dict]:
+    documents = [build_document(c) for c in candidates]
+    client = await container.aget("zeroentropy_async")
+    response = await client.models.rerank(
+        model = 'zerank-2',
+        query = query,
+        documents = documents
+    )
+    return apply_scores(response, candidates)
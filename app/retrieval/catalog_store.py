@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+import uuid
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional
+
+CATALOG_PATH = os.getenv("CATALOG_PATH", "data/catalog_cleaned.json")
+
+
+def catalog_fingerprint(raw: bytes) -> str:
+    """Hash of the catalog file; the first part of every index version."""
+    return hashlib.sha256(raw).hexdigest()[:12]
+
+
+def point_id(item: dict) -> str:
+    """Stable Qdrant point id of a catalog item: a UUID derived from its URL."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, item["url"].strip()))
+
+
+def point_ids(items: List[dict]) -> list:
+    """The Qdrant point id of each catalog item, as upload_to_qdrant assigns them."""
+    ids = [point_id(item) for item in items]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Catalog has duplicate assessment URLs")
+    return ids
+
+
+def build_payload(item: dict) -> dict:
+    return {
+        "name": item.get("name"),
+        "url": item.get("url"),
+        "description": item.get("description"),
+        "assessment_duration": item.get("assessment_duration",0),
+        "test_type": item.get("test_type",[]),
+        # A list, so the keyword index matches single levels.
+        "job_levels": [l.strip() for l in (item.get("job_levels") or "").split(",") if l.strip()],
+        "remote_testing": item.get("remote_testing","Yes")
+    }
+
+
+def candidate_fields(payload: dict) -> dict:
+    """The candidate dict fields the pipeline reads, from a point payload."""
+    return {
+        "name": payload.get("name"),
+        "test_type": payload.get("test_type"),
+        "duration": payload.get("assessment_duration"),
+        "url": payload.get("url"),
+        "description": payload.get("description"),
+        "remote_testing": payload.get("remote_testing"),
+        "adaptive_testing": payload.get("adaptive_testing")
+    }
+
+
+class CatalogStore:
+    """Read-only candidate fields per point id, built from the catalog file.
+
+    Lets retrieval ask Qdrant for ids and scores only. ``serves(version)``
+    says whether the collection was built from this exact catalog file; when
+    it was not, callers must fetch payloads instead.
+    """
+
+    def __init__(self, fingerprint: str, candidates: Dict[object, Mapping]):
+        self.fingerprint = fingerprint
+        self._candidates = candidates
+
+    @classmethod
+    def load(cls, path: str = CATALOG_PATH) -> "CatalogStore":
+        with open(path, "rb") as f:
+            raw = f.read()
+        items = json.loads(raw)
+        # Full candidate templates, so hydration is one dict copy per point.
+        candidates = {
+            point_id: MappingProxyType({"id": point_id, "score": None, **candidate_fields(build_payload(item))})
+            for point_id, item in zip(point_ids(items), items)
+        }
+        return cls(catalog_fingerprint(raw), candidates)
+
+    def __len__(self):
+        return len(self._candidates)
+
+    def serves(self, index_version: str) -> bool:
+        return index_version.split("-", 1)[0] == self.fingerprint
+
+    def candidate(self, point_id, score: float) -> Optional[dict]:
+        template = self._candidates.get(point_id)
+        if template is None:
+            return None
+        candidate = template.copy()
+        candidate["score"] = score
+        return candidate
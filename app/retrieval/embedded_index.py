@@ -0,0 +1,386 @@
+"""In-process replacement for the hosted Qdrant collection.
+
+The catalog is a few hundred documents, so exact search over a NumPy matrix
+is far cheaper than a network round trip. ``EmbeddedIndex`` answers the
+``query_points`` / ``query_batch_points`` calls qdrant_search makes (dense and
+sparse legs, nested prefetches, RRF fusion, payload filters) with the same
+scoring Qdrant uses, from an artifact directory written by
+``scripts/upload_to_qdrant.py``:
+
+    dense.npy           float32 (n, dim), L2-normalized (Qdrant's cosine)
+    sparse_tokens.npy   sorted BM25 token ids with at least one posting
+    sparse_indptr.npy   postings of sparse_tokens[i] are [indptr[i], indptr[i+1])
+    sparse_docs.npy     row of each posting
+    sparse_values.npy   document weight of each posting
+    points.json         point ids and payloads, row-aligned with dense.npy
+    meta.json           collection metadata (index_version, models)
+    dense_int8.npy      optional scalar-quantized dense codes (see write_quantized)
+    dense_binary.npy    optional sign bits of dense.npy, packed 8 per byte
+
+The arrays are memory-mapped, so several workers share one copy.
+"""
+import json
+import math
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from qdrant_client.http.models import QueryResponse
+from qdrant_client.models import (
+    FieldCondition, Filter, HasIdCondition, IsEmptyCondition, IsNullCondition,
+    MatchAny, MatchExcept, MatchValue, Prefetch, RrfQuery, ScoredPoint, SearchParams, SparseVector,
+)
+
+DEFAULT_RRF_K = 60
+FILTER_CACHE_SIZE = 256
+QUANTIZATIONS = ("none", "scalar", "binary")
+# Share of dense values the int8 range covers, as Qdrant's ScalarQuantizationConfig.quantile.
+SCALAR_QUANTILE = 0.99
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+Ranked = List[Tuple[int, float]]
+
+
+def write_index(path: str, ids: Sequence, dense, sparse: Sequence, payloads: Sequence[dict], metadata: dict,
+                quantization: str = "none"):
+    """Write the artifact to ``path`` (replacing any previous one).
+
+    ``sparse`` holds one (indices, values) pair per document.
+    """
+    dense = np.asarray(dense, dtype=np.float32)
+    dense = dense / np.linalg.norm(dense, axis=1, keepdims=True).clip(min=1e-12)
+
+    tokens, docs, values = [], [], []
+    for row, (indices, weights) in enumerate(sparse):
+        tokens.extend(int(i) for i in indices)
+        docs.extend([row] * len(indices))
+        values.extend(float(v) for v in weights)
+    tokens = np.asarray(tokens, dtype=np.int64)
+    docs = np.asarray(docs, dtype=np.int32)
+    values = np.asarray(values, dtype=np.float32)
+    order = np.lexsort((docs, tokens))
+    tokens, docs, values = tokens[order], docs[order], values[order]
+    unique_tokens, starts = np.unique(tokens, return_index=True)
+    indptr = np.append(starts, len(tokens)).astype(np.int64)
+
+    tmp = f"{path}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, "dense.npy"), dense)
+    np.save(os.path.join(tmp, "sparse_tokens.npy"), unique_tokens)
+    np.save(os.path.join(tmp, "sparse_indptr.npy"), indptr)
+    np.save(os.path.join(tmp, "sparse_docs.npy"), docs)
+    np.save(os.path.join(tmp, "sparse_values.npy"), values)
+    with open(os.path.join(tmp, "points.json"), "w", encoding="utf-8") as f:
+        json.dump({"ids": list(ids), "payloads": list(payloads)}, f)
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(metadata, f)
+    write_quantized(tmp, quantization)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+
+
+def write_quantized(path: str, quantization: str):
+    """(Re)write the quantized dense codes of the artifact at ``path``.
+
+    ``scalar`` maps every value to int8 over the SCALAR_QUANTILE range,
+    ``binary`` keeps one sign bit per dimension; ``none`` removes the codes.
+    The float vectors stay in the artifact for rescoring.
+    """
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unknown quantization {quantization!r}")
+    with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+        metadata = json.load(f)
+    for name in ("dense_int8.npy", "dense_binary.npy"):
+        if os.path.exists(os.path.join(path, name)):
+            os.remove(os.path.join(path, name))
+    metadata.pop("quantization", None)
+
+    dense = np.load(os.path.join(path, "dense.npy"))
+    if quantization == "scalar":
+        lo, hi = np.quantile(dense, [(1 - SCALAR_QUANTILE) / 2, (1 + SCALAR_QUANTILE) / 2])
+        scale = float(hi - lo) / 255
+        codes = np.clip(np.rint((dense - lo) / scale) - 128, -128, 127).astype(np.int8)
+        np.save(os.path.join(path, "dense_int8.npy"), codes)
+        # value ~= offset + scale * code
+        metadata["quantization"] = {"type": "scalar", "scale": scale, "offset": float(lo) + 128 * scale}
+    elif quantization == "binary":
+        np.save(os.path.join(path, "dense_binary.npy"), np.packbits(dense > 0, axis=1))
+        metadata["quantization"] = {"type": "binary"}
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(metadata, f)
+
+
+def _values(payload: dict, key: str) -> list:
+    value = payload.get(key)
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _match_condition(condition, point_id, payload: dict) -> bool:
+    if isinstance(condition, Filter):
+        return _match_filter(condition, point_id, payload)
+    if isinstance(condition, HasIdCondition):
+        return point_id in condition.has_id
+    if isinstance(condition, IsEmptyCondition):
+        return not _values(payload, condition.is_empty.key)
+    if isinstance(condition, IsNullCondition):
+        return condition.is_null.key in payload and payload[condition.is_null.key] is None
+    if not isinstance(condition, FieldCondition):
+        raise ValueError(f"Unsupported filter condition: {type(condition).__name__}")
+
+    values = _values(payload, condition.key)
+    if condition.match is not None:
+        match = condition.match
+        if isinstance(match, MatchValue):
+            return match.value in values
+        if isinstance(match, MatchAny):
+            return any(v in match.any for v in values)
+        if isinstance(match, MatchExcept):
+            return bool(values) and not any(v in match.except_ for v in values)
+        raise ValueError(f"Unsupported match: {type(match).__name__}")
+    if condition.range is not None:
+        r = condition.range
+        return any(
+            isinstance(v, (int, float))
+            and (r.gt is None or v > r.gt) and (r.gte is None or v >= r.gte)
+            and (r.lt is None or v < r.lt) and (r.lte is None or v <= r.lte)
+            for v in values
+        )
+    raise ValueError(f"Unsupported field condition on {condition.key!r}")
+
+
+def _as_list(conditions) -> list:
+    if conditions is None:
+        return []
+    return conditions if isinstance(conditions, list) else [conditions]
+
+
+def _match_filter(f: Filter, point_id, payload: dict) -> bool:
+    if not all(_match_condition(c, point_id, payload) for c in _as_list(f.must)):
+        return False
+    should = _as_list(f.should)
+    if should and not any(_match_condition(c, point_id, payload) for c in should):
+        return False
+    return not any(_match_condition(c, point_id, payload) for c in _as_list(f.must_not))
+
+
+class EmbeddedIndex:
+    """Exact dense/sparse search with Qdrant's query semantics, in process.
+
+    Scores match Qdrant's: cosine on normalized vectors for ``dense``, the
+    sparse dot product (documents without a shared token are not returned)
+    for ``sparse``, and 1 / (k + rank) for RRF. A top-level filter also
+    applies to every prefetch, as it does in Qdrant. Exactly tied scores
+    (duplicate catalog entries) come back in id order; Qdrant leaves their
+    order unspecified.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.dense = np.load(os.path.join(path, "dense.npy"), mmap_mode="r")
+        self.sparse_tokens = np.load(os.path.join(path, "sparse_tokens.npy"), mmap_mode="r")
+        self.sparse_indptr = np.load(os.path.join(path, "sparse_indptr.npy"), mmap_mode="r")
+        self.sparse_docs = np.load(os.path.join(path, "sparse_docs.npy"), mmap_mode="r")
+        self.sparse_values = np.load(os.path.join(path, "sparse_values.npy"), mmap_mode="r")
+        with open(os.path.join(path, "points.json"), "r", encoding="utf-8") as f:
+            points = json.load(f)
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            self.metadata = json.load(f)
+        self.ids = points["ids"]
+        self.payloads = points["payloads"]
+        self.quantization = self.metadata.get("quantization", {"type": "none"})
+        self.codes = None
+        if self.quantization["type"] == "scalar":
+            self.codes = np.load(os.path.join(path, "dense_int8.npy"), mmap_mode="r")
+        elif self.quantization["type"] == "binary":
+            self.codes = np.load(os.path.join(path, "dense_binary.npy"), mmap_mode="r")
+        self._filter_masks: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _filter_mask(self, query_filter: Optional[Filter]) -> Optional[np.ndarray]:
+        if query_filter is None:
+            return None
+        key = query_filter.model_dump_json()
+        with self._lock:
+            mask = self._filter_masks.get(key)
+            if mask is not None:
+                self._filter_masks.move_to_end(key)
+                return mask
+        mask = np.fromiter(
+            (_match_filter(query_filter, i, p) for i, p in zip(self.ids, self.payloads)),
+            dtype=bool, count=len(self.ids),
+        )
+        with self._lock:
+            self._filter_masks[key] = mask
+            if len(self._filter_masks) > FILTER_CACHE_SIZE:
+                self._filter_masks.popitem(last=False)
+        return mask
+
+    def dense_scores(self, vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        return self.dense @ (vector / max(float(np.linalg.norm(vector)), 1e-12))
+
+    def sparse_scores(self, vector: SparseVector) -> np.ndarray:
+        scores = np.zeros(len(self.ids), dtype=np.float64)
+        touched = np.zeros(len(self.ids), dtype=bool)
+        positions = np.searchsorted(self.sparse_tokens, vector.indices)
+        for position, token, weight in zip(positions, vector.indices, vector.values):
+            if position >= len(self.sparse_tokens) or self.sparse_tokens[position] != token:
+                continue
+            start, end = self.sparse_indptr[position], self.sparse_indptr[position + 1]
+            rows = self.sparse_docs[start:end]
+            scores[rows] += float(weight) * self.sparse_values[start:end]
+            touched[rows] = True
+        return np.where(touched, scores, -np.inf).astype(np.float32)
+
+    def sparse_rows(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """(indices, values) per row, as passed to write_index."""
+        tokens = np.repeat(np.asarray(self.sparse_tokens), np.diff(self.sparse_indptr))
+        order = np.argsort(self.sparse_docs, kind="stable")
+        docs, tokens, values = self.sparse_docs[order], tokens[order], self.sparse_values[order]
+        bounds = np.searchsorted(docs, np.arange(len(self.ids) + 1))
+        return [(tokens[a:b], values[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def quantized_scores(self, vector) -> np.ndarray:
+        """Approximate cosine from the quantized codes (binary: agreeing minus differing signs)."""
+        vector = np.asarray(vector, dtype=np.float32)
+        if self.quantization["type"] == "binary":
+            differing = _POPCOUNT[np.bitwise_xor(self.codes, np.packbits(vector > 0))].sum(axis=1, dtype=np.int32)
+            return (len(vector) - 2 * differing).astype(np.float32)
+        vector = vector / max(float(np.linalg.norm(vector)), 1e-12)
+        q = self.quantization
+        return q["scale"] * (self.codes @ vector) + q["offset"] * float(vector.sum())
+
+    @staticmethod
+    def _top(scores: np.ndarray, allowed: Optional[np.ndarray], limit: int) -> Ranked:
+        if allowed is not None:
+            scores = np.where(allowed, scores, -np.inf)
+        limit = min(limit, len(scores))
+        if limit <= 0:
+            return []
+        top = np.argpartition(-scores, limit - 1)[:limit] if limit < len(scores) else np.arange(len(scores))
+        top = top[np.lexsort((top, -scores[top]))]
+        return [(int(row), float(scores[row])) for row in top if scores[row] != -np.inf]
+
+    def _nearest_quantized(self, query, allowed: Optional[np.ndarray], limit: int,
+                           params: Optional[SearchParams]) -> Ranked:
+        # Qdrant's QuantizationSearchParams: take limit * oversampling by the
+        # codes, then (by default) re-rank those with the float vectors.
+        settings = params.quantization if params is not None else None
+        oversampling = settings.oversampling if settings is not None and settings.oversampling else 1.0
+        rescore = settings.rescore if settings is not None and settings.rescore is not None else True
+        ranked = self._top(self.quantized_scores(query), allowed, math.ceil(limit * oversampling))
+        if not rescore:
+            return ranked[:limit]
+        rows = np.array([row for row, _ in ranked], dtype=np.int64)
+        vector = np.asarray(query, dtype=np.float32)
+        scores = np.full(len(self.ids), -np.inf, dtype=np.float32)
+        # Only the candidates' float vectors are read.
+        scores[rows] = self.dense[rows] @ (vector / max(float(np.linalg.norm(vector)), 1e-12))
+        return self._top(scores, None, limit)
+
+    def _nearest(self, query, using: Optional[str], allowed: Optional[np.ndarray], limit: int,
+                 params: Optional[SearchParams] = None) -> Ranked:
+        if isinstance(query, SparseVector):
+            scores = self.sparse_scores(query)
+        elif using in (None, "dense"):
+            ignore = params is not None and params.quantization is not None and params.quantization.ignore
+            if self.codes is not None and not ignore:
+                return self._nearest_quantized(query, allowed, limit, params)
+            scores = self.dense_scores(query)
+        else:
+            raise ValueError(f"Unknown vector {using!r}")
+        return self._top(scores, allowed, limit)
+
+    def _run(self, query, using, prefetch, query_filter: Optional[Filter],
+             parent_mask: Optional[np.ndarray], limit: int, params: Optional[SearchParams] = None) -> Ranked:
+        allowed = self._filter_mask(query_filter)
+        if parent_mask is not None:
+            allowed = parent_mask if allowed is None else allowed & parent_mask
+        if not prefetch:
+            return self._nearest(query, using, allowed, limit, params)
+
+        sources = [
+            self._run(p.query, p.using, p.prefetch, p.filter, allowed, p.limit or 10, p.params)
+            for p in _as_list(prefetch)
+        ]
+        if isinstance(query, RrfQuery):
+            k = query.rrf.k if query.rrf.k is not None else DEFAULT_RRF_K
+            scores: Dict[int, float] = {}
+            for ranked in sources:
+                for rank, (row, _) in enumerate(ranked):
+                    scores[row] = scores.get(row, 0.0) + 1.0 / (k + rank)
+            return sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+        if query is None:
+            raise ValueError("A prefetch needs a fusion or rescoring query")
+        # A vector over prefetches rescores the union of their candidates.
+        candidates = np.zeros(len(self.ids), dtype=bool)
+        for ranked in sources:
+            candidates[[row for row, _ in ranked]] = True
+        if allowed is not None:
+            candidates &= allowed
+        return self._nearest(query, using, candidates, limit, params)
+
+    def query_points(self, collection_name: str = None, query=None, using: Optional[str] = None,
+                     prefetch: Optional[Prefetch] = None, query_filter: Optional[Filter] = None,
+                     search_params: Optional[SearchParams] = None, limit: int = 10, with_payload: bool = True,
+                     **kwargs) -> QueryResponse:
+        # Like Qdrant, an unset limit means 10.
+        ranked = self._run(query, using, prefetch, query_filter, None, 10 if limit is None else limit, search_params)
+        return QueryResponse(points=[
+            ScoredPoint(
+                id=self.ids[row],
+                version=0,
+                score=score,
+                payload=self.payloads[row] if with_payload else None,
+            )
+            for row, score in ranked
+        ])
+
+    def query_batch_points(self, collection_name: str, requests: list, **kwargs) -> List[QueryResponse]:
+        return [
+            self.query_points(
+                collection_name,
+                query=r.query,
+                using=r.using,
+                prefetch=r.prefetch,
+                query_filter=r.filter,
+                search_params=r.params,
+                limit=r.limit or 10,
+                with_payload=bool(r.with_payload),
+            )
+            for r in requests
+        ]
+
+    def get_collection(self, collection_name: str):
+        # The subset of CollectionInfo the app reads.
+        return SimpleNamespace(points_count=len(self), config=SimpleNamespace(metadata=self.metadata))
+
+
+class AsyncEmbeddedIndex:
+    """Async facade over an EmbeddedIndex for the ``qdrant_async`` slot.
+
+    Searches take well under a millisecond, so they run inline on the loop
+    rather than on a worker thread.
+    """
+
+    def __init__(self, index: EmbeddedIndex):
+        self.index = index
+
+    async def query_points(self, *args, **kwargs) -> QueryResponse:
+        return self.index.query_points(*args, **kwargs)
+
+    async def query_batch_points(self, *args, **kwargs) -> List[QueryResponse]:
+        return self.index.query_batch_points(*args, **kwargs)
+
+    async def get_collection(self, collection_name: str):
+        return self.index.get_collection(collection_name)
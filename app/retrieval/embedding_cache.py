@@ -0,0 +1,170 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, List, NamedTuple, Union
+
+import numpy as np
+
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+# Empty keeps the cache in memory only; a path also persists every new
+# embedding there so restarts (and other workers) skip the inference.
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "")
+
+
+class SparseEmbedding(NamedTuple):
+    indices: np.ndarray
+    values: np.ndarray
+
+
+Embedding = Union[np.ndarray, SparseEmbedding]
+
+
+def _frozen(array: np.ndarray) -> np.ndarray:
+    # Cached arrays are handed to every caller; nobody may modify them.
+    array.flags.writeable = False
+    return array
+
+
+def _compact(embedding) -> Embedding:
+    if hasattr(embedding, "indices"):
+        return SparseEmbedding(_frozen(np.array(embedding.indices, dtype=np.int32)),
+                               _frozen(np.array(embedding.values, dtype=np.float32)))
+    return _frozen(np.array(embedding, dtype=np.float32))
+
+
+def _nbytes(embedding: Embedding) -> int:
+    if isinstance(embedding, SparseEmbedding):
+        return embedding.indices.nbytes + embedding.values.nbytes
+    return embedding.nbytes
+
+
+def _disk_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """LRU of query embeddings keyed by model name + exact text.
+
+    Dense vectors are kept as float32 arrays and sparse ones as int32 indices
+    plus float32 values. With a path, misses are written through to SQLite
+    and memory misses are looked up there before running the model.
+    """
+
+    def __init__(self, max_entries: int, path: str = ""):
+        self.max_entries = max_entries
+        self.path = path
+        self._entries: "OrderedDict[tuple[str, str], Embedding]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self.bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embedding ("
+                " key TEXT PRIMARY KEY,"
+                " model TEXT NOT NULL,"
+                " sparse INTEGER NOT NULL,"
+                " data BLOB NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _load(self, model: str, text: str) -> Embedding | None:
+        row = self._connect().execute(
+            "SELECT sparse, data FROM embedding WHERE key = ?", (_disk_key(model, text),)
+        ).fetchone()
+        if row is None:
+            return None
+        sparse, data = row
+        if not sparse:
+            return np.frombuffer(data, dtype=np.float32)
+        n = len(data) // 8
+        return SparseEmbedding(np.frombuffer(data[:4 * n], dtype=np.int32),
+                               np.frombuffer(data[4 * n:], dtype=np.float32))
+
+    def _store(self, model: str, text: str, embedding: Embedding):
+        if isinstance(embedding, SparseEmbedding):
+            row = (1, embedding.indices.tobytes() + embedding.values.tobytes())
+        else:
+            row = (0, embedding.tobytes())
+        self._connect().execute(
+            "INSERT OR REPLACE INTO embedding (key, model, sparse, data) VALUES (?, ?, ?, ?)",
+            (_disk_key(model, text), model, *row),
+        )
+
+    def _remember(self, key: tuple[str, str], embedding: Embedding):
+        if key in self._entries:
+            return
+        self._entries[key] = embedding
+        self.bytes += _nbytes(embedding)
+        while len(self._entries) > self.max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= _nbytes(evicted)
+            self.evictions += 1
+
+    def embed(self, model: str, texts: List[str], compute: Callable[[List[str]], Iterable]) -> List[Embedding]:
+        """Embeddings for ``texts``; misses go to ``compute`` in one batch."""
+        results: List[Embedding | None] = [None] * len(texts)
+        missing: dict[str, list[int]] = {}
+        with self._lock:
+            for i, text in enumerate(texts):
+                key = (model, text)
+                embedding = self._entries.get(key)
+                if embedding is None and self.path:
+                    embedding = self._load(model, text)
+                    if embedding is not None:
+                        self.disk_hits += 1
+                        self._remember(key, embedding)
+                elif embedding is not None:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                if embedding is None:
+                    missing.setdefault(text, []).append(i)
+                results[i] = embedding
+        if not missing:
+            return results
+
+        computed = [_compact(e) for e in compute(list(missing))]
+        with self._lock:
+            for (text, positions), embedding in zip(missing.items(), computed):
+                self.misses += 1
+                self._remember((model, text), embedding)
+                if self.path:
+                    self._store(model, text, embedding)
+                for i in positions:
+                    results[i] = embedding
+            if self.path:
+                self._connect().commit()
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.bytes,
+            "persistent": bool(self.path),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+embedding_cache = EmbeddingCache(EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_PATH)
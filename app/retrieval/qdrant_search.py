@@ -1,17 +1,83 @@
-from qdrant_client import QdrantClient
-from qdrant_client.models import SparseVector,NamedVector,Prefetch,RrfQuery, Filter, FieldCondition, Range,MatchValue
-from fastembed import TextEmbedding,SparseTextEmbedding
+import asyncio
+import logging
+import time
+from qdrant_client.models import (
+    SparseVector, Prefetch, RrfQuery, Filter, FieldCondition, Range, MatchAny,
+    IsEmptyCondition, PayloadField, QueryRequest, SearchParams, QuantizationSearchParams,
+)
+from app.core.container import container
+from app.core.metrics import track_external
+from app.retrieval.catalog_store import candidate_fields
+from app.retrieval.embedding_cache import embedding_cache
 from app.services.intent_service import Intent
+from app.services.query_chunking import compact_query, split_query
 from dotenv import load_dotenv
 import os
 load_dotenv()
 
 QDRANT_URL = os.getenv("QDRANT_URL")
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
+# An alias: upload_to_qdrant builds versioned collections and switches it
+# atomically (scripts/blue_green.py), so queries never hit a partial index.
 COLLECTION_NAME = "shl_assessments"
-client = QdrantClient(
-    url = QDRANT_URL,
-    api_key= QDRANT_API_KEY
+RRF_K = 60
+# upload_to_qdrant.py stamps this key into the collection metadata once a
+# (re)upload has finished; result caches are keyed on it.
+INDEX_VERSION_KEY = "index_version"
+INDEX_VERSION_CHECK_SECONDS = float(os.getenv("INDEX_VERSION_CHECK_SECONDS", "30"))
+DENSE_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+SPARSE_MODEL_NAME = "Qdrant/bm25"
+
+# "qdrant" queries the hosted collection; "embedded" answers the same
+# query_points calls in process from the artifact upload_to_qdrant.py writes
+# next to the upload (see app/retrieval/embedded_index.py).
+RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "qdrant")
+EMBEDDED_INDEX_PATH = os.getenv("EMBEDDED_INDEX_PATH", "data/embedded_index")
+
+if RETRIEVAL_BACKEND == "embedded":
+    container.register("qdrant", "app.retrieval.embedded_index", lambda m: m.EmbeddedIndex(EMBEDDED_INDEX_PATH))
+    container.register("qdrant_async", "app.retrieval.embedded_index",
+                       lambda m: m.AsyncEmbeddedIndex(container.get("qdrant")))
+else:
+    container.register("qdrant", "qdrant_client", lambda m: m.QdrantClient(
+        url = QDRANT_URL,
+        api_key= QDRANT_API_KEY
+    ))
+    container.register("qdrant_async", "qdrant_client", lambda m: m.AsyncQdrantClient(
+        url = QDRANT_URL,
+        api_key= QDRANT_API_KEY
+    ))
+container.register("dense_model", "fastembed", lambda m: m.TextEmbedding(DENSE_MODEL_NAME))
+container.register("sparse_model", "fastembed", lambda m: m.SparseTextEmbedding(SPARSE_MODEL_NAME))
+container.register("catalog_store", "app.retrieval.catalog_store", lambda m: m.CatalogStore.load(m.CATALOG_PATH))
+
+# With hydration on, queries ask Qdrant for ids and scores only and the
+# candidate fields come from the in-process catalog store, as long as the
+# collection's index version says it was built from the same catalog file.
+HYDRATE_FROM_CATALOG = os.getenv("HYDRATE_FROM_CATALOG", "1") == "1"
+
+# Intent constraints pushed into the Qdrant prefetches (see
+# build_qdrant_filter_from_intent). The duration limit is a hard requirement
+# anyway; test_type and job_levels narrow the pool further and are opt-in.
+PAYLOAD_FILTERS = {f.strip() for f in os.getenv("PAYLOAD_FILTERS", "duration").split(",") if f.strip()}
+TECHNICAL_TEST_TYPES = ["Knowledge & Skills", "Ability & Aptitude", "Simulations"]
+BEHAVIORAL_TEST_TYPES = ["Personality & Behavior", "Competencies", "Biodata & Situational Judgement", "Development & 360"]
+SENIORITY_JOB_LEVELS = {
+    "junior": ["Entry-Level", "Graduate", "General Population"],
+    "mid": ["Mid-Professional", "Professional Individual Contributor", "General Population"],
+    "senior": ["Mid-Professional", "Professional Individual Contributor", "Supervisor",
+               "Front Line Manager", "Manager"],
+    "executive": ["Executive", "Director", "Manager"],
+}
+
+# How dense searches use a quantized collection (upload_to_qdrant.py
+# --quantization): fetch limit * DENSE_OVERSAMPLING candidates by the int8 or
+# binary codes, then re-rank them with the float vectors when DENSE_RESCORE is
+# on. Collections without quantization ignore these.
+DENSE_OVERSAMPLING = float(os.getenv("DENSE_OVERSAMPLING", "2.0"))
+DENSE_RESCORE = os.getenv("DENSE_RESCORE", "1") == "1"
+DENSE_SEARCH_PARAMS = SearchParams(
+    quantization=QuantizationSearchParams(rescore=DENSE_RESCORE, oversampling=DENSE_OVERSAMPLING)
 )
 
 KEYWORD_CLASS_WEIGHTS = {
@@ -20,10 +86,6 @@ KEYWORD_CLASS_WEIGHTS = {
     "default": 1.0,
 }
 
-
-dense_model = TextEmbedding("sentence-transformers/all-MiniLM-L6-v2")
-sparse_model = SparseTextEmbedding("Qdrant/bm25")
-
 KEYWORD_CLASS_WEIGHTS = {
     "critical": 2.0,
     "context": 1.3,
@@ -31,157 +93,424 @@ KEYWORD_CLASS_WEIGHTS = {
 }
 def build_sparse_query(intent: Intent) -> str:
     terms = []
+    keyword_importance = intent.keyword_importance or {}
 
     for skill in intent.core_technical_skills:
-        importance = intent.keyword_importance.get(skill, "critical")
+        importance = keyword_importance.get(skill, "critical")
         repeat = {"critical": 8, "context": 6, "default": 5}[importance]
         terms.extend([skill] * repeat)
     for skill in intent.technical_skills:
-        importance = intent.keyword_importance.get(skill, "context")
+        importance = keyword_importance.get(skill, "context")
         repeat = {"critical": 4, "context": 3, "default": 2}[importance]
         terms.extend([skill] * repeat)
 
     for skill in intent.behavioral_skills:
-        importance = intent.keyword_importance.get(skill, "default")
+        importance = keyword_importance.get(skill, "default")
         repeat = {"critical": 2, "context": 1, "default": 1}[importance]
         terms.extend([skill] * repeat)
     
     return " ".join(terms)
 
-def build_qdrant_filter_from_intent(intent:Intent):
+# The weighted builder tokenizes and stems each skill once (BM25 query mode,
+# one id per distinct stem) and puts its weight on those token ids directly:
+# the section weight times KEYWORD_CLASS_WEIGHTS for its keyword class. The
+# raw query's tokens are added at SPARSE_QUERY_WEIGHT. SPARSE_QUERY_BUILDER=repeat
+# keeps the build_sparse_query string for comparison.
+SPARSE_QUERY_BUILDER = os.getenv("SPARSE_QUERY_BUILDER", "weighted")
+SPARSE_QUERY_WEIGHT = float(os.getenv("SPARSE_QUERY_WEIGHT", "0.1"))
+SPARSE_SECTION_WEIGHTS = {"core": 2.0, "technical": 1.5, "behavioral": 1.0}
+SPARSE_DEFAULT_CLASS = {"core": "critical", "technical": "context", "behavioral": "default"}
+# embedding_cache key for query-mode token ids (document-mode vectors of the
+# same text differ).
+SPARSE_QUERY_TOKENS = f"{SPARSE_MODEL_NAME}:query"
+
+
+def skill_weights(intent: Intent) -> dict[str, float]:
+    keyword_importance = intent.keyword_importance or {}
+    weights = {}
+    for section, skills in (("core", intent.core_technical_skills), ("technical", intent.technical_skills),
+                            ("behavioral", intent.behavioral_skills)):
+        for skill in skills:
+            keyword_class = keyword_importance.get(skill, SPARSE_DEFAULT_CLASS[section])
+            weight = SPARSE_SECTION_WEIGHTS[section] * KEYWORD_CLASS_WEIGHTS.get(keyword_class, 1.0)
+            weights[skill] = weights.get(skill, 0.0) + weight
+    return weights
+
+
+def sparse_plan(query: str, intent: Intent) -> dict[str, float]:
+    """Text -> weight for every piece of the weighted sparse query. The compact
+    query is left out when SPARSE_QUERY_WEIGHT is 0, unless there are no skills."""
+    weights = skill_weights(intent)
+    if not weights:
+        return {compact_query(query, intent): 1.0}
+    if SPARSE_QUERY_WEIGHT > 0:
+        raw = compact_query(query, intent)
+        weights[raw] = weights.get(raw, 0.0) + SPARSE_QUERY_WEIGHT
+    return weights
+
+
+def weighted_sparse_vectors(queries: list[str], intents: list[Intent]) -> list[SparseVector]:
+    plans = [sparse_plan(query, intent) for query, intent in zip(queries, intents)]
+    texts = list(dict.fromkeys(text for plan in plans for text in plan))
+    tokens = dict(zip(texts, embedding_cache.embed(
+        SPARSE_QUERY_TOKENS, texts, lambda misses: container.get("sparse_model").query_embed(misses))))
+    vectors = []
+    for plan in plans:
+        merged = {}
+        for text, weight in plan.items():
+            for index in tokens[text].indices.tolist():
+                merged[index] = merged.get(index, 0.0) + weight
+        indices = sorted(merged)
+        vectors.append(SparseVector(indices=indices, values=[merged[i] for i in indices]))
+    return vectors
+
+def build_qdrant_filter_from_intent(intent:Intent, filters=None):
+    """The payload filter for ``intent``, applied inside every prefetch.
+
+    ``filters`` picks which constraints to apply (default PAYLOAD_FILTERS):
+    ``duration`` keeps assessments within the asked time, ``test_type`` keeps
+    the technical or behavioral test types when the query only asks for one
+    kind, ``job_levels`` keeps assessments for the inferred seniority (and
+    those with no job levels listed).
+    """
+    filters = PAYLOAD_FILTERS if filters is None else filters
     must = []
-    should = []
-    if intent.max_duration_minutes is not None:
+    if "duration" in filters and intent.max_duration_minutes is not None:
         must.append(
             FieldCondition(key = "assessment_duration",
                            range = Range(lte=int(intent.max_duration_minutes)))
         )
-    if getattr(intent,"role_type",None):
+    if "test_type" in filters and intent.needs_technical != intent.needs_behavioral:
+        test_types = TECHNICAL_TEST_TYPES if intent.needs_technical else BEHAVIORAL_TEST_TYPES
         must.append(
-            FieldCondition(key="role_type",
-                           match=MatchValue(value=intent.role_type))
+            FieldCondition(key="test_type", match=MatchAny(any=test_types))
         )
-    if getattr(intent,"seniority",None):
-        must.append(
-            FieldCondition(key="seniority",
-                           match=MatchValue(value=intent.seniority)
-        ))
-    
-    if intent.needs_technical:
-        tech_types = ["Knowledge & Skills", "Ability & Aptitude"]
-        for t in tech_types:
-            should.append(
-                FieldCondition(
-                    key="test_type",
-                    match=MatchValue(value=t)
-                )
-            )
-    
-    kw_imp = intent.keyword_importance or {}
-    if kw_imp:
-        for kw, cls in kw_imp.items():
-            if cls == "critical":
-                should.append(
-                    FieldCondition(
-                        key="test_type",
-                        match=MatchValue(value=kw)
-                    )
-                )
-
-    if not must and not should:
+    if "job_levels" in filters and intent.seniority in SENIORITY_JOB_LEVELS:
+        must.append(Filter(should=[
+            FieldCondition(key="job_levels", match=MatchAny(any=SENIORITY_JOB_LEVELS[intent.seniority])),
+            IsEmptyCondition(is_empty=PayloadField(key="job_levels")),
+        ]))
+
+    if not must:
         return None
-    return Filter(must= must or None , should= should or None)
+    return Filter(must=must)
 
-        
-def hybrid_search(query:str,intent:Intent, top_k:int=50):
-    dense_vector = next(dense_model.embed([query]))
-
-    sparse_query = build_sparse_query(intent)
-    if not sparse_query:
-        sparse_query = query
-    sparse_embedding = next(sparse_model.embed([sparse_query]))
-    sparse_vector = SparseVector(
-        indices = sparse_embedding.indices,
-        values = sparse_embedding.values
-    )   
-    response = client.query_points(
-        collection_name=COLLECTION_NAME,
+
+# Query embeddings go through embedding_cache: repeated queries, chunks and
+# sparse fallbacks skip the ONNX inference.
+def embed_dense_batch(queries: list[str]) -> list:
+    return embedding_cache.embed(
+        DENSE_MODEL_NAME, queries, lambda texts: container.get("dense_model").embed(texts))
+
+
+def embed_sparse_texts(texts: list[str]) -> list[SparseVector]:
+    embeddings = embedding_cache.embed(
+        SPARSE_MODEL_NAME, texts, lambda misses: container.get("sparse_model").embed(misses))
+    return [SparseVector(indices=e.indices.tolist(), values=e.values.tolist()) for e in embeddings]
+
+
+def embed_dense(query: str):
+    return embed_dense_batch([query])[0]
+
+
+def embed_sparse(query: str, intent: Intent) -> SparseVector:
+    return embed_sparse_batch([query], [intent])[0]
+
+
+def embed_dense_chunks(queries: list[str]) -> list[list]:
+    """Dense vectors per query: one for a short query, one per chunk for a long
+    JD (see split_query), all embedded in a single batch."""
+    chunked = [split_query(query) for query in queries]
+    flat = embed_dense_batch([chunk for chunks in chunked for chunk in chunks])
+    vectors, start = [], 0
+    for chunks in chunked:
+        vectors.append(flat[start:start + len(chunks)])
+        start += len(chunks)
+    return vectors
+
+
+def embed_sparse_batch(queries: list[str], intents: list[Intent]) -> list[SparseVector]:
+    if SPARSE_QUERY_BUILDER == "weighted":
+        return weighted_sparse_vectors(queries, intents)
+    return embed_sparse_texts([
+        build_sparse_query(intent) or compact_query(query, intent)
+        for query, intent in zip(queries, intents)
+    ])
+
+
+def dense_prefetch(dense_vectors: list, top_k: int, query_filter: Filter | None = None,
+                   search_params: SearchParams | None = None) -> Prefetch:
+    # Several chunk vectors are fused among themselves first, so a long JD
+    # still counts as one dense list next to the sparse one.
+    search_params = search_params or DENSE_SEARCH_PARAMS
+    if len(dense_vectors) == 1:
+        return Prefetch(using="dense", query=dense_vectors[0], filter=query_filter, params=search_params,
+                        limit=top_k)
+    return Prefetch(
         prefetch=[
-            Prefetch(
-                using="dense",
-                query=dense_vector,
-                limit=top_k,
-            ),
-            Prefetch(
-                using="sparse",
-                query=sparse_vector,
-                limit=top_k,
-            ),
+            Prefetch(using="dense", query=v, filter=query_filter, params=search_params, limit=top_k)
+            for v in dense_vectors
         ],
-        query=RrfQuery(rrf={"k": 60}),
+        query=RrfQuery(rrf={"k": RRF_K}),
         limit=top_k,
-        with_payload=True,
     )
 
-    
+
+def hybrid_prefetch(dense_vectors: list, sparse_vector: SparseVector, top_k: int, query_filter: Filter | None = None,
+                    search_params: SearchParams | None = None):
+    # The filter sits on every leaf prefetch so each leg returns top_k
+    # candidates that already satisfy it.
+    return [
+        dense_prefetch(dense_vectors, top_k, query_filter, search_params),
+        Prefetch(
+            using="sparse",
+            query=sparse_vector,
+            filter=query_filter,
+            limit=top_k,
+        ),
+    ]
 
 
+# Index versions (and store load failures) already warned about.
+_warned: set[str] = set()
 
 
+def payloads_needed(index_version: str) -> bool:
+    """Whether queries against ``index_version`` must fetch payloads."""
+    if not HYDRATE_FROM_CATALOG:
+        return True
+    try:
+        store = container.get("catalog_store")
+    except Exception:
+        if "catalog_store" not in _warned:
+            logging.exception("Could not load the catalog store; fetching payloads")
+            _warned.add("catalog_store")
+        return True
+    if store.serves(index_version):
+        return False
+    if index_version not in _warned:
+        logging.warning("Index version %s was not built from catalog %s; fetching payloads",
+                        index_version, store.fingerprint)
+        _warned.add(index_version)
+    return True
+
+
+def to_candidates(points) -> list[dict]:
     candidates = []
-    for point in response.points:
-        payload = point.payload or {}
-        candidates.append({
-            "id": point.id,
-            "score": point.score,
-            "name": payload.get("name"),
-            "test_type": payload.get("test_type"),
-            "duration": payload.get("assessment_duration"),
-            "url": payload.get("url"),
-            "description": payload.get("description"),
-            "remote_testing": payload.get("remote_testing"),
-            "adaptive_testing": payload.get("adaptive_testing")
-        })
+    store = None
+    for point in points:
+        if point.payload is None:
+            store = store or container.get("catalog_store")
+            candidate = store.candidate(point.id, point.score)
+            if candidate is None:
+                logging.warning("Point %s is not in the catalog store; dropping it", point.id)
+                continue
+            candidates.append(candidate)
+        else:
+            candidates.append({"id": point.id, "score": point.score, **candidate_fields(point.payload)})
     return candidates
 
 
+def hybrid_search(query:str,intent:Intent, top_k:int=50):
+    dense_vectors = embed_dense_chunks([query])[0]
+    sparse_vector = embed_sparse(query, intent)
+    response = container.get("qdrant").query_points(
+        collection_name=COLLECTION_NAME,
+        prefetch=hybrid_prefetch(dense_vectors, sparse_vector, top_k, build_qdrant_filter_from_intent(intent)),
+        query=RrfQuery(rrf={"k": RRF_K}),
+        limit=top_k,
+        with_payload=payloads_needed(get_index_version()),
+    )
+    return to_candidates(response.points)
+
+
 def sparse_search(query: str, intent: Intent, top_k: int = 50):
-    sparse_query = build_sparse_query(intent)
-    if not sparse_query:
-        sparse_query = query
-    sparse_embedding = next(sparse_model.embed([sparse_query]))
-    sparse_vector = SparseVector(
-        indices=sparse_embedding.indices,
-        values=sparse_embedding.values,
+    sparse_vector = embed_sparse(query, intent)
+    response = container.get("qdrant").query_points(
+        collection_name=COLLECTION_NAME,
+        prefetch=[
+            Prefetch(
+                using="sparse",
+                query=sparse_vector,
+                filter=build_qdrant_filter_from_intent(intent),
+                limit=top_k,
+            ),
+        ],
+        query=RrfQuery(rrf={"k": RRF_K}),
+        limit=top_k,
+        with_payload=payloads_needed(get_index_version()),
     )
+    return to_candidates(response.points)
+
+
+# fastembed runs ONNX inference synchronously, so the async variants push it
+# onto a worker thread and only await the network round trip on the loop.
+async def hybrid_search_async(query: str, intent: Intent, top_k: int = 50):
+    dense_vectors, sparse_vector = await asyncio.gather(
+        asyncio.to_thread(embed_dense_chunks, [query]),
+        asyncio.to_thread(embed_sparse, query, intent),
+    )
+    client = await container.aget("qdrant_async")
+    response = await client.query_points(
+        collection_name=COLLECTION_NAME,
+        prefetch=hybrid_prefetch(dense_vectors[0], sparse_vector, top_k, build_qdrant_filter_from_intent(intent)),
+        query=RrfQuery(rrf={"k": RRF_K}),
+        limit=top_k,
+        with_payload=payloads_needed(await get_index_version_async()),
+    )
+    return to_candidates(response.points)
+
 
-    response = client.query_points(
+async def sparse_search_async(query: str, intent: Intent, top_k: int = 50):
+    sparse_vector = await asyncio.to_thread(embed_sparse, query, intent)
+    client = await container.aget("qdrant_async")
+    response = await client.query_points(
         collection_name=COLLECTION_NAME,
         prefetch=[
             Prefetch(
                 using="sparse",
                 query=sparse_vector,
+                filter=build_qdrant_filter_from_intent(intent),
                 limit=top_k,
             ),
         ],
-        query=RrfQuery(rrf={"k": 60}),
+        query=RrfQuery(rrf={"k": RRF_K}),
         limit=top_k,
-        with_payload=True,
+        with_payload=payloads_needed(await get_index_version_async()),
     )
-    
+    return to_candidates(response.points)
 
-    candidates = []
-    for point in response.points:
-        payload = point.payload or {}
-        candidates.append({
-            "id": point.id,
-            "score": point.score,
-            "name": payload.get("name"),
-            "test_type": payload.get("test_type"),
-            "duration": payload.get("assessment_duration"),
-            "url": payload.get("url"),
-            "description": payload.get("description"),
-            "remote_testing": payload.get("remote_testing"),
-            "adaptive_testing": payload.get("adaptive_testing")
-        })
-    return candidates
\ No newline at end of file
+
+@track_external("qdrant", "query_batch_points")
+async def hybrid_search_batch_async(dense_vectors: list[list], sparse_vectors: list[SparseVector], top_k: int = 50,
+                                    filters: list[Filter | None] | None = None):
+    filters = filters or [None] * len(dense_vectors)
+    with_payload = payloads_needed(await get_index_version_async())
+    requests = [
+        QueryRequest(
+            prefetch=hybrid_prefetch(query_vectors, sparse_vector, top_k, query_filter),
+            query=RrfQuery(rrf={"k": RRF_K}),
+            limit=top_k,
+            with_payload=with_payload,
+        )
+        for query_vectors, sparse_vector, query_filter in zip(dense_vectors, sparse_vectors, filters)
+    ]
+    client = await container.aget("qdrant_async")
+    responses = await client.query_batch_points(
+        collection_name=COLLECTION_NAME,
+        requests=requests,
+    )
+    return [to_candidates(response.points) for response in responses]
+
+
+# Per-leg searches used by the staged pipeline: the dense half does not
+# depend on the parsed intent, so it can run while the LLM enrichment is still
+# in flight and be fused with the sparse half afterwards.
+def dense_query_args(dense_vectors: list, top_k: int, query_filter: Filter | None = None) -> dict:
+    # One vector is a plain search; chunk vectors go out as prefetches fused
+    # server-side in the same request.
+    leg = dense_prefetch(dense_vectors, top_k, query_filter)
+    return {"query": leg.query, "using": leg.using, "prefetch": leg.prefetch, "query_filter": query_filter,
+            "search_params": leg.params}
+
+
+@track_external("qdrant", "query_points")
+def query_dense(dense_vectors: list, top_k: int = 50, query_filter: Filter | None = None):
+    response = container.get("qdrant").query_points(
+        collection_name=COLLECTION_NAME,
+        limit=top_k,
+        with_payload=payloads_needed(get_index_version()),
+        **dense_query_args(dense_vectors, top_k, query_filter),
+    )
+    return to_candidates(response.points)
+
+
+@track_external("qdrant", "query_points")
+def query_sparse(sparse_vector: SparseVector, top_k: int = 50, query_filter: Filter | None = None):
+    response = container.get("qdrant").query_points(
+        collection_name=COLLECTION_NAME,
+        query=sparse_vector,
+        using="sparse",
+        query_filter=query_filter,
+        limit=top_k,
+        with_payload=payloads_needed(get_index_version()),
+    )
+    return to_candidates(response.points)
+
+
+@track_external("qdrant", "query_points")
+async def query_dense_async(dense_vectors: list, top_k: int = 50, query_filter: Filter | None = None):
+    client = await container.aget("qdrant_async")
+    response = await client.query_points(
+        collection_name=COLLECTION_NAME,
+        limit=top_k,
+        with_payload=payloads_needed(await get_index_version_async()),
+        **dense_query_args(dense_vectors, top_k, query_filter),
+    )
+    return to_candidates(response.points)
+
+
+@track_external("qdrant", "query_points")
+async def query_sparse_async(sparse_vector: SparseVector, top_k: int = 50, query_filter: Filter | None = None):
+    client = await container.aget("qdrant_async")
+    response = await client.query_points(
+        collection_name=COLLECTION_NAME,
+        query=sparse_vector,
+        using="sparse",
+        query_filter=query_filter,
+        limit=top_k,
+        with_payload=payloads_needed(await get_index_version_async()),
+    )
+    return to_candidates(response.points)
+
+
+def rrf_fuse(result_lists: list[list[dict]], top_k: int = 50, k: int = RRF_K) -> list[dict]:
+    # Same scoring as Qdrant's RrfQuery: 1 / (k + rank), rank starting at 0.
+    scores = {}
+    by_id = {}
+    for results in result_lists:
+        for rank, c in enumerate(results):
+            scores[c["id"]] = scores.get(c["id"], 0.0) + 1.0 / (k + rank)
+            by_id.setdefault(c["id"], c)
+
+    fused = []
+    for point_id in sorted(scores, key=scores.get, reverse=True)[:top_k]:
+        candidate = dict(by_id[point_id])
+        candidate["score"] = scores[point_id]
+        fused.append(candidate)
+    return fused
+
+
+_index_version = {"value": "unversioned", "checked_at": 0.0}
+
+
+def _version_due() -> bool:
+    now = time.monotonic()
+    if now - _index_version["checked_at"] < INDEX_VERSION_CHECK_SECONDS:
+        return False
+    _index_version["checked_at"] = now
+    return True
+
+
+def _set_index_version(info):
+    metadata = info.config.metadata or {}
+    _index_version["value"] = str(metadata.get(INDEX_VERSION_KEY, "unversioned"))
+
+
+def get_index_version() -> str:
+    if _version_due():
+        try:
+            _set_index_version(container.get("qdrant").get_collection(COLLECTION_NAME))
+        except Exception:
+            logging.exception("Could not read index version; keeping %s", _index_version["value"])
+    return _index_version["value"]
+
+
+async def get_index_version_async() -> str:
+    if _version_due():
+        try:
+            client = await container.aget("qdrant_async")
+            _set_index_version(await client.get_collection(COLLECTION_NAME))
+        except Exception:
+            logging.exception("Could not read index version; keeping %s", _index_version["value"])
+    return _index_version["value"]
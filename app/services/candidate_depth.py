@@ -0,0 +1,54 @@
+import math
+import os
+from typing import Dict, List, Optional
+
+from app.core.metrics import registry
+from app.services.intent_service import Intent
+from app.services.selection_service import duration_ok
+
+# With ADAPTIVE_DEPTH on, each retrieval leg starts at ADAPTIVE_START_DEPTH
+# and the depth grows by ADAPTIVE_GROWTH (up to the request's top_k) only
+# while the pool left for reranking is too small or the dense scores are flat
+# at the cut-off. The reranker is the per-document cost, so most requests
+# rerank far fewer than top_k candidates.
+ADAPTIVE_DEPTH = os.getenv("ADAPTIVE_DEPTH", "0") == "1"
+ADAPTIVE_START_DEPTH = int(os.getenv("ADAPTIVE_START_DEPTH", "20"))
+ADAPTIVE_GROWTH = float(os.getenv("ADAPTIVE_GROWTH", "2"))
+# The rerank pool must hold this many times final_k candidates within the duration limit.
+ADAPTIVE_POOL_FACTOR = float(os.getenv("ADAPTIVE_POOL_FACTOR", "1.5"))
+# Dense score drop from the final_k-th to the last candidate, relative to the
+# top score, below which the tail is "flat": more of the same likely follows.
+ADAPTIVE_FLAT_GAP = float(os.getenv("ADAPTIVE_FLAT_GAP", "0.05"))
+
+RETRIEVAL_DEPTH = registry.histogram(
+    "retrieval_depth", "Candidates fetched per retrieval leg once the depth settled.",
+    (10, 20, 40, 80, 160, 320))
+DEPTH_EXPANSIONS = registry.counter(
+    "retrieval_depth_expansions_total", "Retrieval rounds repeated deeper, by reason (pool or flat).")
+
+
+def start_depth(top_k: int) -> int:
+    return min(ADAPTIVE_START_DEPTH, top_k) if ADAPTIVE_DEPTH else top_k
+
+
+def next_depth(depth: int, top_k: int) -> int:
+    return min(top_k, max(depth + 1, math.ceil(depth * ADAPTIVE_GROWTH)))
+
+
+def deepen_reason(pool: List[Dict], legs: List[List[Dict]], intent: Intent, final_k: int, depth: int,
+                  dense: Optional[List[Dict]] = None) -> Optional[str]:
+    """Why retrieval at ``depth`` should go deeper ("pool" or "flat"), or None.
+
+    ``pool`` is what would be reranked and ``legs`` the raw result lists; when
+    every leg came back short of ``depth`` the filtered catalog is exhausted
+    and going deeper cannot help.
+    """
+    if all(len(leg) < depth for leg in legs):
+        return None
+    if sum(duration_ok(c, intent) for c in pool) < ADAPTIVE_POOL_FACTOR * final_k:
+        return "pool"
+    if dense and len(dense) > final_k:
+        top = dense[0]["score"]
+        if top > 0 and (dense[final_k - 1]["score"] - dense[-1]["score"]) / top < ADAPTIVE_FLAT_GAP:
+            return "flat"
+    return None
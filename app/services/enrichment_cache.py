@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+
+from app.core.cache import normalize_query
+from app.services.intent_service import Intent
+
+ENRICHMENT_CACHE_PATH = os.getenv("ENRICHMENT_CACHE_PATH", "data/enrichment_cache.sqlite3")
+
+
+def _intent_fingerprint(intent: Intent) -> dict:
+    # parse_intent builds skill lists from sets, so their order varies between
+    # processes; sort them so the key is stable across restarts and workers.
+    return {
+        k: sorted(v) if isinstance(v, list) else v
+        for k, v in asdict(intent).items()
+    }
+
+
+def enrichment_key(query: str, intent: Intent, prompt: str, model: str) -> str:
+    payload = json.dumps({
+        "query": normalize_query(query),
+        "prompt": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+        "model": model,
+        "intent": _intent_fingerprint(intent),
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class EnrichmentCache:
+    """SQLite-backed memo of parsed LLM enrichment responses.
+
+    Shared by every worker pointing at the same file. Each row keeps how long
+    the original LLM call took and how often it was reused, which is what the
+    latency-saved report is built from. An empty path disables the cache.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS enrichment ("
+                " key TEXT PRIMARY KEY,"
+                " query TEXT NOT NULL,"
+                " model TEXT NOT NULL,"
+                " data TEXT NOT NULL,"
+                " latency_ms REAL NOT NULL,"
+                " hits INTEGER NOT NULL DEFAULT 0,"
+                " created_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS enrichment_stats ("
+                " name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def contains(self, key: str) -> bool:
+        if not self.enabled:
+            return False
+        with self._lock:
+            row = self._connect().execute("SELECT 1 FROM enrichment WHERE key = ?", (key,)).fetchone()
+        return row is not None
+
+    def get(self, key: str) -> dict | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT data FROM enrichment WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT INTO enrichment_stats (name, value) VALUES ('lookups', 1)"
+                " ON CONFLICT(name) DO UPDATE SET value = value + 1"
+            )
+            if row is not None:
+                conn.execute("UPDATE enrichment SET hits = hits + 1 WHERE key = ?", (key,))
+            conn.commit()
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, key: str, query: str, model: str, data: dict, latency_ms: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO enrichment (key, query, model, data, latency_ms, hits, created_at)"
+                " VALUES (?, ?, ?, ?, ?, 0, ?)",
+                (key, normalize_query(query), model, json.dumps(data), latency_ms, time.time()),
+            )
+            conn.commit()
+
+    def examples(self) -> list[tuple[str, dict]]:
+        """Every cached (normalized query, enrichment) pair, oldest first."""
+        if not self.enabled:
+            return []
+        with self._lock:
+            rows = self._connect().execute("SELECT query, data FROM enrichment ORDER BY created_at").fetchall()
+        return [(query, json.loads(data)) for query, data in rows]
+
+    def stats(self) -> dict:
+        if not self.enabled:
+            return {"enabled": False}
+        with self._lock:
+            conn = self._connect()
+            entries, hits, saved_ms, avg_ms = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hits), 0), COALESCE(SUM(hits * latency_ms), 0),"
+                " COALESCE(AVG(latency_ms), 0) FROM enrichment"
+            ).fetchone()
+            row = conn.execute("SELECT value FROM enrichment_stats WHERE name = 'lookups'").fetchone()
+        lookups = row[0] if row else 0
+        return {
+            "enabled": True,
+            "path": self.path,
+            "entries": entries,
+            "lookups": lookups,
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "avg_llm_latency_ms": round(avg_ms, 1),
+            "latency_saved_ms": round(saved_ms, 1),
+        }
+
+
+enrichment_cache = EnrichmentCache(ENRICHMENT_CACHE_PATH)
@@ -0,0 +1,76 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+Seniority = Literal["junior", "mid", "senior", "executive"]
+RoleType = Literal["IC", "manager", "executive", "consultant"]
+Importance = Literal["critical", "context", "default"]
+
+
+class KeywordImportance(BaseModel):
+    keyword: str
+    importance: Importance
+
+
+class Enrichment(BaseModel):
+    """Typed LLM enrichment.
+
+    Also used as the response schema in structured-output mode, which is why
+    keyword importance is a list of pairs (Gemini schemas have no free-form
+    maps); ``to_data`` turns it back into the dict ``apply_enrichment`` and
+    the enrichment cache use.
+    """
+
+    core_technical_skills: List[str] = Field(default_factory=list)
+    supporting_technical_skills: List[str] = Field(default_factory=list)
+    generic_role_terms: List[str] = Field(default_factory=list)
+    additional_technical_skills: List[str] = Field(default_factory=list)
+    additional_behavioral_skills: List[str] = Field(default_factory=list)
+    seniority: Optional[Seniority] = None
+    role_type: Optional[RoleType] = None
+    keyword_importance: List[KeywordImportance] = Field(default_factory=list)
+
+    @field_validator(
+        "core_technical_skills", "supporting_technical_skills",
+        "generic_role_terms", "additional_technical_skills", "additional_behavioral_skills",
+        mode="before")
+    @classmethod
+    def _normalize_terms(cls, value):
+        if value is None:
+            return []
+        return list(dict.fromkeys(str(v).strip().lower() for v in value if str(v).strip()))
+
+    @field_validator("seniority", mode="before")
+    @classmethod
+    def _normalize_seniority(cls, value):
+        value = str(value).strip().lower() if value else None
+        return value if value in Seniority.__args__ else None
+
+    @field_validator("role_type", mode="before")
+    @classmethod
+    def _normalize_role_type(cls, value):
+        value = str(value).strip().lower() if value else None
+        if value in ("ic", "individual contributor"):
+            return "IC"
+        return value if value in RoleType.__args__ else None
+
+    @field_validator("keyword_importance", mode="before")
+    @classmethod
+    def _normalize_importance(cls, value):
+        # The long prompt asks for a {keyword: importance} map; entries with
+        # an unknown importance are dropped rather than failing the response.
+        if value is None:
+            return []
+        if isinstance(value, dict):
+            value = [{"keyword": k, "importance": v} for k, v in value.items()]
+        pairs = []
+        for item in value:
+            importance = str(item.get("importance", "")).strip().lower()
+            if importance in Importance.__args__ and item.get("keyword"):
+                pairs.append({"keyword": str(item["keyword"]).strip().lower(), "importance": importance})
+        return pairs
+
+    def to_data(self) -> dict:
+        data = self.model_dump(exclude={"keyword_importance"})
+        data["keyword_importance"] = {k.keyword: k.importance for k in self.keyword_importance}
+        return data
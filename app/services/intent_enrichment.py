@@ -1,9 +1,23 @@
+import asyncio
 import json
+import os
+import time
 from app.services.intent_service import Intent
-from app.core.llm_client import call_llm
+from app.services.enrichment_cache import enrichment_cache, enrichment_key
+from app.services.enrichment_schema import Enrichment
+from app.core.container import container
+from app.core.llm_client import LLM_MODEL, call_llm, call_llm_async, structured_output_enabled
+from app.core.metrics import ENRICHMENT_FALLBACKS, ENRICHMENT_SOURCES
+from app.services.local_intent import LOCAL_INTENT_MIN_CONFIDENCE
 import logging
 import re
 
+logger = logging.getLogger(__name__)
+
+# "full" is the original rules prompt; "compact" is a short prompt that sends
+# the parsed intent as JSON and relies on the response schema.
+ENRICHMENT_PROMPT_VARIANT = os.getenv("ENRICHMENT_PROMPT_VARIANT", "full")
+
 
 LLM_PROMPT = """
 #### ROLE:
@@ -170,22 +184,79 @@ Rules:
 """
 
 
-def enrich_with_llm(intent:Intent, query:str)->Intent:
-    prompt = LLM_PROMPT.format(query=query,intent = intent)
-    try:
-        raw = call_llm(prompt)
-        print("LLM raw repr:", repr(raw), "type:", type(raw))
-        cleaned_json = raw.strip()
-        pattern = r"^```(?:json)?\s*(.*?)\s*```$"
-        match = re.search(pattern, cleaned_json, re.DOTALL)
-        
-        if match:
-            cleaned_json = match.group(1)
-        data = json.loads(cleaned_json)
-    except Exception:
-        logging.exception("LLM call or JSON parse failed")
-        return intent
-    
+COMPACT_PROMPT = """Classify the skills in a hiring query for an assessment recommender. Do not rank or recommend.
+Parsed intent (read-only, do not contradict): {intent}
+Query: {query}
+
+- core_technical_skills: languages, frameworks, platforms and tools the role cannot do without
+- supporting_technical_skills: technical concepts that help but are not enough alone (apis, system design)
+- generic_role_terms: broad words that are not skills (developer, engineer, it)
+- additional_behavioral_skills: soft skills not already in the parsed intent
+- seniority: junior|mid|senior|executive, only if explicit, else null
+- role_type: IC|manager|executive|consultant, only if clearly implied, else null
+- keyword_importance: meaningful query keywords as critical (core requirement), context (secondary) or default
+Lowercase, deduplicated skill strings; never invent skills the query does not imply. Return empty lists or null when unsure.
+"""
+
+# Spelled out only when the model cannot take a response schema (Gemma).
+COMPACT_JSON_SHAPE = """Reply with JSON only: {{"core_technical_skills":[],"supporting_technical_skills":[],\
+"generic_role_terms":[],"additional_behavioral_skills":[],"seniority":null,"role_type":null,\
+"keyword_importance":[{{"keyword":"","importance":"critical"}}]}}
+"""
+
+
+def compact_intent(intent: Intent) -> str:
+    fields = {
+        "technical_skills": intent.technical_skills,
+        "behavioral_skills": intent.behavioral_skills,
+        "max_duration_minutes": intent.max_duration_minutes,
+    }
+    return json.dumps({k: v for k, v in fields.items() if v}, separators=(",", ":"))
+
+
+def prompt_template(variant: str | None = None) -> str:
+    """The template the active variant sends; also part of the cache key."""
+    variant = variant or ENRICHMENT_PROMPT_VARIANT
+    if variant == "full":
+        return LLM_PROMPT
+    if variant == "compact":
+        return COMPACT_PROMPT if structured_output_enabled() else COMPACT_PROMPT + COMPACT_JSON_SHAPE
+    raise ValueError(f"Unknown enrichment prompt variant: {variant}")
+
+
+def build_prompt(query: str, intent: Intent, variant: str | None = None) -> tuple[str, type | None]:
+    """The prompt text and the response schema to request, if any."""
+    variant = variant or ENRICHMENT_PROMPT_VARIANT
+    template = prompt_template(variant)
+    if variant == "full":
+        return template.format(query=query, intent=intent), None
+    return template.format(query=query, intent=compact_intent(intent)), Enrichment
+
+
+def parse_llm_response(raw: str) -> dict:
+    logger.debug("LLM raw repr: %r", raw)
+    cleaned_json = raw.strip()
+    pattern = r"^```(?:json)?\s*(.*?)\s*```$"
+    match = re.search(pattern, cleaned_json, re.DOTALL)
+
+    if match:
+        cleaned_json = match.group(1)
+    return json.loads(cleaned_json)
+
+
+def parse_enrichment(raw: str) -> dict:
+    """Parse and validate an LLM reply into the enrichment dict; raises on bad output."""
+    return Enrichment.model_validate(parse_llm_response(raw)).to_data()
+
+
+def fallback(intent: Intent, reason: str) -> Intent:
+    logger.exception("LLM enrichment failed (%s), using the parsed intent", reason)
+    ENRICHMENT_FALLBACKS.inc(reason=reason)
+    ENRICHMENT_SOURCES.inc(source="fallback")
+    return intent
+
+
+def apply_enrichment(intent: Intent, data: dict) -> Intent:
     if 'additional_technical_skills' in data:
         intent.technical_skills.extend(s for s in data['additional_technical_skills'] if s not in intent.technical_skills)
     if 'additional_behavioral_skills' in data:
@@ -218,4 +289,83 @@ def enrich_with_llm(intent:Intent, query:str)->Intent:
     return intent
 
 
+def enrich_locally(intent:Intent, query:str)->dict | None:
+    """The local model's enrichment, or None when it is not confident enough."""
+    if LOCAL_INTENT_MIN_CONFIDENCE > 1:
+        return None
+    try:
+        data, confidence = container.get("local_intent_model").predict(query, intent)
+    except Exception:
+        logger.exception("Local intent model failed")
+        return None
+    logger.debug("Local intent confidence %.2f for %r", confidence, query)
+    return data if confidence >= LOCAL_INTENT_MIN_CONFIDENCE else None
+
+
+def learn_enrichment(query:str, data:dict):
+    if LOCAL_INTENT_MIN_CONFIDENCE > 1:
+        return
+    try:
+        container.get("local_intent_model").add(query, data)
+    except Exception:
+        logger.exception("Local intent model update failed")
+
+
+def enrich_with_llm(intent:Intent, query:str, use_local:bool=True)->Intent:
+    """``use_local=False`` skips the local intent model, so a cache miss always
+    goes to the LLM and its answer is cached."""
+    key = enrichment_key(query, intent, prompt_template(), LLM_MODEL)
+    data = enrichment_cache.get(key)
+    if data is not None:
+        ENRICHMENT_SOURCES.inc(source="cache")
+        return apply_enrichment(intent, data)
 
+    data = enrich_locally(intent, query) if use_local else None
+    if data is not None:
+        ENRICHMENT_SOURCES.inc(source="local")
+        return apply_enrichment(intent, data)
+
+    prompt, schema = build_prompt(query, intent)
+    start = time.perf_counter()
+    try:
+        raw = call_llm(prompt, schema=schema)
+    except Exception:
+        return fallback(intent, "call")
+    try:
+        data = parse_enrichment(raw)
+    except Exception:
+        return fallback(intent, "parse")
+    ENRICHMENT_SOURCES.inc(source="llm")
+    enrichment_cache.put(key, query, LLM_MODEL, data, (time.perf_counter() - start) * 1000)
+    learn_enrichment(query, data)
+    return apply_enrichment(intent, data)
+
+
+async def enrich_with_llm_async(intent:Intent, query:str, use_local:bool=True)->Intent:
+    key = enrichment_key(query, intent, prompt_template(), LLM_MODEL)
+    data = await asyncio.to_thread(enrichment_cache.get, key)
+    if data is not None:
+        ENRICHMENT_SOURCES.inc(source="cache")
+        return apply_enrichment(intent, data)
+
+    data = await asyncio.to_thread(enrich_locally, intent, query) if use_local else None
+    if data is not None:
+        ENRICHMENT_SOURCES.inc(source="local")
+        return apply_enrichment(intent, data)
+
+    prompt, schema = build_prompt(query, intent)
+    start = time.perf_counter()
+    try:
+        raw = await call_llm_async(prompt, schema=schema)
+    except Exception:
+        return fallback(intent, "call")
+    try:
+        data = parse_enrichment(raw)
+    except Exception:
+        return fallback(intent, "parse")
+    ENRICHMENT_SOURCES.inc(source="llm")
+    await asyncio.to_thread(
+        enrichment_cache.put, key, query, LLM_MODEL, data, (time.perf_counter() - start) * 1000
+    )
+    await asyncio.to_thread(learn_enrichment, query, data)
+    return apply_enrichment(intent, data)
@@ -1,6 +1,7 @@
 from dataclasses import dataclass,field
 import re
 from typing import List, Optional, Literal,Dict
+from app.core.container import container
 
 KeywordClass = Literal["critical", "context", "default"]
 
@@ -23,15 +24,28 @@ class Intent:
 
 TECHNICAL_KEYWORDS = {
     "java", "python", "sql", "developer", "engineering", "software",
-    "programming", "technical", "coding", "cloud"
+    "programming", "technical", "coding", "cloud",
+    "typescript", "kotlin", "scala", "rust", "golang", "swift", "devops",
+    "terraform", "machine learning", "deep learning", "artificial intelligence",
+    "data engineering", "data analysis", "postgresql", "mysql", "nosql",
+    "microservices", "scrum", "api", "backend", "frontend", "full stack",
+    ".net", "scikit-learn",
 }
 
 BEHAVIORAL_KEYWORDS = {
     "leadership", "collaboration", "communication", "interpersonal",
     "people management", "culture", "cultural", "values",
-    "teamwork", "stakeholder", "business teams", "soft skills"
+    "teamwork", "stakeholder", "business teams", "soft skills",
+    "problem solving", "decision making", "adaptability", "resilience",
+    "emotional intelligence", "negotiation", "influencing", "motivation",
+    "customer service", "customer focus", "personality", "integrity",
+    "time management", "attention to detail", "coaching", "mentoring",
+    "conflict resolution", "accountability", "ownership", "initiative",
 }
 
+# Seed keywords above plus the skills mined from the catalog, compiled once.
+container.register("skill_matcher", "app.services.skill_vocabulary", lambda m: m.build_matcher())
+
 
 def extract_duration_minutes(query:str)->Optional[int]:
     match = re.search(r"(\d+)\s*(minute|min|mins)", query)
@@ -46,19 +60,7 @@ def extract_duration_minutes(query:str)->Optional[int]:
     return None
 
 def detect_skills(text: str):
-    text_lower = text.lower()
-
-    technical_hits = [
-        kw for kw in TECHNICAL_KEYWORDS
-        if kw in text_lower
-    ]
-
-    behavioral_hits = [
-        kw for kw in BEHAVIORAL_KEYWORDS
-        if kw in text_lower
-    ]
-
-    return technical_hits, behavioral_hits
+    return container.get("skill_matcher").match(text)
 
 def parse_intent(query:str)->Intent:
     max_duration = extract_duration_minutes(query)
@@ -0,0 +1,157 @@
+import os
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.container import container
+from app.retrieval.qdrant_search import embed_dense_batch
+from app.services.enrichment_cache import enrichment_cache
+from app.services.intent_service import Intent
+
+# Below this confidence the query still goes to the LLM. Above 1 the local
+# model never answers.
+LOCAL_INTENT_MIN_CONFIDENCE = float(os.getenv("LOCAL_INTENT_MIN_CONFIDENCE", "0.8"))
+LOCAL_INTENT_NEIGHBORS = int(os.getenv("LOCAL_INTENT_NEIGHBORS", "5"))
+# Past queries less similar than this do not vote on seniority/role type.
+LOCAL_INTENT_MIN_SIMILARITY = float(os.getenv("LOCAL_INTENT_MIN_SIMILARITY", "0.6"))
+# A skill must have been classified by the LLM this many times before its
+# label is trusted.
+LOCAL_INTENT_MIN_TERM_SUPPORT = int(os.getenv("LOCAL_INTENT_MIN_TERM_SUPPORT", "2"))
+
+TERM_CATEGORIES = {
+    "core_technical_skills": "core",
+    "supporting_technical_skills": "supporting",
+    "generic_role_terms": "generic",
+    "additional_behavioral_skills": "behavioral",
+}
+
+
+def _canonical_term(term: str) -> str:
+    # Map the LLM's free-text skill names onto the matcher's canonical forms so
+    # they line up with what parse_intent detects ("React.js" -> "reactjs").
+    technical, behavioral = container.get("skill_matcher").match(term)
+    hits = technical + behavioral
+    return hits[0] if len(hits) == 1 else term.strip().lower()
+
+
+def _vote(votes: Iterable[Tuple[object, float]]) -> Tuple[object, float]:
+    totals: Dict[object, float] = defaultdict(float)
+    for label, weight in votes:
+        totals[label] += weight
+    if not totals:
+        return None, 0.0
+    label, weight = max(totals.items(), key=lambda kv: kv[1])
+    return label, weight / sum(totals.values())
+
+
+class LocalIntentModel:
+    """Predicts the LLM enrichment fields from past LLM enrichments.
+
+    Skill-level fields (core/supporting/generic, keyword importance) come from
+    how the LLM labelled the same canonical skill before; sentence-level fields
+    (seniority, role type) from a similarity-weighted vote of the nearest past
+    queries in MiniLM space. ``predict`` returns the enrichment in the LLM's
+    JSON shape plus a confidence: the weakest of those votes.
+    """
+
+    def __init__(self):
+        self.queries: List[str] = []
+        self.labels: List[dict] = []
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self.term_categories: Dict[str, Counter] = defaultdict(Counter)
+        self.term_importance: Dict[str, Counter] = defaultdict(Counter)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.queries)
+
+    @staticmethod
+    def embed(queries: List[str]) -> np.ndarray:
+        vectors = np.asarray(embed_dense_batch(queries), dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True).clip(min=1e-12)
+
+    def fit(self, examples: List[Tuple[str, dict]]):
+        if not examples:
+            return self
+        vectors = self.embed([q for q, _ in examples])
+        for (query, data), vector in zip(examples, vectors):
+            self._add(query, data, vector)
+        return self
+
+    def add(self, query: str, data: dict, vector: Optional[np.ndarray] = None):
+        if vector is None:
+            vector = self.embed([query])[0]
+        self._add(query, data, vector)
+
+    def _add(self, query: str, data: dict, vector: np.ndarray):
+        with self._lock:
+            self.queries.append(query)
+            self.labels.append({"seniority": data.get("seniority"), "role_type": data.get("role_type")})
+            row = vector.reshape(1, -1)
+            self.vectors = row if not self.vectors.size else np.vstack([self.vectors, row])
+            for field, category in TERM_CATEGORIES.items():
+                for term in data.get(field) or []:
+                    self.term_categories[_canonical_term(term)][category] += 1
+            for term, importance in (data.get("keyword_importance") or {}).items():
+                self.term_importance[_canonical_term(term)][importance] += 1
+
+    def _term_label(self, term: str, counts: Dict[str, Counter]) -> Tuple[Optional[str], float]:
+        seen = counts.get(term)
+        if not seen or sum(seen.values()) < LOCAL_INTENT_MIN_TERM_SUPPORT:
+            return None, 0.0
+        label, count = seen.most_common(1)[0]
+        return label, count / sum(seen.values())
+
+    def predict(self, query: str, intent: Intent, vector: Optional[np.ndarray] = None) -> Tuple[dict, float]:
+        terms = list(dict.fromkeys(intent.technical_skills + intent.behavioral_skills))
+        technical = set(intent.technical_skills)
+        if not terms or not len(self):
+            return {}, 0.0
+        if vector is None:
+            vector = self.embed([query])[0]
+
+        with self._lock:
+            similarities = self.vectors @ vector
+            nearest = np.argsort(-similarities)[:LOCAL_INTENT_NEIGHBORS]
+            neighbours = [(self.labels[i], float(similarities[i])) for i in nearest
+                          if similarities[i] >= LOCAL_INTENT_MIN_SIMILARITY]
+            # Behavioral terms are already classified by the parser; only the
+            # technical ones need a core/supporting/generic label.
+            term_labels = {t: self._term_label(t, self.term_categories) for t in terms if t in technical}
+            importance = {t: self._term_label(t, self.term_importance) for t in terms}
+        if not neighbours:
+            return {}, 0.0
+
+        seniority, seniority_share = _vote((n["seniority"], w) for n, w in neighbours)
+        role_type, role_share = _vote((n["role_type"], w) for n, w in neighbours)
+        data = {
+            "core_technical_skills": [],
+            "supporting_technical_skills": [],
+            "generic_role_terms": [],
+            "additional_behavioral_skills": [],
+            "seniority": seniority,
+            "role_type": role_type,
+            "keyword_importance": {},
+        }
+        fields = {category: field for field, category in TERM_CATEGORIES.items()}
+        for term, (category, _) in term_labels.items():
+            if category is not None:
+                data[fields[category]].append(term)
+            label = importance[term][0]
+            if label is not None:
+                data["keyword_importance"][term] = label
+
+        confidence = min(
+            [seniority_share, role_share, neighbours[0][1]]
+            + [share for _, share in term_labels.values()]
+        )
+        return data, confidence
+
+
+def build_local_intent_model() -> LocalIntentModel:
+    return LocalIntentModel().fit(enrichment_cache.examples())
+
+
+container.register("local_intent_model", "app.services.local_intent", lambda m: m.build_local_intent_model())
@@ -0,0 +1,95 @@
+import os
+import re
+from typing import List
+
+from app.services.intent_service import Intent
+
+# all-MiniLM-L6-v2 truncates at 256 word pieces (~190 English words); past
+# this many words a query is treated as a pasted JD and chunked.
+LONG_QUERY_WORDS = int(os.getenv("LONG_QUERY_WORDS", "150"))
+CHUNK_WORDS = int(os.getenv("CHUNK_WORDS", "120"))
+MAX_CHUNKS = int(os.getenv("MAX_CHUNKS", "8"))
+RERANK_QUERY_WORDS = int(os.getenv("RERANK_QUERY_WORDS", "120"))
+
+_HEADING = re.compile(r"^[^a-z]{3,80}:?$")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+|\n+")
+# Sentences that state what the user is asking for rather than describe the job.
+_ASK = re.compile(r"\b(suggest|recommend|looking for|hiring|need|assessment|test|duration|minutes?|mins?|hours?)\b", re.I)
+
+
+def is_long_query(query: str) -> bool:
+    return len(query.split()) > LONG_QUERY_WORDS
+
+
+def _sections(query: str) -> List[str]:
+    # Blank lines and ALL-CAPS heading lines ("KEY RESPONSIBILITIES:") start a
+    # new section; a heading stays with the text under it.
+    sections, current, has_body = [], [], False
+    for line in query.splitlines():
+        line = line.strip()
+        heading = bool(line) and bool(_HEADING.match(line))
+        if (not line or heading) and has_body:
+            sections.append(" ".join(current))
+            current, has_body = [], False
+        if line:
+            current.append(line)
+            has_body = has_body or not heading
+    if current:
+        sections.append(" ".join(current))
+    return sections
+
+
+def split_query(query: str) -> List[str]:
+    """Split a long query into section-aligned chunks of at most CHUNK_WORDS.
+
+    Short queries come back as ``[query]``. Small sections are merged, long
+    ones cut on word boundaries. Past MAX_CHUNKS the middle chunks are dropped:
+    the opening describes the role and the end usually holds the actual ask.
+    """
+    if not is_long_query(query):
+        return [query]
+    chunks: List[str] = []
+    current: List[str] = []
+    for section in _sections(query):
+        words = section.split()
+        if current and len(current) + len(words) > CHUNK_WORDS:
+            chunks.append(" ".join(current))
+            current = []
+        while len(words) > CHUNK_WORDS:
+            chunks.append(" ".join(words[:CHUNK_WORDS]))
+            words = words[CHUNK_WORDS:]
+        current.extend(words)
+    if current:
+        chunks.append(" ".join(current))
+    if len(chunks) > MAX_CHUNKS:
+        chunks = chunks[:MAX_CHUNKS - 1] + chunks[-1:]
+    return chunks or [query]
+
+
+def compact_query(query: str, intent: Intent) -> str:
+    """A short restatement of a long query for BM25 and the reranker.
+
+    Keeps the parsed requirements (skills, duration) and the sentences that
+    mention them or state the ask, in their original order, up to
+    RERANK_QUERY_WORDS. Short queries are returned unchanged.
+    """
+    if not is_long_query(query):
+        return query
+    terms = [t.lower() for t in intent.core_technical_skills or intent.technical_skills] + \
+        [t.lower() for t in intent.behavioral_skills]
+    sentences = [s.strip() for s in _SENTENCE.split(query) if s.strip()]
+    keep = [s for s in sentences if _ASK.search(s) or any(t in s.lower() for t in terms)]
+
+    header = []
+    if terms:
+        header.append("Skills: " + ", ".join(dict.fromkeys(terms)) + ".")
+    if intent.max_duration_minutes:
+        header.append(f"Duration: at most {intent.max_duration_minutes} minutes.")
+
+    words: List[str] = " ".join(header).split()
+    for sentence in keep:
+        sentence_words = sentence.split()
+        if len(words) + len(sentence_words) > RERANK_QUERY_WORDS:
+            break
+        words.extend(sentence_words)
+    return " ".join(words) or " ".join(query.split()[:RERANK_QUERY_WORDS])
@@ -38,12 +38,8 @@ def select_assessments(candidates: List[Dict], intent: Intent,k: int=5) -> List[
     selected:List[Dict] =[]
     used_ids = set()
     
-    if intent.max_duration_minutes is not None:
-        candidates = [
-            c for c in candidates
-            if (c.get("duration") is None) or (c.get("duration") <= intent.max_duration_minutes)
-        ]
-        
+    # Retrieval already filters on duration (PAYLOAD_FILTERS); this only
+    # matters when that filter is turned off.
     pool = [ c for c in candidates if duration_ok(c,intent)]
     if not pool:
         return []
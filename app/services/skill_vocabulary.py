@@ -0,0 +1,238 @@
+import json
+import logging
+import os
+import re
+from typing import Dict, Iterable, List, Tuple
+
+from app.services.intent_service import BEHAVIORAL_KEYWORDS, TECHNICAL_KEYWORDS
+
+logger = logging.getLogger(__name__)
+
+CATALOG_PATH = os.getenv("CATALOG_PATH", "data/catalog_cleaned.json")
+
+TECHNICAL_TEST_TYPES = {"Knowledge & Skills"}
+
+# Surface form -> canonical skill. Canonical forms are the spellings used in
+# the catalog so the sparse query and core-skill checks hit catalog text.
+SYNONYMS = {
+    "js": "javascript",
+    "ecmascript": "javascript",
+    "ts": "typescript",
+    "nodejs": "node.js",
+    "node js": "node.js",
+    "react.js": "reactjs",
+    "react js": "reactjs",
+    "angular.js": "angularjs",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "c sharp": "c#",
+    "csharp": "c#",
+    "cpp": "c++",
+    "dotnet": ".net",
+    "vb": "vb.net",
+    "ml": "machine learning",
+    "data scientist": "data science",
+    "ai": "artificial intelligence",
+    "nlp": "natural language processing",
+    "plsql": "pl/sql",
+    "pl sql": "pl/sql",
+    "j2ee": "java ee",
+    "jee": "java ee",
+    "rest api": "restful web services",
+    "rest apis": "restful web services",
+    "ms office": "microsoft office",
+    "sklearn": "scikit-learn",
+    "team work": "teamwork",
+    "team player": "teamwork",
+    "communication skills": "communication",
+    "communicate": "communication",
+    "collaborate": "collaboration",
+    "collaborative": "collaboration",
+    "leader": "leadership",
+    "stakeholders": "stakeholder",
+    "stakeholder management": "stakeholder",
+    "eq": "emotional intelligence",
+}
+
+# Words too common in plain English to be matched on their own; they only
+# count as skills in a qualified form ("c programming", "ms excel").
+AMBIGUOUS_TERMS = {
+    "c", "r", "go", "word", "access", "excel", "outlook", "swing",
+    "prism", "spring", "mobility", "spelling", "typing", "marketing",
+    "basis", "dynamics", "react",
+}
+
+# Trailing words that describe the kind of test rather than the skill.
+GENERIC_SUFFIXES = (
+    "programming", "development", "fundamentals", "fundamental", "concepts",
+    "administration", "essentials", "basics", "operating system",
+)
+VENDOR_PREFIXES = ("microsoft ", "ms ", "apache ", "adobe ", "ibm ", "oracle ", "sap ")
+
+_PARENS = re.compile(r"\(([^)]*)\)")
+_VERSION = re.compile(r"\s+v?\d[\d.]*$")
+_KNOWLEDGE_OF = re.compile(r"knowledge (?:of|on) (?:the )?(?:concepts of |basics of )?([^.;:]+)")
+# Sub-topics are kept only as 2-3 word phrases: single words from these lists
+# are mostly generic ("design", "arrays", "analysis") and would fire on any JD.
+_TERM_CHARS = re.compile(r"^[a-z0-9#+./-]+(?: [a-z0-9#+./-]+){1,2}$")
+_DESCRIPTION_STOPWORDS = {
+    "the", "a", "an", "of", "in", "on", "for", "to", "with", "its", "their",
+    "and", "or", "like", "such", "as", "various", "basic", "basics", "advanced",
+    "concepts", "knowledge", "ability", "skills", "understanding", "topics",
+    "following", "etc", "different", "common", "related",
+}
+_DESCRIPTION_LEADING_VERBS = {
+    "how", "creating", "create", "carry", "draw", "extract", "apply", "applying",
+    "using", "use", "developing", "design", "generation", "communicating",
+    "correct", "handling", "writing", "working", "perform", "performing",
+    "need", "within",
+}
+
+
+def _clean_name(name: str) -> Tuple[str, List[str]]:
+    """Strip level/version noise from a catalog name; return it and any
+    acronyms given in parentheses, e.g. "Amazon Web Services (AWS)"."""
+    acronyms = [a.lower() for a in _PARENS.findall(name) if re.fullmatch(r"[A-Z][A-Za-z0-9 ]{1,9}", a.strip())
+                and a.strip().upper() == a.strip()]
+    text = _PARENS.sub(" ", name).split(" - ")[0].lower()
+    text = re.sub(r"\s+", " ", text).strip()
+    text = _VERSION.sub("", text).strip()
+    return text, [a.strip() for a in acronyms]
+
+
+def _strip_generic(term: str) -> str:
+    for suffix in GENERIC_SUFFIXES:
+        if term.endswith(" " + suffix):
+            return term[: -len(suffix) - 1]
+    return term
+
+
+def _strip_vendor(term: str) -> str:
+    for prefix in VENDOR_PREFIXES:
+        if term.startswith(prefix) and len(term) > len(prefix) + 1:
+            return term[len(prefix):]
+    return term
+
+
+def _description_terms(description: str) -> Iterable[str]:
+    match = _KNOWLEDGE_OF.search(description.lower())
+    if not match:
+        return []
+    terms = []
+    for part in re.split(r",|\band\b", match.group(1)):
+        words = [w for w in part.split() if w not in _DESCRIPTION_STOPWORDS]
+        term = " ".join(words)
+        if words and words[0] not in _DESCRIPTION_LEADING_VERBS and _TERM_CHARS.match(term):
+            terms.append(term)
+    return terms
+
+
+def mine_catalog_vocabulary(catalog: List[dict]) -> Dict[str, str]:
+    """Surface form -> canonical technical skill, from Knowledge & Skills items.
+
+    Catalog names give the canonical skill (level, version and "programming"/
+    vendor noise stripped) plus their full name and acronyms as aliases; the
+    "measures the knowledge of ..." lists in descriptions add sub-topics.
+    """
+    vocabulary: Dict[str, str] = {}
+    for item in catalog:
+        if not TECHNICAL_TEST_TYPES & set(item.get("test_type") or []):
+            continue
+        name, acronyms = _clean_name(item.get("name") or "")
+        if not name:
+            continue
+        canonical = _strip_vendor(_VERSION.sub("", _strip_generic(name)))
+        if canonical in AMBIGUOUS_TERMS:
+            canonical = name
+        for form in {name, _strip_generic(name), canonical, *acronyms}:
+            vocabulary.setdefault(form, canonical)
+        for term in _description_terms(item.get("description") or ""):
+            vocabulary.setdefault(term, term)
+    return vocabulary
+
+
+def load_vocabulary(catalog_path: str = CATALOG_PATH) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Return (technical, behavioral) surface form -> canonical maps."""
+    technical = {term: term for term in TECHNICAL_KEYWORDS}
+    try:
+        with open(catalog_path, "r", encoding="utf-8") as f:
+            technical.update(mine_catalog_vocabulary(json.load(f)))
+    except OSError:
+        logger.warning("Catalog %s not found; skill matching uses the seed vocabulary only", catalog_path)
+    behavioral = {term: term for term in BEHAVIORAL_KEYWORDS}
+    # "Time Management" is a Knowledge & Skills test but a behavioral ask.
+    technical = {s: c for s, c in technical.items() if c not in behavioral}
+
+    for surface, canonical in SYNONYMS.items():
+        if canonical in behavioral:
+            behavioral[surface] = canonical
+        else:
+            technical[surface] = canonical
+    for vocabulary in (technical, behavioral):
+        for term in AMBIGUOUS_TERMS:
+            vocabulary.pop(term, None)
+    return technical, behavioral
+
+
+def _normalize(surface: str) -> str:
+    # Spaces and hyphens are interchangeable: "problem-solving" == "problem solving".
+    return re.sub(r"[\s\-]+", " ", surface)
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """Compile terms into a regex shaped like a character trie.
+
+    Python's regex engine tries alternation branches one by one, so a flat
+    "a|b|c..." over hundreds of terms costs O(vocabulary) at every word start;
+    sharing prefixes makes it one branch per distinct next character. Longer
+    continuations are tried first, so the longest term wins.
+    """
+    trie: dict = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node: dict) -> str:
+        branches = [
+            (r"[\s\-]+" if char == " " else re.escape(char)) + render(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            body = (body if len(branches) == 1 and len(body) == 1 else "(?:" + body + ")") + "?"
+        return body
+
+    return render(trie)
+
+
+class SkillMatcher:
+    """Single-pass, word-boundary-aware matcher over the skill vocabulary.
+
+    All surface forms are compiled once into a single trie-shaped pattern, so
+    a scan picks the longest skill at each position ("javascript" over "java",
+    "sql server" over "sql"), never matches inside a word ("mysql") and costs
+    about the same however large the vocabulary grows.
+    """
+
+    def __init__(self, technical: Dict[str, str], behavioral: Dict[str, str]):
+        self.canonical: Dict[str, Tuple[str, str]] = {}
+        for kind, vocabulary in (("technical", technical), ("behavioral", behavioral)):
+            for surface, canonical in vocabulary.items():
+                self.canonical.setdefault(_normalize(surface), (kind, canonical))
+        self.pattern = re.compile(rf"(?<![\w#+.])(?:{_trie_pattern(self.canonical)})(?![\w#+]|\.\w)")
+
+    def match(self, text: str) -> Tuple[List[str], List[str]]:
+        hits = {"technical": [], "behavioral": []}
+        for m in self.pattern.finditer(text.lower()):
+            kind, canonical = self.canonical[_normalize(m.group(0))]
+            if canonical not in hits[kind]:
+                hits[kind].append(canonical)
+        return hits["technical"], hits["behavioral"]
+
+
+def build_matcher(catalog_path: str = CATALOG_PATH) -> SkillMatcher:
+    return SkillMatcher(*load_vocabulary(catalog_path))
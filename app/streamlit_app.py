@@ -1,8 +1,18 @@
+import json
+import time
+
 import streamlit as st
 import requests
 
 API_URL = "https://shl-5osm.onrender.com/"
 
+STAGE_LABELS = {
+    "provisional": "Early matches (refining...)",
+    "retrieved": "Retrieved matches (reranking...)",
+    "reranked": "Reranked matches (balancing...)",
+    "final": "Final recommendations",
+}
+
 st.set_page_config(page_title="SHL Recommender", layout="wide")
 st.title("SHL Assessment Recommender")
 
@@ -11,6 +21,39 @@ with st.sidebar:
     top_k = st.slider("Retrieval top_k", min_value=5, max_value=200, value=50)
     final_k = st.slider("Final recommendations (k)", min_value=1, max_value=20, value=5)
 
+
+def render_results(results):
+    for i, r in enumerate(results, 1):
+        st.markdown(f"### {i}. {r.get('name') or r.get('url')}")
+
+        cols = st.columns([3, 1, 1])
+
+        with cols[0]:
+            if r.get("description"):
+                st.write(r["description"])
+            if r.get("url"):
+                st.markdown(f"**URL:** [{r['url']}]({r['url']})")
+
+        with cols[1]:
+            st.write(f"**Type:** {r.get('test_type', '—')}")
+
+        with cols[2]:
+            st.write(f"**Duration:** {r.get('duration', '—')}")
+
+
+def render_intent(intent):
+    skills = intent.get("core_technical_skills") or intent.get("technical_skills") or []
+    behavioral = intent.get("behavioral_skills") or []
+    parts = []
+    if skills:
+        parts.append(f"**Technical:** {', '.join(skills)}")
+    if behavioral:
+        parts.append(f"**Behavioral:** {', '.join(behavioral)}")
+    if intent.get("max_duration_minutes"):
+        parts.append(f"**Max duration:** {intent['max_duration_minutes']} min")
+    st.caption(" · ".join(parts) or "No explicit skills detected")
+
+
 st.write("Enter a job description, role, or short query and click **Recommend**.")
 query = st.text_area("Query / Job Description", height=200)
 
@@ -18,45 +61,53 @@ if st.button("Recommend"):
     if not query.strip():
         st.warning("Please enter a query or job description.")
     else:
-        with st.spinner("Generating recommendations..."):
-            try:
-                payload = {
-                    "query": query,
-                    "top_k": top_k,
-                    "final_k": final_k
-                }
-                response = requests.post(
-                    f"{API_URL}/recommend",
-                    json=payload,
-                    timeout=60
-                )
-                response.raise_for_status()
-                data = response.json()
-                results = data.get("recommended_assessments", [])
-            except Exception as e:
-                st.error(f"Failed to fetch recommendations: {e}")
-                results = []
-
-        if not results:
-            st.info("No recommendations found.")
-        else:
-            st.success(f"Found {len(results)} recommendation(s)")
-            for i, r in enumerate(results, 1):
-                st.markdown(f"### {i}. {r.get('name') or r.get('url')}")
+        status = st.empty()
+        intent_slot = st.empty()
+        results_slot = st.empty()
+        results = []
+        first_result_s = None
+        started = time.perf_counter()
 
-                cols = st.columns([3, 1, 1])
+        status.info("Parsing query...")
+        try:
+            payload = {
+                "query": query,
+                "top_k": top_k,
+                "final_k": final_k
+            }
+            with requests.post(
+                f"{API_URL}/recommend/stream",
+                json=payload,
+                stream=True,
+                timeout=60
+            ) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    stage = event.get("event")
 
-                with cols[0]:
-                    if r.get("description"):
-                        st.write(r["description"])
-                    if r.get("url"):
-                        st.markdown(f"**URL:** [{r['url']}]({r['url']})")
+                    if stage in ("intent", "enriched_intent"):
+                        with intent_slot.container():
+                            render_intent(event.get("intent", {}))
+                        continue
 
-                with cols[1]:
-                    st.write(f"**Type:** {r.get('test_type', '—')}")
+                    results = event.get("recommended_assessments", [])
+                    if first_result_s is None and results:
+                        first_result_s = time.perf_counter() - started
+                    status.info(STAGE_LABELS.get(stage, stage))
+                    with results_slot.container():
+                        render_results(results)
+        except Exception as e:
+            st.error(f"Failed to fetch recommendations: {e}")
 
-                with cols[2]:
-                    st.write(f"**Duration:** {r.get('duration', '—')}")
+        if not results:
+            status.info("No recommendations found.")
+        else:
+            message = f"Found {len(results)} recommendation(s)"
+            if first_result_s is not None:
+                message += f" · first results after {first_result_s:.1f}s"
+            status.success(message)
 
 st.markdown("---")
-
@@ -0,0 +1,76 @@
+"""Fixed vs adaptive candidate depth on the labelled train queries.
+
+Runs run_pipeline for every train query twice, with ADAPTIVE_DEPTH off (every
+leg fetches --top-k) and on (legs start at ADAPTIVE_START_DEPTH and deepen
+only when candidate_depth.deepen_reason asks for it), and reports per mode:
+
+- reranked:    mean candidates sent to the reranker per request
+- depth:       mean depth each request settled at
+- expansions:  deeper rounds, by reason (pool or flat)
+- recall@k:    Recall@final_k against the train labels
+- p50/p95_ms:  request latency
+
+Usage:
+    python -m scripts.benchmark_adaptive_depth
+    python -m scripts.benchmark_adaptive_depth --top-k 80 --final-k 10
+"""
+import argparse
+import json
+import statistics
+import time
+
+from app.core.metrics import STAGE_CANDIDATES
+from app.services import candidate_depth
+from app.services.candidate_depth import DEPTH_EXPANSIONS, RETRIEVAL_DEPTH
+from scripts.evaluate_train import _url_in_relevant, load_ground_truth, normalize_url
+from scripts.full_pipeline import run_pipeline
+
+TRAIN_CSV = "data/train_set.csv"
+
+
+def run_mode(ground_truth: dict, adaptive: bool, top_k: int, final_k: int) -> dict:
+    candidate_depth.ADAPTIVE_DEPTH = adaptive
+    reranked_before = STAGE_CANDIDATES.totals(stage="rerank")[0]
+    depth_before = RETRIEVAL_DEPTH.totals()[0]
+    expansions_before = {r: DEPTH_EXPANSIONS.value(reason=r) for r in ("pool", "flat")}
+
+    latencies, recalls = [], []
+    for query, relevant in ground_truth.items():
+        start = time.perf_counter()
+        results = run_pipeline(query, top_k=top_k, final_k=final_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits = {p for p in (normalize_url(r.get("url") or "") for r in results) if _url_in_relevant(p, relevant)}
+        recalls.append(len(hits) / len(relevant))
+
+    n = len(ground_truth)
+    latencies.sort()
+    return {
+        "reranked": round((STAGE_CANDIDATES.totals(stage="rerank")[0] - reranked_before) / n, 1),
+        "depth": round((RETRIEVAL_DEPTH.totals()[0] - depth_before) / n, 1),
+        "expansions": {r: int(DEPTH_EXPANSIONS.value(reason=r) - before) for r, before in expansions_before.items()},
+        f"recall@{final_k}": round(statistics.mean(recalls), 4),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[int(0.95 * (n - 1))], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top-k", type=int, default=40)
+    parser.add_argument("--final-k", type=int, default=10)
+    args = parser.parse_args()
+
+    ground_truth = load_ground_truth(TRAIN_CSV)
+    # One untimed pass so both modes see warm embedding and enrichment caches.
+    for query in ground_truth:
+        run_pipeline(query, top_k=args.top_k, final_k=args.final_k)
+    report = {
+        "queries": len(ground_truth),
+        "fixed": run_mode(ground_truth, False, args.top_k, args.final_k),
+        "adaptive": run_mode(ground_truth, True, args.top_k, args.final_k),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
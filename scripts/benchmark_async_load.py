@@ -0,0 +1,224 @@
+"""Load benchmark for /recommend against local stand-ins for Gemini, Qdrant and
+ZeroEntropy.
+
+The network clients are swapped for objects that sleep for a fixed latency and
+the result/enrichment caches are bypassed, so the numbers isolate how many
+requests the server can keep in flight. The
+"sync" mode runs the blocking ``run_pipeline`` through Starlette's threadpool,
+which is what a plain ``def`` endpoint does; the "async" mode goes through the
+real ``async def`` endpoint over an in-process ASGI transport.
+
+Usage:
+    python -m scripts.benchmark_async_load --concurrency 50 200
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import statistics
+import time
+from types import SimpleNamespace
+
+import httpx
+from qdrant_client.http.models import QueryResponse, ScoredPoint
+from starlette.concurrency import run_in_threadpool
+
+from app.core.container import container
+from app.main import app
+from app.services.enrichment_cache import enrichment_cache
+from scripts.full_pipeline import run_pipeline
+
+CATALOG_PATH = "data/catalog_cleaned.json"
+QUERIES = [
+    "Java developer",
+    "Leadership and communication skills",
+    "Cognitive ability test",
+    "Short assessment under 30 minutes",
+    "I am hiring for Java developers who can also collaborate effectively with my business teams. Looking for an assessment(s) that can be completed in 40 minutes.",
+]
+
+
+LLM_STAND_IN_RESPONSE = json.dumps({
+    "core_technical_skills": ["java"],
+    "supporting_technical_skills": [],
+    "generic_role_terms": ["developer"],
+    "additional_behavioral_skills": ["collaboration"],
+    "seniority": None,
+    "role_type": "IC",
+    "keyword_importance": {"java": "critical", "collaboration": "context"},
+})
+
+
+class StandInLLM:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.models = SimpleNamespace(generate_content=self._generate)
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content=self._agenerate))
+
+    def _generate(self, model, contents, config=None):
+        time.sleep(self.latency)
+        return SimpleNamespace(text=LLM_STAND_IN_RESPONSE)
+
+    async def _agenerate(self, model, contents, config=None):
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(text=LLM_STAND_IN_RESPONSE)
+
+
+class StandInQdrant:
+    def __init__(self, latency: float, catalog: list[dict]):
+        self.latency = latency
+        self.points = [
+            ScoredPoint(
+                id=idx,
+                version=0,
+                score=1.0 / (idx + 1),
+                payload={
+                    "name": item.get("name"),
+                    "url": item.get("url"),
+                    "description": item.get("description"),
+                    "assessment_duration": item.get("assessment_duration", 0),
+                    "test_type": item.get("test_type", []),
+                    "remote_testing": item.get("remote_testing", "Yes"),
+                },
+            )
+            for idx, item in enumerate(catalog)
+        ]
+
+    def get_collection(self, collection_name, **kwargs):
+        return SimpleNamespace(config=SimpleNamespace(metadata={"index_version": "stand-in"}))
+
+    def query_points(self, collection_name, limit=10, **kwargs):
+        time.sleep(self.latency)
+        return QueryResponse(points=self.points[:limit])
+
+    def query_batch_points(self, collection_name, requests, **kwargs):
+        time.sleep(self.latency)
+        return [QueryResponse(points=self.points[:r.limit]) for r in requests]
+
+
+class AsyncStandInQdrant(StandInQdrant):
+    async def get_collection(self, collection_name, **kwargs):
+        return super().get_collection(collection_name)
+
+    async def query_points(self, collection_name, limit=10, **kwargs):
+        await asyncio.sleep(self.latency)
+        return QueryResponse(points=self.points[:limit])
+
+    async def query_batch_points(self, collection_name, requests, **kwargs):
+        await asyncio.sleep(self.latency)
+        return [QueryResponse(points=self.points[:r.limit]) for r in requests]
+
+
+def _rerank_response(documents):
+    return SimpleNamespace(results=[
+        SimpleNamespace(index=i, relevance_score=1.0 / (i + 1))
+        for i in range(len(documents))
+    ])
+
+
+class StandInZeroEntropy:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.models = SimpleNamespace(rerank=self._rerank)
+
+    def _rerank(self, model, query, documents):
+        time.sleep(self.latency)
+        return _rerank_response(documents)
+
+
+class AsyncStandInZeroEntropy(StandInZeroEntropy):
+    async def _rerank(self, model, query, documents):
+        await asyncio.sleep(self.latency)
+        return _rerank_response(documents)
+
+
+def install_stand_ins(llm_latency: float, qdrant_latency: float, rerank_latency: float):
+    with open(CATALOG_PATH, "r", encoding="utf-8") as f:
+        catalog = json.load(f)
+
+    container.override("genai", StandInLLM(llm_latency))
+    container.override("qdrant", StandInQdrant(qdrant_latency, catalog))
+    container.override("qdrant_async", AsyncStandInQdrant(qdrant_latency, catalog))
+    container.override("zeroentropy", StandInZeroEntropy(rerank_latency))
+    container.override("zeroentropy_async", AsyncStandInZeroEntropy(rerank_latency))
+
+
+def disable_caches():
+    # Every request should pay for the full pipeline: keep the enrichment memo
+    # out of the way (and unpolluted) and give each request a distinct query so
+    # the /recommend result cache never hits or coalesces.
+    enrichment_cache.path = ""
+
+
+def bench_query(i: int) -> str:
+    return f"{QUERIES[i % len(QUERIES)]} (request {i})"
+
+
+async def _timed(coro):
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+async def run_sync_mode(concurrency: int, total: int, top_k: int):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        q = bench_query(i)
+        async with sem:
+            return await _timed(run_in_threadpool(run_pipeline, q, top_k, 10))
+
+    return await asyncio.gather(*[one(i) for i in range(total)])
+
+
+async def run_async_mode(concurrency: int, total: int, top_k: int):
+    transport = httpx.ASGITransport(app=app)
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits, timeout=None) as http:
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(i):
+            q = bench_query(i)
+            payload = {"query": q, "top_k": top_k, "final_k": 10}
+            async with sem:
+                return await _timed(http.post("/recommend", json=payload))
+
+        return await asyncio.gather(*[one(i) for i in range(total)])
+
+
+def report(mode: str, concurrency: int, latencies: list[float], wall: float):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))]
+    print(
+        f"{mode:>5} | concurrency={concurrency:<4} | requests={len(latencies):<5} | "
+        f"throughput={len(latencies) / wall:8.1f} req/s | "
+        f"p50={p50 * 1000:8.1f} ms | p99={p99 * 1000:8.1f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument("--top-k", type=int, default=40)
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--qdrant-latency", type=float, default=0.05)
+    parser.add_argument("--rerank-latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    install_stand_ins(args.llm_latency, args.qdrant_latency, args.rerank_latency)
+    disable_caches()
+
+    for concurrency in args.concurrency:
+        total = concurrency * args.rounds
+        for mode, runner in (("sync", run_sync_mode), ("async", run_async_mode)):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                latencies = await runner(concurrency, total, args.top_k)
+            report(mode, concurrency, latencies, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
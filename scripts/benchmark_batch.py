@@ -0,0 +1,85 @@
+"""Compare one /recommend/batch pipeline run against N single pipeline runs.
+
+Queries come from the train/test CSVs. Single runs are issued one after the
+other, the way a client looping over /recommend would; their stage durations
+are summed so each row lines up with the same stage of the batch run.
+
+Usage:
+    python -m scripts.benchmark_batch --limit 20
+    python -m scripts.benchmark_batch --stand-ins
+"""
+import argparse
+import asyncio
+import contextlib
+import csv
+import io
+from collections import defaultdict
+
+from app.core.timing import StageTimer
+from scripts.benchmark_async_load import disable_caches, install_stand_ins
+from scripts.full_pipeline import run_pipeline_async, run_pipeline_batch_async
+
+QUERY_FILES = ["data/train_set.csv", "data/test_set.csv"]
+
+
+def load_queries(limit: int) -> list[str]:
+    queries = []
+    for path in QUERY_FILES:
+        with open(path, "r", encoding="cp1252") as f:
+            for row in csv.DictReader(f):
+                q = row["Query"].strip()
+                if q not in queries:
+                    queries.append(q)
+    return queries[:limit]
+
+
+async def run_singles(queries, top_k, final_k):
+    totals = defaultdict(float)
+    wall = 0.0
+    for q in queries:
+        timer = StageTimer(pipeline="batch")
+        await run_pipeline_async(q, top_k=top_k, final_k=final_k, timer=timer)
+        report = timer.report()
+        wall += report["wall_ms"]
+        for name, stage in report["stages"].items():
+            totals[name] += stage["duration_ms"]
+    return totals, wall
+
+
+async def run_batch(queries, top_k, final_k):
+    timer = StageTimer(pipeline="batch")
+    await run_pipeline_batch_async(queries, top_k=top_k, final_k=final_k, timer=timer)
+    report = timer.report()
+    return {name: s["duration_ms"] for name, s in report["stages"].items()}, report["wall_ms"]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=40)
+    parser.add_argument("--final-k", type=int, default=10)
+    parser.add_argument("--stand-ins", action="store_true",
+                        help="use the fixed-latency provider stand-ins from benchmark_async_load")
+    args = parser.parse_args()
+
+    # The singles run first; without this the batch would reuse their cached
+    # LLM enrichments.
+    disable_caches()
+    if args.stand_ins:
+        install_stand_ins(llm_latency=1.0, qdrant_latency=0.05, rerank_latency=0.3)
+
+    queries = load_queries(args.limit)
+    with contextlib.redirect_stdout(io.StringIO()):
+        single_stages, single_wall = await run_singles(queries, args.top_k, args.final_k)
+        batch_stages, batch_wall = await run_batch(queries, args.top_k, args.final_k)
+
+    print(f"{len(queries)} queries")
+    print(f"{'stage':<20} {'N singles (ms)':>16} {'batch (ms)':>12}")
+    for name in sorted(set(single_stages) | set(batch_stages)):
+        print(f"{name:<20} {single_stages.get(name, 0.0):>16.1f} {batch_stages.get(name, 0.0):>12.1f}")
+    print(f"{'wall':<20} {single_wall:>16.1f} {batch_wall:>12.1f}")
+    print(f"{'per query':<20} {single_wall / len(queries):>16.1f} {batch_wall / len(queries):>12.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+"""Embedded index vs hosted Qdrant: ranking parity and latency.
+
+Embeds every train/test query once, then sends the same dense, sparse,
+hybrid (RRF) and filtered-hybrid requests to the Qdrant collection and to the
+embedded index artifact, and reports for each leg how often the two return
+the same ids in the same order (exact ties compared as sets), the mean top-K overlap, and median query
+latency. Build the artifact first with ``python -m scripts.upload_to_qdrant``.
+
+Usage:
+    python -m scripts.benchmark_embedded_index
+    python -m scripts.benchmark_embedded_index --top-k 50
+"""
+import argparse
+import csv
+import json
+import statistics
+import time
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import RrfQuery
+
+from app.retrieval.embedded_index import EmbeddedIndex
+from app.retrieval.qdrant_search import (
+    COLLECTION_NAME, EMBEDDED_INDEX_PATH, QDRANT_API_KEY, QDRANT_URL, RRF_K,
+    build_qdrant_filter_from_intent, dense_query_args, embed_dense_chunks, embed_sparse, hybrid_prefetch,
+)
+from app.services.intent_service import parse_intent
+
+QUERY_FILES = ["data/train_set.csv", "data/test_set.csv"]
+
+
+def load_queries() -> list[str]:
+    queries = []
+    for path in QUERY_FILES:
+        with open(path, "r", encoding="cp1252") as f:
+            queries.extend(row["Query"].strip() for row in csv.DictReader(f))
+    return list(dict.fromkeys(queries))
+
+
+def requests_for(query: str, top_k: int) -> dict:
+    intent = parse_intent(query)
+    dense_vectors = embed_dense_chunks([query])[0]
+    sparse_vector = embed_sparse(query, intent)
+    hybrid = {"prefetch": hybrid_prefetch(dense_vectors, sparse_vector, top_k), "query": RrfQuery(rrf={"k": RRF_K})}
+    return {
+        "dense": dense_query_args(dense_vectors, top_k),
+        "sparse": {"query": sparse_vector, "using": "sparse"},
+        "hybrid": hybrid,
+        "hybrid_filtered": {**hybrid, "query_filter": build_qdrant_filter_from_intent(intent)},
+    }
+
+
+def timed_ids(client, request: dict, top_k: int):
+    start = time.perf_counter()
+    response = client.query_points(collection_name=COLLECTION_NAME, limit=top_k, with_payload=True, **request)
+    elapsed = (time.perf_counter() - start) * 1000
+    # Qdrant does not define an order among exactly tied scores (duplicate
+    # catalog entries), so ties are compared as sets.
+    ranked = sorted(response.points, key=lambda p: (-round(p.score, 5), str(p.id)))
+    return [p.id for p in ranked], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top-k", type=int, default=50)
+    args = parser.parse_args()
+
+    clients = {
+        "qdrant": QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY),
+        "embedded": EmbeddedIndex(EMBEDDED_INDEX_PATH),
+    }
+    rows = {}
+    for query in load_queries():
+        for leg, request in requests_for(query, args.top_k).items():
+            ids, latency = {}, {}
+            for name, client in clients.items():
+                ids[name], latency[name] = timed_ids(client, request, args.top_k)
+            stats = rows.setdefault(leg, {"identical": [], "overlap": [], "qdrant_ms": [], "embedded_ms": []})
+            stats["identical"].append(ids["qdrant"] == ids["embedded"])
+            union = set(ids["qdrant"]) | set(ids["embedded"])
+            stats["overlap"].append(len(set(ids["qdrant"]) & set(ids["embedded"])) / len(union) if union else 1.0)
+            stats["qdrant_ms"].append(latency["qdrant"])
+            stats["embedded_ms"].append(latency["embedded"])
+
+    report = {
+        leg: {
+            "queries": len(stats["identical"]),
+            "identical_order_rate": round(sum(stats["identical"]) / len(stats["identical"]), 3),
+            "mean_overlap": round(statistics.mean(stats["overlap"]), 4),
+            "qdrant_p50_ms": round(statistics.median(stats["qdrant_ms"]), 2),
+            "embedded_p50_ms": round(statistics.median(stats["embedded_ms"]), 3),
+        }
+        for leg, stats in rows.items()
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
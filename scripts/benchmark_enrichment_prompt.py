@@ -0,0 +1,86 @@
+"""Full vs compact LLM enrichment prompt on the train set.
+
+For every prompt variant this runs the full pipeline over the labelled train
+queries with the enrichment cache and the local intent model bypassed, so
+every query goes to the LLM, and reports:
+
+- prompt/output tokens per call (from the provider's usage metadata)
+- median and p90 enrichment latency
+- parse-failure rate (invalid JSON or a reply that fails schema validation)
+  and call-failure rate
+- downstream Recall@K
+
+Usage:
+    python -m scripts.benchmark_enrichment_prompt
+    python -m scripts.benchmark_enrichment_prompt --variants compact --k 10
+"""
+import argparse
+import json
+import statistics
+
+from app.core.llm_client import LLM_MODEL, structured_output_enabled
+from app.core.metrics import ENRICHMENT_FALLBACKS, LLM_TOKENS
+from app.core.timing import StageTimer
+from app.services import intent_enrichment
+from app.services.enrichment_cache import enrichment_cache
+from scripts.evaluate_train import _url_in_relevant, load_ground_truth, normalize_url
+from scripts.full_pipeline import run_pipeline
+
+TRAIN_CSV = "data/train_set.csv"
+
+
+def recall(final, relevant: set, k: int) -> float:
+    predicted = {normalize_url(c.get("url") or "") for c in final[:k]}
+    hits = {p for p in predicted if _url_in_relevant(p, relevant)}
+    return len(hits) / len(relevant) if relevant else 0.0
+
+
+def run_variant(variant: str, ground_truth: dict, top_k: int, k: int) -> dict:
+    intent_enrichment.ENRICHMENT_PROMPT_VARIANT = variant
+    tokens = {kind: LLM_TOKENS.value(model=LLM_MODEL, kind=kind) for kind in ("prompt", "output")}
+    failures = {reason: ENRICHMENT_FALLBACKS.value(reason=reason) for reason in ("call", "parse")}
+
+    latencies, recalls = [], []
+    for query, relevant in ground_truth.items():
+        timer = StageTimer("benchmark")
+        final = run_pipeline(query, top_k=top_k, final_k=k, timer=timer)
+        start, end = timer.spans["enrich_with_llm"]
+        latencies.append((end - start) * 1000)
+        recalls.append(recall(final, relevant, k))
+
+    n = len(latencies)
+    return {
+        "variant": variant,
+        "queries": n,
+        "prompt_tokens_per_call": round((LLM_TOKENS.value(model=LLM_MODEL, kind="prompt") - tokens["prompt"]) / n, 1),
+        "output_tokens_per_call": round((LLM_TOKENS.value(model=LLM_MODEL, kind="output") - tokens["output"]) / n, 1),
+        "enrich_p50_ms": round(statistics.median(latencies), 1),
+        "enrich_p90_ms": round(statistics.quantiles(latencies, n=10)[-1], 1) if n > 1 else round(latencies[0], 1),
+        "parse_failure_rate": round((ENRICHMENT_FALLBACKS.value(reason="parse") - failures["parse"]) / n, 3),
+        "call_failure_rate": round((ENRICHMENT_FALLBACKS.value(reason="call") - failures["call"]) / n, 3),
+        f"recall@{k}": round(statistics.mean(recalls), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--variants", nargs="+", default=["full", "compact"])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--top-k", type=int, default=50)
+    args = parser.parse_args()
+
+    # Every query must reach the LLM for the comparison to mean anything.
+    enrichment_cache.path = ""
+    intent_enrichment.LOCAL_INTENT_MIN_CONFIDENCE = 2.0
+
+    ground_truth = load_ground_truth(TRAIN_CSV)
+    report = {
+        "model": LLM_MODEL,
+        "structured_output": structured_output_enabled(),
+        "variants": [run_variant(v, ground_truth, args.top_k, args.k) for v in args.variants],
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Response bytes and hydration time: payload fetch vs catalog-store hydration.
+
+For every labelled train query this sends the same hybrid request twice, once
+with ``with_payload=True`` and once ids/scores only, and reports per query:
+
+- response_kb:   size of the serialized query response
+- query_ms:      median query latency
+- hydrate_us:    median time to turn the points into candidate dicts
+                 (from the payloads vs from the in-process catalog store)
+
+It also checks that both modes produce the same candidates. The collection
+must have been built from the current catalog (see CatalogStore.serves).
+
+Usage:
+    python -m scripts.benchmark_hydration
+    python -m scripts.benchmark_hydration --top-k 200
+"""
+import argparse
+import json
+import statistics
+import time
+
+from qdrant_client.models import RrfQuery
+
+from app.core.container import container
+from app.retrieval.qdrant_search import (
+    COLLECTION_NAME, RRF_K, build_qdrant_filter_from_intent, embed_dense_chunks, embed_sparse, get_index_version,
+    hybrid_prefetch, to_candidates,
+)
+from app.services.intent_service import parse_intent
+from scripts.evaluate_train import load_ground_truth
+
+TRAIN_CSV = "data/train_set.csv"
+
+
+def timed_query(query, intent, top_k: int, with_payload: bool):
+    request = {
+        "prefetch": hybrid_prefetch(embed_dense_chunks([query])[0], embed_sparse(query, intent), top_k,
+                                    build_qdrant_filter_from_intent(intent)),
+        "query": RrfQuery(rrf={"k": RRF_K}),
+        "limit": top_k,
+    }
+    start = time.perf_counter()
+    response = container.get("qdrant").query_points(
+        collection_name=COLLECTION_NAME, with_payload=with_payload, **request)
+    query_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    candidates = to_candidates(response.points)
+    hydrate_us = (time.perf_counter() - start) * 1e6
+    return candidates, {
+        "response_kb": len(response.model_dump_json()) / 1024,
+        "query_ms": query_ms,
+        "hydrate_us": hydrate_us,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    version = get_index_version()
+    store = container.get("catalog_store")
+    if not store.serves(version):
+        raise SystemExit(f"Index version {version} was not built from catalog {store.fingerprint}; re-upload first")
+
+    rows = {"payload": [], "catalog_store": []}
+    mismatches = 0
+    queries = list(load_ground_truth(TRAIN_CSV))
+    for query in queries:
+        intent = parse_intent(query)
+        for _ in range(args.repeats):
+            from_payload, payload_row = timed_query(query, intent, args.top_k, with_payload=True)
+            hydrated, store_row = timed_query(query, intent, args.top_k, with_payload=False)
+            rows["payload"].append(payload_row)
+            rows["catalog_store"].append(store_row)
+        mismatches += from_payload != hydrated
+
+    report = {"index_version": version, "queries": len(queries), "top_k": args.top_k, "mismatches": mismatches}
+    for mode, mode_rows in rows.items():
+        report[mode] = {
+            "response_kb": round(statistics.mean(r["response_kb"] for r in mode_rows), 2),
+            "query_p50_ms": round(statistics.median(r["query_ms"] for r in mode_rows), 3),
+            "hydrate_p50_us": round(statistics.median(r["hydrate_us"] for r in mode_rows), 1),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
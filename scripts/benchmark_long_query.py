@@ -0,0 +1,116 @@
+"""Single-vector vs chunked multi-vector retrieval, bucketed by query length.
+
+For every labelled train query this runs the dense leg and the hybrid
+(dense + BM25, RRF) search twice against the live collection:
+
+- single:  the whole query as one MiniLM vector (truncated at 256 word
+           pieces) and the raw query as the BM25 fallback
+- chunked: one vector per JD chunk fused server-side in the same request, and
+           the compact query as the BM25 fallback
+
+and reports Recall@K and median embed/query latency per length bucket.
+Intent comes from parse_intent only, so no LLM calls are made.
+
+Usage:
+    python -m scripts.benchmark_long_query
+    python -m scripts.benchmark_long_query --k 10 --top-k 50
+"""
+import argparse
+import statistics
+import time
+from collections import defaultdict
+
+from qdrant_client.models import RrfQuery, SparseVector
+
+from app.core.container import container
+from app.retrieval.qdrant_search import (
+    COLLECTION_NAME, RRF_K, build_sparse_query, embed_dense_chunks, embed_sparse,
+    hybrid_prefetch, query_dense, to_candidates,
+)
+from app.services.intent_service import parse_intent
+from scripts.evaluate_train import _url_in_relevant, load_ground_truth, normalize_url
+
+TRAIN_CSV = "data/train_set.csv"
+BUCKETS = [(0, 50), (51, 150), (151, 400), (401, None)]
+
+
+def bucket_of(words: int) -> str:
+    for low, high in BUCKETS:
+        if high is None or words <= high:
+            return f"{low}-{high}" if high else f"{low}+"
+    return ""
+
+
+def embed_single(query: str, intent):
+    dense = [next(container.get("dense_model").embed([query]))]
+    sparse = next(container.get("sparse_model").embed([build_sparse_query(intent) or query]))
+    return dense, SparseVector(indices=sparse.indices, values=sparse.values)
+
+
+def embed_chunked(query: str, intent):
+    return embed_dense_chunks([query])[0], embed_sparse(query, intent)
+
+
+def hybrid(dense_vectors, sparse_vector, top_k: int):
+    response = container.get("qdrant").query_points(
+        collection_name=COLLECTION_NAME,
+        prefetch=hybrid_prefetch(dense_vectors, sparse_vector, top_k),
+        query=RrfQuery(rrf={"k": RRF_K}),
+        limit=top_k,
+        with_payload=True,
+    )
+    return to_candidates(response.points)
+
+
+def recall(candidates, relevant: set, k: int) -> float:
+    predicted = {normalize_url(c.get("url") or "") for c in candidates[:k]}
+    hits = {p for p in predicted if _url_in_relevant(p, relevant)}
+    return len(hits) / len(relevant) if relevant else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--top-k", type=int, default=50)
+    args = parser.parse_args()
+
+    ground_truth = load_ground_truth(TRAIN_CSV)
+    rows = defaultdict(lambda: defaultdict(list))
+    for query, relevant in ground_truth.items():
+        intent = parse_intent(query)
+        bucket = bucket_of(len(query.split()))
+        for mode, embed in (("single", embed_single), ("chunked", embed_chunked)):
+            start = time.perf_counter()
+            dense_vectors, sparse_vector = embed(query, intent)
+            embedded = time.perf_counter()
+            dense = query_dense(dense_vectors, args.top_k)
+            queried = time.perf_counter()
+            fused = hybrid(dense_vectors, sparse_vector, args.top_k)
+
+            stats = rows[(bucket, mode)]
+            stats["dense_recall"].append(recall(dense, relevant, args.k))
+            stats["hybrid_recall"].append(recall(fused, relevant, args.k))
+            stats["embed_ms"].append((embedded - start) * 1000)
+            stats["query_ms"].append((queried - embedded) * 1000)
+            stats["vectors"].append(len(dense_vectors))
+
+    print(f"{'words':>8} | {'mode':>7} | {'n':>2} | {'vectors':>7} | "
+          f"{f'dense R@{args.k}':>11} | {f'hybrid R@{args.k}':>12} | {'embed ms':>8} | {'query ms':>8}")
+    for low, high in BUCKETS:
+        bucket = bucket_of(high if high is not None else low)
+        for mode in ("single", "chunked"):
+            stats = rows.get((bucket, mode))
+            if not stats:
+                continue
+            print(
+                f"{bucket:>8} | {mode:>7} | {len(stats['dense_recall']):>2} | "
+                f"{statistics.mean(stats['vectors']):>7.1f} | "
+                f"{statistics.mean(stats['dense_recall']):>11.3f} | "
+                f"{statistics.mean(stats['hybrid_recall']):>12.3f} | "
+                f"{statistics.median(stats['embed_ms']):>8.1f} | "
+                f"{statistics.median(stats['query_ms']):>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
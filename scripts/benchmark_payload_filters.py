@@ -0,0 +1,101 @@
+"""Candidates wasted per request with and without server-side payload filters.
+
+For every labelled train query and each PAYLOAD_FILTERS setting this runs the
+dense and sparse legs with the intent filter inside the query, fuses them and
+applies the core-skill filter as the pipeline does, then reports per request:
+
+- fetched:        candidates returned by both legs
+- rerank_batch:   candidates the reranker would be sent
+- rerank_wasted:  of those, how many select_assessments would drop on duration
+- pool_recall:    share of the relevant assessments among the eligible ones
+- query ms:       median dense + sparse query latency
+
+With --rerank it also reranks and selects, and reports Recall@K of the final
+list. Intent comes from parse_intent unless --enrich is given.
+
+Usage:
+    python -m scripts.benchmark_payload_filters
+    python -m scripts.benchmark_payload_filters --enrich --rerank --top-k 40
+"""
+import argparse
+import json
+import statistics
+import time
+
+from app.retrieval.qdrant_search import (
+    build_qdrant_filter_from_intent, embed_dense_chunks, embed_sparse, query_dense, query_sparse, rrf_fuse,
+)
+from app.reranking.reranker import rerank
+from app.services.intent_enrichment import enrich_with_llm
+from app.services.intent_service import parse_intent
+from app.services.selection_service import duration_ok, select_assessments
+from scripts.evaluate_train import _url_in_relevant, load_ground_truth, normalize_url
+from scripts.full_pipeline import build_rerank_query, filter_core_candidates
+
+TRAIN_CSV = "data/train_set.csv"
+FILTER_SETS = ["none", "duration", "duration,test_type", "duration,job_levels", "duration,test_type,job_levels"]
+
+
+def recall(candidates, relevant: set) -> float:
+    predicted = {normalize_url(c.get("url") or "") for c in candidates}
+    hits = {p for p in predicted if _url_in_relevant(p, relevant)}
+    return len(hits) / len(relevant) if relevant else 0.0
+
+
+def run_query(query, intent, relevant, filters, args) -> dict:
+    query_filter = build_qdrant_filter_from_intent(intent, filters)
+    dense_vectors = embed_dense_chunks([query])[0]
+    sparse_vector = embed_sparse(query, intent)
+
+    start = time.perf_counter()
+    dense = query_dense(dense_vectors, args.top_k, query_filter)
+    sparse = query_sparse(sparse_vector, args.top_k, query_filter)
+    query_ms = (time.perf_counter() - start) * 1000
+
+    pool = filter_core_candidates(rrf_fuse([dense, sparse], top_k=args.top_k), intent)
+    eligible = [c for c in pool if duration_ok(c, intent)]
+    row = {
+        "fetched": len(dense) + len(sparse),
+        "rerank_batch": len(pool),
+        "rerank_wasted": len(pool) - len(eligible),
+        "pool_recall": recall(eligible, relevant),
+        "query_ms": query_ms,
+    }
+    if args.rerank:
+        reranked = rerank(build_rerank_query(query, intent), pool)
+        final = select_assessments(candidates=reranked, intent=intent, k=args.k)
+        row[f"recall@{args.k}"] = recall(final, relevant)
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top-k", type=int, default=40)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--filters", nargs="+", default=FILTER_SETS,
+                        help="PAYLOAD_FILTERS settings to compare ('none' for no filter)")
+    parser.add_argument("--enrich", action="store_true", help="enrich intents (cache, local model, then LLM)")
+    parser.add_argument("--rerank", action="store_true", help="also rerank, select and report final recall")
+    args = parser.parse_args()
+
+    queries = []
+    for query, relevant in load_ground_truth(TRAIN_CSV).items():
+        intent = parse_intent(query)
+        if args.enrich:
+            intent = enrich_with_llm(intent, query)
+        queries.append((query, intent, relevant))
+
+    report = []
+    for setting in args.filters:
+        filters = set() if setting == "none" else {f.strip() for f in setting.split(",")}
+        rows = [run_query(query, intent, relevant, filters, args) for query, intent, relevant in queries]
+        summary = {"filters": setting, "queries": len(rows)}
+        for field in rows[0]:
+            values = [r[field] for r in rows]
+            summary[field] = round(statistics.median(values) if field == "query_ms" else statistics.mean(values), 3)
+        report.append(summary)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Dense quantization settings: retrieval latency, memory and recall.
+
+Copies the embedded index artifact once per quantization (none, scalar int8,
+binary), and for every setting of oversampling / rescoring runs the train
+queries through the hybrid request hybrid_search sends. It reports per setting:
+
+- ram_kb:          dense data searched in memory (the codes when quantized)
+- float_kb:        float vectors, only read to rescore when quantized
+- dense_p50_ms:    median dense-leg latency
+- hybrid_p50_ms:   median hybrid (dense + BM25 + RRF) latency
+- dense_overlap:   share of the exact float top-K the dense leg still returns
+- recall@K:        Recall of the hybrid top-K against data/train_set.csv
+
+With --scale N the dense vectors are tiled (with noise) to N rows and only
+latency, memory and dense_overlap are reported, to see which setting to run
+once the catalog is much larger. Searches run in process on the embedded
+index, which scores codes the way Qdrant does; the hosted collection is
+switched with ``upload_to_qdrant --quantization``.
+
+Usage:
+    python -m scripts.benchmark_quantization
+    python -m scripts.benchmark_quantization --scale 100000 --top-k 50
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import numpy as np
+from qdrant_client.models import QuantizationSearchParams, RrfQuery, SearchParams
+
+from app.retrieval.embedded_index import EmbeddedIndex, write_index, write_quantized
+from app.retrieval.qdrant_search import (
+    COLLECTION_NAME, EMBEDDED_INDEX_PATH, RRF_K, build_qdrant_filter_from_intent, dense_prefetch,
+    embed_dense_chunks, embed_sparse, hybrid_prefetch,
+)
+from app.services.intent_service import parse_intent
+from scripts.evaluate_train import _url_in_relevant, load_ground_truth, normalize_url
+
+TRAIN_CSV = "data/train_set.csv"
+# (quantization, oversampling, rescore)
+SETTINGS = [
+    ("none", None, None),
+    ("scalar", 1.0, False),
+    ("scalar", 1.0, True),
+    ("scalar", 2.0, True),
+    ("binary", 1.0, False),
+    ("binary", 2.0, True),
+    ("binary", 4.0, True),
+    ("binary", 8.0, True),
+]
+
+
+def search_params(oversampling, rescore):
+    if oversampling is None:
+        return SearchParams(quantization=QuantizationSearchParams(ignore=True))
+    return SearchParams(quantization=QuantizationSearchParams(rescore=rescore, oversampling=oversampling))
+
+
+def build_variants(base: str, workdir: str, scale: int | None) -> dict:
+    if scale:
+        source = np.load(os.path.join(base, "dense.npy"))
+        rng = np.random.default_rng(0)
+        dense = source[np.arange(scale) % len(source)] + rng.normal(0, 0.05, (scale, source.shape[1]))
+        base = os.path.join(workdir, "scaled")
+        write_index(base, list(range(scale)), dense, [([], [])] * scale, [{}] * scale, {})
+
+    variants = {}
+    for quantization in dict.fromkeys(q for q, _, _ in SETTINGS):
+        path = os.path.join(workdir, quantization)
+        shutil.copytree(base, path)
+        write_quantized(path, quantization)
+        variants[quantization] = EmbeddedIndex(path)
+    return variants
+
+
+def timed(index, **request):
+    start = time.perf_counter()
+    points = index.query_points(collection_name=COLLECTION_NAME, **request).points
+    return points, (time.perf_counter() - start) * 1000
+
+
+def recall(points, relevant: set) -> float:
+    predicted = {normalize_url((p.payload or {}).get("url") or "") for p in points}
+    hits = {p for p in predicted if _url_in_relevant(p, relevant)}
+    return len(hits) / len(relevant) if relevant else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--scale", type=int, default=None, help="tile the dense vectors to this many rows")
+    args = parser.parse_args()
+
+    queries = []
+    for query, relevant in load_ground_truth(TRAIN_CSV).items():
+        intent = parse_intent(query)
+        dense_vectors = embed_dense_chunks([query])[0]
+        queries.append((dense_vectors, embed_sparse(query, intent), build_qdrant_filter_from_intent(intent), relevant))
+
+    workdir = tempfile.mkdtemp(prefix="quantization-")
+    try:
+        variants = build_variants(EMBEDDED_INDEX_PATH, workdir, args.scale)
+        exact = variants["none"]
+        report = []
+        for quantization, oversampling, rescore in SETTINGS:
+            index = variants[quantization]
+            params = search_params(oversampling, rescore)
+            rows = {"dense_ms": [], "hybrid_ms": [], "dense_overlap": [], "recall": []}
+            for dense_vectors, sparse_vector, query_filter, relevant in queries:
+                leg = dense_prefetch(dense_vectors, args.top_k, search_params=params)
+                reference = dense_prefetch(dense_vectors, args.top_k, search_params=search_params(None, None))
+                points, dense_ms = timed(index, query=leg.query, using=leg.using, prefetch=leg.prefetch,
+                                         search_params=leg.params, limit=args.top_k, with_payload=False)
+                truth, _ = timed(exact, query=reference.query, using=reference.using, prefetch=reference.prefetch,
+                                 search_params=reference.params, limit=args.top_k, with_payload=False)
+                rows["dense_ms"].append(dense_ms)
+                rows["dense_overlap"].append(len({p.id for p in points} & {p.id for p in truth}) / max(len(truth), 1))
+                if args.scale:
+                    continue
+                points, hybrid_ms = timed(
+                    index,
+                    prefetch=hybrid_prefetch(dense_vectors, sparse_vector, args.top_k, query_filter, params),
+                    query=RrfQuery(rrf={"k": RRF_K}),
+                    limit=args.top_k,
+                )
+                rows["hybrid_ms"].append(hybrid_ms)
+                rows["recall"].append(recall(points, relevant))
+
+            summary = {
+                "quantization": quantization,
+                "oversampling": oversampling,
+                "rescore": rescore,
+                "ram_kb": round((index.codes if index.codes is not None else index.dense).nbytes / 1024, 1),
+                "float_kb": round(index.dense.nbytes / 1024, 1),
+                "dense_p50_ms": round(statistics.median(rows["dense_ms"]), 3),
+                "dense_overlap": round(statistics.mean(rows["dense_overlap"]), 4),
+            }
+            if not args.scale:
+                summary["hybrid_p50_ms"] = round(statistics.median(rows["hybrid_ms"]), 3)
+                summary[f"recall@{args.top_k}"] = round(statistics.mean(rows["recall"]), 4)
+            report.append(summary)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
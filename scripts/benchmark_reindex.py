@@ -0,0 +1,94 @@
+"""Serving latency and errors while upload_to_qdrant rebuilds the index.
+
+Sends hybrid_search requests for the train queries through the serving alias
+from --workers threads: for --warmup seconds, during a full upload_to_qdrant
+run (build, verify, alias switch) and for --cooldown seconds afterwards. Per
+phase it reports the number of queries, errors, empty results and p50/p95/max
+latency. Query embeddings are cached after the first pass, so the numbers are
+the Qdrant round trip. Arguments after ``--`` are passed to upload_to_qdrant.
+
+Usage:
+    python -m scripts.benchmark_reindex
+    python -m scripts.benchmark_reindex --workers 4 -- --quantization scalar
+"""
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+
+from app.retrieval.qdrant_search import hybrid_search
+from app.services.intent_service import parse_intent
+from scripts import upload_to_qdrant
+from scripts.evaluate_train import load_ground_truth
+
+TRAIN_CSV = "data/train_set.csv"
+TOP_K = 50
+
+
+def serve(queries: list, stop: threading.Event, samples: list):
+    i = 0
+    while not stop.is_set():
+        query, intent = queries[i % len(queries)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            results, error = len(hybrid_search(query, intent, TOP_K)), None
+        except Exception as e:
+            results, error = 0, repr(e)
+        samples.append((start, (time.perf_counter() - start) * 1000, results, error))
+
+
+def summarize(samples: list) -> dict:
+    latencies = sorted(ms for _, ms, _, error in samples if error is None)
+    return {
+        "queries": len(samples),
+        "errors": sum(error is not None for *_, error in samples),
+        "empty": sum(results == 0 for _, _, results, error in samples if error is None),
+        "p50_ms": round(statistics.median(latencies), 2) if latencies else None,
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 2) if latencies else None,
+        "max_ms": round(latencies[-1], 2) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--warmup", type=float, default=10.0)
+    parser.add_argument("--cooldown", type=float, default=10.0)
+    args, upload_args = parser.parse_known_args()
+
+    queries = [(query, parse_intent(query)) for query in load_ground_truth(TRAIN_CSV)]
+    for query, intent in queries:
+        hybrid_search(query, intent, TOP_K)
+
+    samples, stop = [], threading.Event()
+    workers = [threading.Thread(target=serve, args=(queries, stop, samples), daemon=True)
+               for _ in range(args.workers)]
+    for worker in workers:
+        worker.start()
+    time.sleep(args.warmup)
+    build_start = time.perf_counter()
+    sys.argv = ["upload_to_qdrant", *[a for a in upload_args if a != "--"]]
+    try:
+        upload_to_qdrant.main()
+    finally:
+        build_end = time.perf_counter()
+        time.sleep(args.cooldown)
+        stop.set()
+        for worker in workers:
+            worker.join()
+
+    phases = {
+        "before": [s for s in samples if s[0] < build_start],
+        "during": [s for s in samples if build_start <= s[0] < build_end],
+        "after": [s for s in samples if s[0] >= build_end],
+    }
+    report = {"reindex_s": round(build_end - build_start, 1)}
+    report.update({phase: summarize(phase_samples) for phase, phase_samples in phases.items()})
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
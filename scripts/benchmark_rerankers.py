@@ -0,0 +1,114 @@
+"""Hosted vs local rerankers, side by side on the labelled train queries.
+
+Every train query is retrieved once (dense + BM25, RRF, core filter) and the
+same candidate pool is then reranked by each backend in --rerankers (see
+app/reranking/reranker.py). Per backend it reports:
+
+- p50_ms / p95_ms:  rerank latency per query, one query at a time
+- docs_per_s:       candidates scored per second in that sequential pass
+- queries_per_s:    throughput with --concurrency queries in flight (hosted
+                    backends are paced by their <PROVIDER>_RPM limits)
+- recall@k:         Recall@K of the reranked top k, before select_assessments
+
+"fusion" is the RRF order without a reranker. A backend that fails on its
+first call (missing key, SDK or model) is reported with the error and skipped.
+
+Usage:
+    python -m scripts.benchmark_rerankers
+    python -m scripts.benchmark_rerankers --rerankers local fusion --top-k 40 --concurrency 8
+"""
+import argparse
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.reranking.reranker import RERANKERS, load_reranker
+from app.retrieval.qdrant_search import (
+    build_qdrant_filter_from_intent, embed_dense_chunks, embed_sparse, query_dense, query_sparse, rrf_fuse,
+)
+from app.services.intent_enrichment import enrich_with_llm
+from app.services.intent_service import parse_intent
+from scripts.evaluate_train import _url_in_relevant, load_ground_truth, normalize_url
+from scripts.full_pipeline import build_rerank_query, filter_core_candidates, rank_by_fusion
+
+TRAIN_CSV = "data/train_set.csv"
+
+
+def retrieve(query, intent, top_k: int) -> list:
+    query_filter = build_qdrant_filter_from_intent(intent)
+    dense = query_dense(embed_dense_chunks([query])[0], top_k, query_filter)
+    sparse = query_sparse(embed_sparse(query, intent), top_k, query_filter)
+    return filter_core_candidates(rrf_fuse([dense, sparse], top_k=top_k), intent)
+
+
+def recall(candidates, relevant: set, k: int) -> float:
+    predicted = {normalize_url(c.get("url") or "") for c in candidates[:k]}
+    return len({p for p in predicted if _url_in_relevant(p, relevant)}) / len(relevant)
+
+
+def run_backend(rerank, pools: dict, ground_truth: dict, k: int, concurrency: int) -> dict:
+    latencies, recalls, docs = [], [], 0
+    for query, (rerank_query, pool) in pools.items():
+        start = time.perf_counter()
+        reranked = rerank(rerank_query, [dict(c) for c in pool])
+        latencies.append((time.perf_counter() - start) * 1000)
+        recalls.append(recall(reranked, ground_truth[query], k))
+        docs += len(pool)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda item: rerank(item[0], [dict(c) for c in item[1]]), pools.values()))
+    concurrent_s = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 1),
+        "docs_per_s": round(docs / (sum(latencies) / 1000), 1),
+        "queries_per_s": round(len(pools) / concurrent_s, 2),
+        f"recall@{k}": round(statistics.mean(recalls), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rerankers", nargs="+", default=[*RERANKERS, "fusion"],
+                        choices=[*RERANKERS, "fusion"])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--top-k", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--enrich", action="store_true")
+    args = parser.parse_args()
+
+    ground_truth = load_ground_truth(TRAIN_CSV)
+    pools = {}
+    for query in ground_truth:
+        intent = parse_intent(query)
+        if args.enrich:
+            intent = enrich_with_llm(intent, query)
+        pools[query] = (build_rerank_query(query, intent), retrieve(query, intent, args.top_k))
+
+    report = {
+        "queries": len(pools),
+        "mean_pool": round(statistics.mean(len(pool) for _, pool in pools.values()), 1),
+    }
+    for name in args.rerankers:
+        if name == "fusion":
+            rerank = lambda query, candidates: sorted(
+                rank_by_fusion(candidates), key=lambda c: c["rerank_score"], reverse=True)
+        else:
+            rerank = load_reranker(name)[0]
+        rerank_query, pool = next(iter(pools.values()))
+        try:
+            # Also loads a local model, so that is not timed.
+            rerank(rerank_query, [dict(c) for c in pool])
+        except Exception as e:
+            report[name] = {"error": repr(e)}
+            continue
+        report[name] = run_backend(rerank, pools, ground_truth, args.k, args.concurrency)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Micro-benchmark for intent skill matching.
+
+Compares the old per-keyword substring loop with the compiled matcher in
+app.services.skill_vocabulary, over the same catalog-derived vocabulary, on
+inputs from a one-line query up to a pasted multi-KB job description.
+
+Usage:
+    python -m scripts.benchmark_skill_matcher
+    python -m scripts.benchmark_skill_matcher --sizes 200 2000 16000 --repeat 200
+"""
+import argparse
+import time
+
+from app.services.skill_vocabulary import build_matcher, load_vocabulary
+
+JD_PARAGRAPH = (
+    "We are hiring a senior Java developer to join our platform team. You will "
+    "design and build microservices on Spring and Kubernetes, write SQL against "
+    "PostgreSQL, and review JavaScript and TypeScript front-end code. Strong "
+    "communication and stakeholder management skills are essential, as is the "
+    "ability to collaborate with business teams and mentor junior engineers. "
+)
+
+
+def substring_match(text: str, technical: dict, behavioral: dict):
+    text_lower = text.lower()
+    technical_hits = [kw for kw in technical if kw in text_lower]
+    behavioral_hits = [kw for kw in behavioral if kw in text_lower]
+    return technical_hits, behavioral_hits
+
+
+def make_text(size: int) -> str:
+    return (JD_PARAGRAPH * (size // len(JD_PARAGRAPH) + 1))[:size]
+
+
+def per_call_us(fn, text: str, repeat: int) -> float:
+    fn(text)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[80, 500, 2000, 8000, 32000])
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    matcher = build_matcher()
+    build_ms = (time.perf_counter() - start) * 1000
+    technical, behavioral = load_vocabulary()
+    print(f"vocabulary: {len(technical)} technical + {len(behavioral)} behavioral surface forms, "
+          f"matcher built in {build_ms:.1f} ms")
+
+    print(f"{'chars':>7} | {'substring us':>12} | {'compiled us':>11} | {'compiled us/KB':>14} | hits (substring -> compiled)")
+    for size in args.sizes:
+        text = make_text(size)
+        old = per_call_us(lambda t: substring_match(t, technical, behavioral), text, args.repeat)
+        new = per_call_us(matcher.match, text, args.repeat)
+        old_hits = sum(map(len, substring_match(text, technical, behavioral)))
+        new_hits = sum(map(len, matcher.match(text)))
+        print(f"{size:>7} | {old:>12.1f} | {new:>11.1f} | {new / (size / 1024):>14.1f} | {old_hits} -> {new_hits}")
+
+
+if __name__ == "__main__":
+    main()
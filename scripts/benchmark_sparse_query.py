@@ -0,0 +1,113 @@
+"""Repeated-term vs weighted sparse query construction.
+
+For every labelled train query this builds the BM25 query vector with both
+builders (SPARSE_QUERY_BUILDER=repeat and weighted) and reports per builder:
+
+- cold_build_us:        median time to build the vector with an empty
+                        embedding cache (tokenizing and stemming included)
+- seen_skills_build_us: the same after the other train queries were built,
+                        so skills they share are already tokenized
+- query_chars: mean length of the string handed to the tokenizer
+- nonzero:    mean number of non-zero entries in the query vector
+- sparse / hybrid recall@k: Recall@K of the BM25 leg alone and of the
+              dense + BM25 RRF fusion, both with the intent's payload filter
+
+Run without EMBEDDING_CACHE_PATH so cold builds really are cold. Intent comes
+from parse_intent, or from enrich_with_llm with --enrich (which adds the
+keyword_importance classes the weights use).
+
+Usage:
+    python -m scripts.benchmark_sparse_query
+    python -m scripts.benchmark_sparse_query --enrich --k 10 --top-k 50
+"""
+import argparse
+import json
+import statistics
+import time
+
+from app.retrieval import qdrant_search
+from app.retrieval.embedding_cache import embedding_cache
+from app.retrieval.qdrant_search import (
+    build_qdrant_filter_from_intent, build_sparse_query, embed_dense_chunks, embed_sparse,
+    query_dense, query_sparse, rrf_fuse, sparse_plan,
+)
+from app.services.intent_enrichment import enrich_with_llm
+from app.services.intent_service import parse_intent
+from app.services.query_chunking import compact_query
+from scripts.evaluate_train import _url_in_relevant, load_ground_truth, normalize_url
+
+TRAIN_CSV = "data/train_set.csv"
+BUILDERS = ("repeat", "weighted")
+REPEATS = 20
+
+
+def query_text(query, intent, builder: str) -> str:
+    if builder == "repeat":
+        return build_sparse_query(intent) or compact_query(query, intent)
+    return " ".join(sparse_plan(query, intent))
+
+
+def build_time_us(query, intent, others: dict) -> float:
+    """Median build time after the cache was cleared and then warmed with
+    ``others``: empty for a cold build, the other train queries for a new
+    query whose skills were seen before."""
+    samples = []
+    for _ in range(REPEATS):
+        embedding_cache.clear()
+        for other_query, other_intent in others.items():
+            embed_sparse(other_query, other_intent)
+        start = time.perf_counter()
+        embed_sparse(query, intent)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def recall(candidates, relevant, k: int) -> float:
+    predicted = {normalize_url(c.get("url") or "") for c in candidates[:k]}
+    return len({p for p in predicted if _url_in_relevant(p, relevant)}) / len(relevant)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--enrich", action="store_true")
+    args = parser.parse_args()
+
+    ground_truth = load_ground_truth(TRAIN_CSV)
+    intents = {}
+    for query in ground_truth:
+        intent = parse_intent(query)
+        intents[query] = enrich_with_llm(intent, query) if args.enrich else intent
+    dense = {query: query_dense(embed_dense_chunks([query])[0], args.top_k,
+                                build_qdrant_filter_from_intent(intents[query]))
+             for query in ground_truth}
+
+    report = {"queries": len(ground_truth)}
+    for builder in BUILDERS:
+        qdrant_search.SPARSE_QUERY_BUILDER = builder
+        rows = []
+        for query, relevant in ground_truth.items():
+            intent = intents[query]
+            others = {q: i for q, i in intents.items() if q != query}
+            build_us = (build_time_us(query, intent, {}), build_time_us(query, intent, others))
+            vector = embed_sparse(query, intent)
+            sparse = query_sparse(vector, args.top_k, build_qdrant_filter_from_intent(intent))
+            fused = rrf_fuse([dense[query], sparse], top_k=args.top_k)
+            rows.append((build_us, len(query_text(query, intent, builder)), len(vector.indices),
+                         recall(sparse, relevant, args.k), recall(fused, relevant, args.k)))
+        build_us, chars, nonzero, sparse_recall, hybrid_recall = zip(*rows)
+        report[builder] = {
+            "cold_build_us": round(statistics.median(cold for cold, _ in build_us), 1),
+            "seen_skills_build_us": round(statistics.median(seen for _, seen in build_us), 1),
+            "query_chars": round(statistics.mean(chars), 1),
+            "nonzero": round(statistics.mean(nonzero), 1),
+            f"sparse_recall@{args.k}": round(statistics.mean(sparse_recall), 4),
+            f"hybrid_recall@{args.k}": round(statistics.mean(hybrid_recall), 4),
+        }
+    embedding_cache.clear()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Versioned Qdrant collections behind the serving alias.
+
+The API only ever queries COLLECTION_NAME, which is an alias. A full
+``upload_to_qdrant`` run builds ``<alias>-<index version>`` next to the live
+collection, checks it with ``verify_collection`` and then moves the alias in a
+single atomic ``update_collection_aliases`` call, so queries never see a
+half-built index. The previous KEEP_INDEX_VERSIONS - 1 collections are kept
+for rollback.
+
+Usage:
+    python -m scripts.blue_green --list
+    python -m scripts.blue_green --rollback
+    python -m scripts.blue_green --switch shl_assessments-<index version>
+"""
+import argparse
+import os
+import random
+import statistics
+
+from dotenv import load_dotenv
+from qdrant_client import QdrantClient, models
+from qdrant_client.models import RrfQuery
+
+from app.retrieval.qdrant_search import (
+    COLLECTION_NAME, RRF_K, embed_dense_chunks, embed_sparse, hybrid_prefetch,
+)
+from app.services.intent_service import parse_intent
+from scripts.evaluate_train import _url_in_relevant, load_ground_truth, normalize_url
+load_dotenv()
+
+QDRANT_URL = os.getenv("QDRANT_URL")
+QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
+TRAIN_CSV = "data/train_set.csv"
+KEEP_INDEX_VERSIONS = int(os.getenv("KEEP_INDEX_VERSIONS", "2"))
+SMOKE_QUERIES = [
+    "Java developer who can work with stakeholders",
+    "Sales manager with strong communication skills, 30 minutes",
+    "Entry level numerical reasoning test",
+    "Personality assessment for a senior leadership role",
+]
+VERIFY_SAMPLE = 10
+VERIFY_K = 10
+# A new build may score at most this much Recall@K below the live one.
+RECALL_TOLERANCE = float(os.getenv("REINDEX_RECALL_TOLERANCE", "0.02"))
+
+
+def versioned_name(index_version: str) -> str:
+    return f"{COLLECTION_NAME}-{index_version}"
+
+
+def live_collection(client: QdrantClient) -> str | None:
+    """The collection the alias serves, the alias name itself for a pre-alias
+    collection, or None before the first upload."""
+    for alias in client.get_aliases().aliases:
+        if alias.alias_name == COLLECTION_NAME:
+            return alias.collection_name
+    if COLLECTION_NAME in {c.name for c in client.get_collections().collections}:
+        return COLLECTION_NAME
+    return None
+
+
+def versioned_collections(client: QdrantClient) -> list[str]:
+    """Versioned collections, oldest first (index versions end in the upload time)."""
+    names = [c.name for c in client.get_collections().collections if c.name.startswith(f"{COLLECTION_NAME}-")]
+    return sorted(names, key=lambda name: int(name.rsplit("-", 1)[-1]) if name.rsplit("-", 1)[-1].isdigit() else 0)
+
+
+def search(client: QdrantClient, collection: str, query: str, limit: int):
+    intent = parse_intent(query)
+    return client.query_points(
+        collection_name=collection,
+        prefetch=hybrid_prefetch(embed_dense_chunks([query])[0], embed_sparse(query, intent), limit),
+        query=RrfQuery(rrf={"k": RRF_K}),
+        limit=limit,
+        with_payload=["url"],
+    ).points
+
+
+def recall_at_k(client: QdrantClient, collection: str, sample: dict, k: int) -> float:
+    scores = []
+    for query, relevant in sample.items():
+        predicted = {normalize_url((p.payload or {}).get("url") or "") for p in search(client, collection, query, k)}
+        scores.append(len({p for p in predicted if _url_in_relevant(p, relevant)}) / len(relevant))
+    return statistics.mean(scores) if scores else 0.0
+
+
+def verify_collection(client: QdrantClient, collection: str, ids: list, sample_size: int = VERIFY_SAMPLE,
+                      k: int = VERIFY_K) -> list[str]:
+    """Problems that should stop ``collection`` from going live (empty if none).
+
+    Checks the point count and a sample of ids, that every smoke query returns
+    catalog points, and that Recall@K on a sample of the train queries is not
+    below the live collection's.
+    """
+    problems = []
+    count = client.count(collection_name=collection, exact=True).count
+    if count != len(ids):
+        problems.append(f"{count} points, expected {len(ids)}")
+    sample_ids = random.sample(ids, min(20, len(ids)))
+    found = {str(p.id) for p in client.retrieve(collection_name=collection, ids=sample_ids, with_payload=False)}
+    if found != set(sample_ids):
+        problems.append(f"{len(set(sample_ids) - found)} of {len(sample_ids)} sampled ids missing")
+
+    expected = set(ids)
+    for query in SMOKE_QUERIES:
+        points = search(client, collection, query, k)
+        if len(points) < min(k, len(ids)) or any(str(p.id) not in expected for p in points):
+            problems.append(f"smoke query {query!r} returned {len(points)} points, some unknown")
+
+    ground_truth = load_ground_truth(TRAIN_CSV)
+    sample = dict(random.sample(sorted(ground_truth.items()), min(sample_size, len(ground_truth))))
+    recall = recall_at_k(client, collection, sample, k)
+    live = live_collection(client)
+    live_recall = None
+    if live and live != collection:
+        try:
+            live_recall = recall_at_k(client, live, sample, k)
+        except Exception as e:
+            print(f"Could not score the live collection {live}, not comparing: {e}")
+    print(f"Recall@{k} on {len(sample)} train queries: {recall:.3f}"
+          + ("" if live_recall is None else f" (live {live}: {live_recall:.3f})"))
+    if live_recall is not None and recall < live_recall - RECALL_TOLERANCE:
+        problems.append(f"Recall@{k} {recall:.3f} below live {live_recall:.3f}")
+    return problems
+
+
+def switch_alias(client: QdrantClient, collection: str):
+    """Point the serving alias at ``collection`` in one atomic operation."""
+    live = live_collection(client)
+    operations = []
+    if live == COLLECTION_NAME:
+        # One-time migration: a collection can't be replaced by an alias of
+        # the same name, so queries fail until the alias is created below.
+        print(f"Deleting pre-alias collection {COLLECTION_NAME} to create the alias")
+        client.delete_collection(COLLECTION_NAME)
+    elif live is not None:
+        operations.append(models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=COLLECTION_NAME)))
+    operations.append(models.CreateAliasOperation(
+        create_alias=models.CreateAlias(collection_name=collection, alias_name=COLLECTION_NAME)))
+    client.update_collection_aliases(change_aliases_operations=operations)
+    print(f"Alias {COLLECTION_NAME} -> {collection} (was {live})")
+
+
+def prune(client: QdrantClient, keep: int = KEEP_INDEX_VERSIONS):
+    """Delete all but the newest ``keep`` versioned collections (never the live one)."""
+    live = live_collection(client)
+    names = versioned_collections(client)
+    for name in names[:max(len(names) - keep, 0)]:
+        if name != live:
+            client.delete_collection(name)
+            print(f"Deleted old collection {name}")
+
+
+def rollback(client: QdrantClient) -> str:
+    """Serve the newest versioned collection older than the live one."""
+    live = live_collection(client)
+    names = versioned_collections(client)
+    older = names[:names.index(live)] if live in names else []
+    if not older:
+        raise SystemExit(f"No collection older than {live} to roll back to")
+    switch_alias(client, older[-1])
+    return older[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--list", action="store_true", help="list versioned collections and the live one")
+    action.add_argument("--rollback", action="store_true", help="switch the alias to the previous version")
+    action.add_argument("--switch", metavar="COLLECTION", help="switch the alias to this collection")
+    args = parser.parse_args()
+
+    client = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
+    if args.rollback:
+        rollback(client)
+    elif args.switch:
+        switch_alias(client, args.switch)
+    live = live_collection(client)
+    for name in versioned_collections(client):
+        count = client.count(collection_name=name, exact=True).count
+        print(f"{'*' if name == live else ' '} {name} ({count} points)")
+
+
+if __name__ == "__main__":
+    main()
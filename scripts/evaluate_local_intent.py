@@ -0,0 +1,123 @@
+"""Agreement between the local intent model and the LLM on train-set queries.
+
+Every train query is held out in turn: the local model is fitted on all other
+cached LLM enrichments (the enrichment cache, filled with
+``python -m scripts.warm_enrichment_cache``), then asked to enrich the held-out
+query. For a sweep of confidence thresholds it reports how often the LLM would
+still be called, the LLM latency saved, and how well the local answers agree
+with the LLM's on the fields the pipeline uses.
+
+Usage:
+    python -m scripts.evaluate_local_intent
+    python -m scripts.evaluate_local_intent --thresholds 0.6 0.8 0.9 --call-llm
+"""
+import argparse
+import csv
+import json
+import time
+
+from app.core.cache import normalize_query
+from app.core.llm_client import LLM_MODEL
+from app.services.enrichment_cache import enrichment_cache, enrichment_key
+from app.services.intent_enrichment import enrich_with_llm, prompt_template
+from app.services.intent_service import parse_intent
+from app.services.local_intent import LocalIntentModel, _canonical_term
+
+TRAIN_CSV = "data/train_set.csv"
+
+
+def load_queries(path: str) -> list[str]:
+    with open(path, "r", encoding="cp1252") as f:
+        return list(dict.fromkeys(row["Query"].strip() for row in csv.DictReader(f)))
+
+
+def llm_labels(queries: list[str], call_llm: bool) -> dict:
+    labels = {}
+    for query in queries:
+        intent = parse_intent(query)
+        key = enrichment_key(query, intent, prompt_template(), LLM_MODEL)
+        if not enrichment_cache.contains(key) and call_llm:
+            enrich_with_llm(intent, query, use_local=False)
+        data = enrichment_cache.get(key)
+        if data is not None:
+            labels[query] = data
+    return labels
+
+
+def canonical_set(terms) -> set:
+    return {_canonical_term(t) for t in terms or []}
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def agreement(local: dict, llm: dict) -> dict:
+    local_importance = {_canonical_term(k): v for k, v in (local.get("keyword_importance") or {}).items()}
+    llm_importance = {_canonical_term(k): v for k, v in (llm.get("keyword_importance") or {}).items()}
+    shared = local_importance.keys() & llm_importance.keys()
+    return {
+        "core_jaccard": jaccard(canonical_set(local.get("core_technical_skills")),
+                                canonical_set(llm.get("core_technical_skills"))),
+        "seniority": float(local.get("seniority") == llm.get("seniority")),
+        "role_type": float(local.get("role_type") == llm.get("role_type")),
+        "keyword_importance": (sum(local_importance[k] == llm_importance[k] for k in shared) / len(shared)
+                               if shared else 1.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.5, 0.6, 0.7, 0.8, 0.9])
+    parser.add_argument("--call-llm", action="store_true", help="enrich train queries missing from the cache")
+    args = parser.parse_args()
+
+    if not enrichment_cache.enabled:
+        raise SystemExit("ENRICHMENT_CACHE_PATH is empty; the local model learns from the enrichment cache")
+
+    queries = load_queries(TRAIN_CSV)
+    labels = llm_labels(queries, args.call_llm)
+    examples = enrichment_cache.examples()
+    if not labels or not examples:
+        raise SystemExit("No cached LLM enrichments for the train queries; run scripts.warm_enrichment_cache first")
+
+    vectors = LocalIntentModel.embed([q for q, _ in examples])
+    query_vectors = dict(zip(labels, LocalIntentModel.embed(list(labels))))
+    avg_llm_ms = enrichment_cache.stats()["avg_llm_latency_ms"]
+
+    predictions = []
+    predict_ms = []
+    for query, llm in labels.items():
+        model = LocalIntentModel()
+        held_out = normalize_query(query)
+        for (example, data), vector in zip(examples, vectors):
+            if example != held_out:
+                model.add(example, data, vector)
+        start = time.perf_counter()
+        local, confidence = model.predict(query, parse_intent(query), query_vectors[query])
+        predict_ms.append((time.perf_counter() - start) * 1000)
+        predictions.append((confidence, agreement(local, llm) if local else None))
+
+    report = {
+        "queries": len(predictions),
+        "training_examples": len(examples),
+        "avg_llm_latency_ms": avg_llm_ms,
+        "avg_local_predict_ms": round(sum(predict_ms) / len(predict_ms), 2),
+        "thresholds": [],
+    }
+    for threshold in args.thresholds:
+        answered = [a for c, a in predictions if a is not None and c >= threshold]
+        row = {
+            "threshold": threshold,
+            "llm_call_rate": round(1 - len(answered) / len(predictions), 3),
+            "latency_saved_ms_per_query": round(len(answered) * avg_llm_ms / len(predictions), 1),
+        }
+        for field in ("core_jaccard", "seniority", "role_type", "keyword_importance"):
+            row[f"agreement_{field}"] = (round(sum(a[field] for a in answered) / len(answered), 3)
+                                         if answered else None)
+        report["thresholds"].append(row)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
 import csv
 import json
-import time
+import os
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from scripts.full_pipeline import run_pipeline
 from urllib.parse import urlparse, unquote
 import re
@@ -10,6 +11,9 @@ TRAIN_CSV = "data\\train_set.csv"
 top_k = 50  
 PREDICTIONS_OUT = "eval_predictions_50.csv"
 METRICS_OUT = "eval_metrics_50.json"
+# Queries in flight at once; the provider rate limiters in app.core.rate_limit
+# keep the LLM and reranker calls inside quota.
+EVAL_CONCURRENCY = int(os.getenv("EVAL_CONCURRENCY", "4"))
 
 def normalize_url(url: str) -> str:
     if not url:
@@ -64,8 +68,9 @@ def evaluate():
     recalls = []
     per_query_metrics = []
     predictions = []
-    for query, relevant in ground_truth.items():
-        results = run_pipeline(query, top_k=50, final_k=top_k)
+    with ThreadPoolExecutor(max_workers=EVAL_CONCURRENCY) as pool:
+        all_results = pool.map(lambda q: run_pipeline(q, top_k=50, final_k=top_k), ground_truth)
+    for (query, relevant), results in zip(ground_truth.items(), all_results):
         predicted_urls = [normalize_url(r.get("url") or "") for r in results]
 
         hits = set()
@@ -93,8 +98,6 @@ def evaluate():
                 "predicted_url": url,
                 "hit": _url_in_relevant(url, relevant)
             })
-        
-        time.sleep(30)
 
 
     mean_recall = sum(recalls) / len(recalls)
@@ -1,9 +1,39 @@
-from app.retrieval.qdrant_search import hybrid_search, sparse_search
-from app.reranking.reranking_zerank import zerank_rerank
+import json
+import asyncio
+import logging
+from dataclasses import asdict, replace
+from concurrent.futures import ThreadPoolExecutor
+from app.core.container import container
+from app.core.deadline import (
+    Deadline, DEGRADED_RERANK_DEPTH, ENRICH_RESERVE, RERANK_FULL_DEPTH,
+    RETRIEVAL_RESERVE, SELECT_RESERVE,
+)
+from app.core.metrics import observe_candidates
+from app.core.timing import StageTimer
+from app.retrieval.qdrant_search import (
+    build_qdrant_filter_from_intent, embed_dense_chunks, embed_sparse, query_dense, query_sparse,
+    query_dense_async, query_sparse_async, rrf_fuse,
+    embed_sparse_batch, hybrid_search_batch_async,
+)
+from app.reranking.reranker import rerank, rerank_async
 from app.services.intent_service import parse_intent
+from app.services.query_chunking import compact_query
 from app.services.selection_service import select_assessments, duration_ok
-from app.services.intent_enrichment import enrich_with_llm
+from app.services.candidate_depth import (
+    DEPTH_EXPANSIONS, RETRIEVAL_DEPTH, deepen_reason, next_depth, start_depth,
+)
+from app.services.intent_enrichment import enrich_with_llm, enrich_with_llm_async
 
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="pipeline")
+
+# Cap on simultaneous LLM / reranker calls issued by one batch request.
+BATCH_CONCURRENCY = 16
+
+# Dependencies the async pipelines use synchronously on the event loop
+# (parse_intent, to_candidates); built off the loop before first use.
+LOOP_DEPENDENCIES = ("skill_matcher", "catalog_store")
 
 queries = [
     "Java developer",
@@ -18,32 +48,18 @@ def has_core_technical_signal(candidate, core_skills):
     return any(skill in text for skill in core_skills)
 
 
-def run_pipeline(query:str,top_k:int=40,final_k:int=10):
-    print("=" * 80)
-    print("QUERY:")
-    print(query)
-    print()
-    intent = parse_intent(query)
-    print("INITIAL PARSED INTENT:")
-    print(intent)
-    intent = enrich_with_llm(intent,query)
-    print("PARSED INTENT:")
-    print(intent)
-    print()
-
-    candidates = hybrid_search(query,intent, top_k=top_k)
-    if not candidates:
-        candidates = sparse_search(query, intent, top_k=top_k)
+def filter_core_candidates(candidates, intent):
     if intent.needs_technical and intent.core_technical_skills:
         pre_core_candidates = list(candidates)
         candidates = [c for c in candidates if has_core_technical_signal(c, intent.core_technical_skills)]
         if not candidates:
             candidates = pre_core_candidates
+    return candidates
 
-    if candidates:
-        for c in candidates[:10]:
-            name = c.get('name') or ''
 
+def build_rerank_query(query, intent):
+    # Long JDs are cut down to the requirements before they reach the reranker.
+    query = compact_query(query, intent)
     rerank_query = query
     if intent.core_technical_skills:
         rerank_query = (
@@ -51,29 +67,361 @@ def run_pipeline(query:str,top_k:int=40,final_k:int=10):
             f"Core technical requirement: "
             f"{', '.join(intent.core_technical_skills)}"
         )
+    return rerank_query
+
+
+def rank_by_fusion(candidates):
+    # Stand-in for reranker scores when the reranker is skipped: the fused RRF
+    # score, scaled to 0-1 so select_assessments' bonuses keep their weight.
+    top = max((c.get("score") or 0.0 for c in candidates), default=0.0) or 1.0
+    for c in candidates:
+        c["rerank_score"] = (c.get("score") or 0.0) / top
+    return candidates
+
+
+async def rerank_within_deadline(query, intent, candidates, deadline):
+    if deadline.remaining_share() < RERANK_FULL_DEPTH and len(candidates) > DEGRADED_RERANK_DEPTH:
+        deadline.degrade("rerank_depth")
+        candidates = candidates[:DEGRADED_RERANK_DEPTH]
+    observe_candidates("rerank", candidates)
+    reranked = await deadline.run(
+        "rerank",
+        rerank_async(build_rerank_query(query, intent), candidates),
+        reserve=SELECT_RESERVE,
+    )
+    if reranked is None:
+        return rank_by_fusion(candidates)
+    return reranked
 
-    candidates = zerank_rerank(rerank_query, candidates)
 
+def log_query(query):
+    logger.debug("QUERY:\n%s", query)
+
+
+def log_reranked(candidates):
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     for c in candidates[:5]:
-        print(
-            f"- {c['name']} | {c['test_type']} | "
-            f"{c['duration']} min | score={c.get('rerank_score', 0):.3f}"
+        logger.debug(
+            "- %s | %s | %s min | score=%.3f",
+            c['name'], c['test_type'], c['duration'], c.get('rerank_score') or 0,
         )
 
-    final = select_assessments(
-        candidates=candidates,
-        intent=intent,
-        k=final_k
-    )
-    print("FINAL RECOMMENDATIONS:")
+
+def log_final(final):
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    logger.debug("FINAL RECOMMENDATIONS:")
     for i, c in enumerate(final, 1):
-        print(
-            f"{i}. {c['name']} | {c['test_type']} | "
-            f"{c['duration']} min\n   {c['url']}"
+        logger.debug("%d. %s | %s | %s min\n   %s", i, c['name'], c['test_type'], c['duration'], c['url'])
+
+
+# Dense retrieval only needs the deterministic parse (for its payload
+# filter), so both pipelines start it before the LLM enrichment and only the
+# sparse half and fusion wait on it.
+def retrieve_dense(query, intent, top_k, timer):
+    with timer.stage("dense_embed"):
+        dense_vectors = embed_dense_chunks([query])[0]
+    with timer.stage("dense_query"):
+        candidates = query_dense(dense_vectors, top_k, build_qdrant_filter_from_intent(intent))
+    observe_candidates("dense_query", candidates)
+    return candidates
+
+
+def retrieve_sparse(query, intent, top_k, timer):
+    with timer.stage("sparse_embed"):
+        sparse_vector = embed_sparse(query, intent)
+    with timer.stage("sparse_query"):
+        candidates = query_sparse(sparse_vector, top_k, build_qdrant_filter_from_intent(intent))
+    observe_candidates("sparse_query", candidates)
+    return candidates
+
+
+async def retrieve_dense_async(query, intent, top_k, timer):
+    with timer.stage("dense_embed"):
+        dense_vectors = (await asyncio.to_thread(embed_dense_chunks, [query]))[0]
+    with timer.stage("dense_query"):
+        candidates = await query_dense_async(dense_vectors, top_k, build_qdrant_filter_from_intent(intent))
+    observe_candidates("dense_query", candidates)
+    return candidates
+
+
+async def retrieve_sparse_async(query, intent, top_k, timer):
+    with timer.stage("sparse_embed"):
+        sparse_vector = await asyncio.to_thread(embed_sparse, query, intent)
+    with timer.stage("sparse_query"):
+        candidates = await query_sparse_async(sparse_vector, top_k, build_qdrant_filter_from_intent(intent))
+    observe_candidates("sparse_query", candidates)
+    return candidates
+
+
+# Adaptive depth (app/services/candidate_depth.py): legs start shallow and
+# are re-queried deeper while deepen_reason says the rerank pool is not
+# enough. The query embeddings are cached, so a deeper round is only the
+# Qdrant queries.
+def retrieve_deeper(query, parsed_intent, intent, depth):
+    dense = query_dense(embed_dense_chunks([query])[0], depth, build_qdrant_filter_from_intent(parsed_intent))
+    sparse = query_sparse(embed_sparse(query, intent), depth, build_qdrant_filter_from_intent(intent))
+    return dense, sparse
+
+
+async def retrieve_deeper_async(query, parsed_intent, intent, depth):
+    dense_vectors, sparse_vector = await asyncio.gather(
+        asyncio.to_thread(embed_dense_chunks, [query]),
+        asyncio.to_thread(embed_sparse, query, intent),
+    )
+    return await asyncio.gather(
+        query_dense_async(dense_vectors[0], depth, build_qdrant_filter_from_intent(parsed_intent)),
+        query_sparse_async(sparse_vector, depth, build_qdrant_filter_from_intent(intent)),
+    )
+
+
+def fuse_and_filter(dense_candidates, sparse_candidates, intent, depth, timer):
+    with timer.stage("fusion"):
+        fused = rrf_fuse([dense_candidates, sparse_candidates], top_k=depth)
+    with timer.stage("core_filter"):
+        return fused, filter_core_candidates(fused, intent)
+
+
+def should_deepen(candidates, dense_candidates, sparse_candidates, intent, final_k, depth, top_k):
+    if depth >= top_k:
+        return None
+    reason = deepen_reason(candidates, [dense_candidates, sparse_candidates], intent, final_k, depth, dense_candidates)
+    if reason is not None:
+        DEPTH_EXPANSIONS.inc(reason=reason)
+    return reason
+
+
+def run_pipeline(query:str,top_k:int=40,final_k:int=10,timer:StageTimer|None=None):
+    timer = timer or StageTimer()
+    log_query(query)
+    with timer.stage("parse_intent"):
+        intent = parse_intent(query)
+    logger.debug("INITIAL PARSED INTENT: %s", intent)
+    depth = start_depth(top_k)
+    parsed_intent = replace(intent)
+    dense_future = _executor.submit(retrieve_dense, query, parsed_intent, depth, timer)
+    with timer.stage("enrich_with_llm"):
+        intent = enrich_with_llm(intent,query)
+    logger.debug("PARSED INTENT: %s", intent)
+
+    sparse_candidates = retrieve_sparse(query, intent, depth, timer)
+    dense_candidates = dense_future.result()
+    fused, candidates = fuse_and_filter(dense_candidates, sparse_candidates, intent, depth, timer)
+    while should_deepen(candidates, dense_candidates, sparse_candidates, intent, final_k, depth, top_k):
+        depth = next_depth(depth, top_k)
+        with timer.stage("deepen"):
+            dense_candidates, sparse_candidates = retrieve_deeper(query, parsed_intent, intent, depth)
+        fused, candidates = fuse_and_filter(dense_candidates, sparse_candidates, intent, depth, timer)
+    RETRIEVAL_DEPTH.observe(depth)
+    observe_candidates("fusion", fused)
+    observe_candidates("core_filter", candidates)
+
+    observe_candidates("rerank", candidates)
+    with timer.stage("rerank"):
+        candidates = rerank(build_rerank_query(query, intent), candidates)
+    log_reranked(candidates)
+
+    with timer.stage("select_assessments"):
+        final = select_assessments(
+            candidates=candidates,
+            intent=intent,
+            k=final_k
         )
+    observe_candidates("select_assessments", final)
+    log_final(final)
 
     return final
+
+
+async def stream_pipeline_async(query:str,top_k:int=40,final_k:int=10,timer:StageTimer|None=None,deadline:Deadline|None=None):
+    """Async generator over the pipeline's intermediate states.
+
+    Yields ``(event, data)`` pairs as soon as each one is available:
+    ``intent`` and ``enriched_intent`` carry a snapshot of the Intent as a dict,
+    ``provisional`` (dense-only, ready while the LLM is still running),
+    ``retrieved``, ``reranked`` and ``final`` carry candidate lists. Stages
+    that would overrun ``deadline`` are skipped and listed in
+    ``deadline.degraded``.
+    """
+    timer = timer or StageTimer()
+    deadline = deadline or Deadline(None)
+    log_query(query)
+    await container.prepare(*LOOP_DEPENDENCIES)
+    with timer.stage("parse_intent"):
+        intent = parse_intent(query)
+    # enrich_with_llm updates the intent in place; the dense leg keeps a copy
+    # of the parse it started from.
+    depth = start_depth(top_k)
+    parsed_intent = replace(intent)
+    dense_task = asyncio.create_task(retrieve_dense_async(query, parsed_intent, depth, timer))
+    enrich_task = None
+    try:
+        yield "intent", asdict(intent)
+
+        async def enrich():
+            with timer.stage("enrich_with_llm"):
+                return await enrich_with_llm_async(intent, query)
+
+        enrich_task = asyncio.create_task(enrich())
+
+        dense_candidates = await deadline.run("dense_query", dense_task, reserve=ENRICH_RESERVE, default=[])
+        timer.mark("first_result")
+        yield "provisional", dense_candidates[:final_k]
+
+        intent = await deadline.run("enrich_with_llm", enrich_task, reserve=ENRICH_RESERVE, default=intent)
+        logger.debug("PARSED INTENT: %s", intent)
+        yield "enriched_intent", asdict(intent)
+
+        sparse_candidates = await deadline.run(
+            "sparse_query",
+            retrieve_sparse_async(query, intent, depth, timer),
+            reserve=RETRIEVAL_RESERVE,
+            default=[],
+        )
+    finally:
+        dense_task.cancel()
+        if enrich_task is not None:
+            enrich_task.cancel()
+    fused, candidates = fuse_and_filter(dense_candidates, sparse_candidates, intent, depth, timer)
+    while should_deepen(candidates, dense_candidates, sparse_candidates, intent, final_k, depth, top_k):
+        with timer.stage("deepen"):
+            deeper = await deadline.run(
+                "deepen",
+                retrieve_deeper_async(query, parsed_intent, intent, next_depth(depth, top_k)),
+                reserve=RETRIEVAL_RESERVE,
+            )
+        if deeper is None:
+            break
+        depth = next_depth(depth, top_k)
+        dense_candidates, sparse_candidates = deeper
+        fused, candidates = fuse_and_filter(dense_candidates, sparse_candidates, intent, depth, timer)
+    RETRIEVAL_DEPTH.observe(depth)
+    observe_candidates("fusion", fused)
+    observe_candidates("core_filter", candidates)
+    yield "retrieved", candidates[:final_k]
+
+    with timer.stage("rerank"):
+        candidates = await rerank_within_deadline(query, intent, candidates, deadline)
+    log_reranked(candidates)
+    yield "reranked", candidates[:final_k]
+
+    with timer.stage("select_assessments"):
+        final = select_assessments(
+            candidates=candidates,
+            intent=intent,
+            k=final_k
+        )
+    observe_candidates("select_assessments", final)
+    log_final(final)
+    yield "final", final
+
+
+async def run_pipeline_async(query:str,top_k:int=40,final_k:int=10,timer:StageTimer|None=None,deadline:Deadline|None=None):
+    final = []
+    async for event, data in stream_pipeline_async(query, top_k=top_k, final_k=final_k, timer=timer, deadline=deadline):
+        if event == "final":
+            final = data
+    return final
+
+
+async def run_pipeline_batch_async(queries:list[str],top_k:int=40,final_k:int=10,timer:StageTimer|None=None,deadline:Deadline|None=None):
+    timer = timer or StageTimer(pipeline="batch")
+    deadline = deadline or Deadline(None)
+    sem = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def enrich(intent, query):
+        async with sem:
+            return await deadline.run(
+                "enrich_with_llm",
+                enrich_with_llm_async(intent, query),
+                reserve=ENRICH_RESERVE,
+                default=intent,
+            )
+
+    async def rerank(query, intent, candidates):
+        async with sem:
+            return await rerank_within_deadline(query, intent, candidates, deadline)
+
+    async def embed_dense_all():
+        with timer.stage("dense_embed"):
+            return await asyncio.to_thread(embed_dense_chunks, queries)
+
+    await container.prepare(*LOOP_DEPENDENCIES)
+    dense_task = asyncio.create_task(embed_dense_all())
+    try:
+        with timer.stage("parse_intent"):
+            intents = [parse_intent(q) for q in queries]
+        with timer.stage("enrich_with_llm"):
+            intents = await asyncio.gather(*[enrich(i, q) for i, q in zip(intents, queries)])
+        with timer.stage("sparse_embed"):
+            sparse_vectors = await asyncio.to_thread(embed_sparse_batch, queries, intents)
+        dense_vectors = await dense_task
+    finally:
+        dense_task.cancel()
+
+    depth = start_depth(top_k)
+    filters = [build_qdrant_filter_from_intent(i) for i in intents]
+    with timer.stage("qdrant_query"):
+        fetched = await deadline.run(
+            "qdrant_query",
+            hybrid_search_batch_async(dense_vectors, sparse_vectors, top_k=depth, filters=filters),
+            reserve=RETRIEVAL_RESERVE,
+            default=[[] for _ in queries],
+        )
+    with timer.stage("core_filter"):
+        batch_candidates = [filter_core_candidates(c, i) for c, i in zip(fetched, intents)]
+
+    # The batch is fused server-side, so only the pool size decides; the
+    # queries that need it are re-sent together at the next depth.
+    depths = [depth] * len(queries)
+
+    def needs_deeper(i):
+        if depths[i] >= top_k:
+            return False
+        reason = deepen_reason(batch_candidates[i], [fetched[i]], intents[i], final_k, depths[i])
+        if reason is not None:
+            DEPTH_EXPANSIONS.inc(reason=reason)
+        return reason is not None
+
+    pending = [i for i in range(len(queries)) if needs_deeper(i)]
+    while pending:
+        depth = next_depth(depth, top_k)
+        with timer.stage("deepen"):
+            deeper = await deadline.run(
+                "deepen",
+                hybrid_search_batch_async(
+                    [dense_vectors[i] for i in pending], [sparse_vectors[i] for i in pending], top_k=depth,
+                    filters=[filters[i] for i in pending],
+                ),
+                reserve=RETRIEVAL_RESERVE,
+            )
+        if deeper is None:
+            break
+        for i, candidates in zip(pending, deeper):
+            depths[i] = depth
+            fetched[i] = candidates
+            batch_candidates[i] = filter_core_candidates(candidates, intents[i])
+        pending = [i for i in pending if needs_deeper(i)]
+    for query_depth, candidates in zip(depths, batch_candidates):
+        RETRIEVAL_DEPTH.observe(query_depth)
+        observe_candidates("core_filter", candidates)
+    with timer.stage("rerank"):
+        batch_candidates = await asyncio.gather(*[
+            rerank(q, i, c) for q, i, c in zip(queries, intents, batch_candidates)
+        ])
+    with timer.stage("select_assessments"):
+        finals = [
+            select_assessments(candidates=c, intent=i, k=final_k)
+            for c, i in zip(batch_candidates, intents)
+        ]
+    for final in finals:
+        observe_candidates("select_assessments", final)
+    return finals
+
+
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
     query = (
         """
 KEY RESPONSIBITILES:
@@ -112,4 +460,6 @@ People management
 Suggest me some tests for the above jd. The duration should be at most 90 mins
         """
     )
-    run_pipeline(query)
\ No newline at end of file
+    timer = StageTimer()
+    run_pipeline(query, timer=timer)
+    print(json.dumps(timer.report(), indent=2))
\ No newline at end of file
@@ -0,0 +1,84 @@
+"""Import-time and cold-start budget for the API.
+
+Runs ``python -X importtime -c "import app.main"`` in a fresh interpreter and
+charges each third-party package its cumulative import cost at the point where
+our code imports it. With --warm it then builds every lazily registered
+client/model and prints the container's per-dependency import and build time.
+
+Usage:
+    python -m scripts.import_budget
+    python -m scripts.import_budget --warm
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+OWN_PACKAGES = {"app", "scripts"}
+
+
+def import_budget(module: str) -> tuple[dict, float]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(proc.stderr)
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        m = LINE.match(line)
+        if m:
+            _, cumulative, indent, name = m.groups()
+            entries.append(((len(indent) - 1) // 2, name, int(cumulative)))
+
+    # -X importtime prints children before their parent; walking it backwards
+    # gives each module's parent, so a third-party package is charged once, at
+    # the point where our own code (or the interpreter) first imports it.
+    per_package = defaultdict(float)
+    total_us = 0
+    parents = {}
+    for depth, name, cumulative in reversed(entries):
+        parents[depth] = name
+        package = name.split(".")[0]
+        parent = parents.get(depth - 1) if depth > 0 else None
+        parent_package = parent.split(".")[0] if parent else None
+        if depth == 0:
+            total_us += cumulative
+        if package in OWN_PACKAGES:
+            continue
+        if parent_package is None or parent_package in OWN_PACKAGES:
+            per_package[package] += cumulative
+    return per_package, total_us / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--warm", action="store_true", help="also build every registered dependency")
+    args = parser.parse_args()
+
+    per_package, total_ms = import_budget(args.module)
+    print(f"import {args.module}: {total_ms:.1f} ms")
+    for name, us in sorted(per_package.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+        print(f"  {name:<30} {us / 1000:>9.1f} ms")
+
+    if args.warm:
+        __import__(args.module)
+        from app.core.container import container
+
+        start = time.perf_counter()
+        container.warm_up()
+        print(f"\nwarm-up: {(time.perf_counter() - start) * 1000:.1f} ms")
+        print(json.dumps(container.report(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Identical /recommend requests with different budgets sharing one run.
+
+The pipeline is replaced by one that only spends ENRICH_SECONDS in a
+deadline-bound enrichment stage, so the checks run offline and in well under
+a second.
+
+Usage:
+    python -m scripts.test_result_cache
+"""
+import asyncio
+import time
+
+from app import main
+from app.core.cache import ResultCache
+from app.core.deadline import ENRICH_RESERVE
+
+ENRICH_SECONDS = 0.3
+
+
+async def fake_pipeline(query, top_k, final_k, timer, deadline):
+    await deadline.run("enrich_with_llm", asyncio.sleep(ENRICH_SECONDS), reserve=ENRICH_RESERVE)
+    return []
+
+
+async def fake_index_version():
+    return "v1"
+
+
+async def recommend_pair(first_budget_ms: int, second_budget_ms: int):
+    """Start a request, join it with an identical one, and time both."""
+    main.result_cache = ResultCache()
+    main.run_pipeline_async = fake_pipeline
+    main.get_index_version_async = fake_index_version
+
+    async def timed(budget_ms):
+        start = time.perf_counter()
+        response = await main.recommend(main.RecommendRequest(query="Java developer", budget_ms=budget_ms))
+        return response, time.perf_counter() - start
+
+    first = asyncio.create_task(timed(first_budget_ms))
+    await asyncio.sleep(0.01)
+    second = await timed(second_budget_ms)
+    return await first, second
+
+
+def test_follower_waits_within_its_own_budget():
+    (leader, _), (follower, elapsed) = asyncio.run(recommend_pair(10_000, 200))
+    assert leader["degraded_stages"] == []
+    assert follower["degraded_stages"] == ["enrich_with_llm"]
+    assert elapsed < 0.25, elapsed
+    assert main.result_cache.fallbacks == 1
+
+
+def test_follower_reruns_a_result_degraded_under_a_smaller_budget():
+    (leader, _), (follower, _) = asyncio.run(recommend_pair(200, 10_000))
+    assert leader["degraded_stages"] == ["enrich_with_llm"]
+    assert follower["degraded_stages"] == []
+    assert main.result_cache.fallbacks == 1
+
+
+def test_follower_shares_a_full_result():
+    (leader, _), (follower, _) = asyncio.run(recommend_pair(10_000, 5_000))
+    assert leader["degraded_stages"] == follower["degraded_stages"] == []
+    assert main.result_cache.coalesced == 1
+    assert main.result_cache.fallbacks == 0
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"ok  {name}")
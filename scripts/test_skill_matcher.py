@@ -0,0 +1,31 @@
+"""Ambiguous plain-English words must not be matched as technical skills.
+
+Each case is a query and the technical skills the matcher may return for it;
+the qualified forms show the same skills are still found when spelled out.
+
+Usage:
+    python -m scripts.test_skill_matcher
+"""
+from app.services.skill_vocabulary import build_matcher
+
+AMBIGUOUS_CASES = {
+    "Need someone who can react quickly to customer complaints": [],
+    "Excel at communication with stakeholders": [],
+    "Needs access to the office on weekdays": [],
+    "A go getter with a spring in their step": [],
+    "C programming and MS Excel": ["c programming", "ms excel"],
+    "React.js front-end engineer": ["reactjs"],
+    "react js and Node.js": ["reactjs", "node.js"],
+}
+
+
+def test_ambiguous_terms_need_a_qualified_form():
+    matcher = build_matcher()
+    for query, expected in AMBIGUOUS_CASES.items():
+        technical, _ = matcher.match(query)
+        assert technical == expected, (query, technical)
+
+
+if __name__ == "__main__":
+    test_ambiguous_terms_need_a_qualified_form()
+    print("ok  test_ambiguous_terms_need_a_qualified_form")
@@ -1,93 +1,421 @@
+"""Embed the cleaned catalog and (re)build the search indexes.
+
+Uploads the points to a new versioned Qdrant collection, verifies it and
+switches the serving alias to it (see scripts/blue_green.py), and writes the same vectors and
+payloads as the embedded index artifact (RETRIEVAL_BACKEND=embedded), so both
+backends serve the same index version.
+
+Documents stream through the dense and sparse models in batches (in worker
+processes with --parallel) and each batch is upserted while the next one is
+embedded, with at most UPLOAD_QUEUE_DEPTH batches in flight. Throughput and
+peak RSS are printed at the end; --dry-run --scale N rehearses a larger catalog.
+
+Point ids are derived from the assessment URL and every payload carries a hash
+of the rendered search text and of the payload itself. --sync compares those
+with the live collection (and the existing artifact) and only re-embeds new or
+changed documents, overwrites payload-only changes and deletes removed ones,
+in place on the collection the alias serves.
+
+Usage:
+    python -m scripts.upload_to_qdrant
+    python -m scripts.upload_to_qdrant --sync
+    python -m scripts.upload_to_qdrant --embedded-only
+    python -m scripts.upload_to_qdrant --quantization scalar
+    python -m scripts.upload_to_qdrant --parallel 0 --batch-size 256
+    python -m scripts.upload_to_qdrant --dry-run --scale 40000 --parallel 0
+"""
+import argparse
+import hashlib
 import json
 import os
-from typing import List
+import resource
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Iterator, List
+import numpy as np
 from qdrant_client import QdrantClient,models
 from qdrant_client.models import PointStruct, SparseVector
 from fastembed import TextEmbedding, SparseTextEmbedding
 from dotenv import load_dotenv
+from app.retrieval.catalog_store import CATALOG_PATH, build_payload, catalog_fingerprint, point_ids
+from app.retrieval.embedded_index import QUANTIZATIONS, EmbeddedIndex, write_index
+from scripts.blue_green import live_collection, prune, switch_alias, verify_collection, versioned_name
 load_dotenv()
 
 QDRANT_URL = os.getenv("QDRANT_URL")
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
-COLLECTION_NAME = "shl_assessments"
-
-client = QdrantClient(
-    url=QDRANT_URL,
-    api_key=QDRANT_API_KEY
-)
-
-print(f"Collection Created: {COLLECTION_NAME}")
-client.recreate_collection(
-    collection_name = COLLECTION_NAME,
-    vectors_config = {
-        "dense": models.VectorParams(
-            size=384,
-            distance = models.Distance.COSINE
-        )
-    },
-    sparse_vectors_config={
-        "sparse":models.SparseVectorParams(
-            index=models.SparseIndexParams(
-                on_disk=False
-            )
-        )
-    }
-)
+INDEX_VERSION_KEY = "index_version"
+EMBEDDED_INDEX_PATH = os.getenv("EMBEDDED_INDEX_PATH", "data/embedded_index")
+DENSE_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+SPARSE_MODEL_NAME = "Qdrant/bm25"
+# none, scalar (int8) or binary; see DENSE_OVERSAMPLING / DENSE_RESCORE in qdrant_search.
+DENSE_QUANTIZATION = os.getenv("DENSE_QUANTIZATION", "none")
+DENSE_DIM = 384
+BATCH_SIZE = 64
+UPLOAD_QUEUE_DEPTH = 4
+# Below this many documents, starting model worker processes costs more than it saves.
+PARALLEL_MIN_DOCS = 2000
+HASH_FIELDS = ["text_hash", "payload_hash"]
+SCROLL_PAGE = 1000
+PAYLOAD_INDEXES = {
+    "assessment_duration": models.PayloadSchemaType.INTEGER,
+    "test_type": models.PayloadSchemaType.KEYWORD,
+    "job_levels": models.PayloadSchemaType.KEYWORD,
+}
 
 
+def quantization_config(quantization: str):
+    if quantization == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    if quantization == "binary":
+        return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True))
+    return None
 
-with open("data/catalog_cleaned.json", "r", encoding="utf-8") as f:
-    data = json.load(f)
 
-print(f"Loaded {len(data)} records from catalog_cleaned.json")
+def create_collection(client: QdrantClient, collection: str, quantization: str = DENSE_QUANTIZATION):
+    client.create_collection(
+        collection_name = collection,
+        vectors_config = {
+            "dense": models.VectorParams(
+                size=DENSE_DIM,
+                distance = models.Distance.COSINE,
+                # Quantized codes stay in RAM; the float vectors are only
+                # read to rescore, so they can live on disk.
+                on_disk = quantization != "none",
+                quantization_config = quantization_config(quantization)
+            )
+        },
+        sparse_vectors_config={
+            "sparse":models.SparseVectorParams(
+                index=models.SparseIndexParams(
+                    on_disk=False
+                )
+            )
+        }
+    )
+    # Indexes for the fields build_qdrant_filter_from_intent filters on, so
+    # filtered prefetches are resolved from the index instead of a payload scan.
+    for field, schema in PAYLOAD_INDEXES.items():
+        client.create_payload_index(collection_name=collection, field_name=field, field_schema=schema)
+    print(f"Collection Created: {collection} (dense quantization: {quantization})")
 
-dense_model = TextEmbedding("sentence-transformers/all-MiniLM-L6-v2")
-sparse_model = SparseTextEmbedding("Qdrant/bm25")
 
-documents :List[str] = []
-for item in data:
+def build_document(item: dict) -> str:
     name = item.get("name", "")
     level = item.get("job_levels","")
     t_type = ", ".join(item.get("test_type",[]))
     desc = item.get("description","")
+    return f"Title: {name}. Job Levels: {level}. Test Types: {t_type}. Description: {desc}"
+
 
-    search_text = f"Title: {name}. Job Levels: {level}. Test Types: {t_type}. Description: {desc}"
-    documents.append(search_text)
-
-print("Generating embeddings...")
-dense_embeddings = list(dense_model.embed(documents))
-sparse_embeddings = list(sparse_model.embed(documents))
-
-points = []
-
-for idx,item in enumerate(data):
-    dense_vec = dense_embeddings[idx]
-    sparse_vec = sparse_embeddings[idx]
-    payload = {
-        "name": item.get("name"),
-        "url": item.get("url"),
-        "description": item.get("description"),
-        "assessment_duration": item.get("assessment_duration",0),
-        "test_type": item.get("test_type",[]),
-        "job_levels": item.get("job_levels",""),
-        "remote_testing": item.get("remote_testing","Yes")
+def build_documents(data: list) -> List[str]:
+    return [build_document(item) for item in data]
+
+
+def embed_batches(data: list, dense_model, sparse_model, batch_size: int, parallel) -> Iterator[tuple]:
+    """Yield (start, dense, sparse) per batch of ``data``.
+
+    Both models read the documents lazily; with ``parallel`` each runs its own
+    pool of worker processes, so dense and sparse batches are computed
+    concurrently and ahead of the consumer.
+    """
+    dense = dense_model.embed((build_document(item) for item in data), batch_size=batch_size, parallel=parallel)
+    sparse = sparse_model.embed((build_document(item) for item in data), batch_size=batch_size, parallel=parallel)
+    for start in range(0, len(data), batch_size):
+        count = min(batch_size, len(data) - start)
+        yield start, list(islice(dense, count)), list(islice(sparse, count))
+
+
+def content_hashes(document: str, payload: dict) -> dict:
+    # The model names are part of the text hash, so switching models re-embeds.
+    text = f"{DENSE_MODEL_NAME}\0{SPARSE_MODEL_NAME}\0{document}"
+    return {
+        "text_hash": hashlib.sha256(text.encode("utf-8")).hexdigest()[:16],
+        "payload_hash": hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()[:16],
     }
-    points.append(PointStruct(
-        id=idx,
-        vector = {
-            "dense": dense_vec,
-            "sparse": SparseVector(
-                indices = sparse_vec.indices.tolist(),
-                values = sparse_vec.values.tolist()
-            )
-        },
-        payload = payload
-    ))
 
-client.upload_points(
-    collection_name=COLLECTION_NAME,
-    points=points,
-    batch_size=64
-)
 
-print("Uploaded")
\ No newline at end of file
+def build_payloads(data: list) -> List[dict]:
+    payloads = []
+    for item in data:
+        payload = build_payload(item)
+        payloads.append({**payload, **content_hashes(build_document(item), payload)})
+    return payloads
+
+
+def qdrant_hashes(client: QdrantClient, collection: str) -> tuple[dict, dict]:
+    """Hash fields per point, keyed like point_ids, and the point ids as
+    Qdrant returned them (the ones to send back in updates and deletes)."""
+    hashes, native_ids, offset = {}, {}, None
+    while True:
+        points, offset = client.scroll(collection_name=collection, limit=SCROLL_PAGE, offset=offset,
+                                       with_payload=HASH_FIELDS, with_vectors=False)
+        for p in points:
+            hashes[str(p.id)] = p.payload or {}
+            native_ids[str(p.id)] = p.id
+        if offset is None:
+            return hashes, native_ids
+
+
+def has_uuid_ids(native_ids: dict) -> bool:
+    """False for collections from before URL-derived ids (positional integers)."""
+    try:
+        for pid in native_ids.values():
+            if isinstance(pid, int):
+                return False
+            uuid.UUID(str(pid))
+    except ValueError:
+        return False
+    return True
+
+
+def artifact_hashes(index: EmbeddedIndex) -> dict:
+    return {str(i): {f: p.get(f) for f in HASH_FIELDS} for i, p in zip(index.ids, index.payloads)}
+
+
+def diff(ids: list, payloads: list, existing: dict) -> dict:
+    """Split the catalog into new / changed (text) / payload_only / unchanged ids against ``existing`` hashes."""
+    changes = {"new": [], "changed": [], "payload_only": [], "unchanged": []}
+    for pid, payload in zip(ids, payloads):
+        old = existing.get(pid)
+        if old is None:
+            kind = "new"
+        elif old.get("text_hash") != payload["text_hash"]:
+            kind = "changed"
+        elif old.get("payload_hash") != payload["payload_hash"]:
+            kind = "payload_only"
+        else:
+            kind = "unchanged"
+        changes[kind].append(pid)
+    changes["removed"] = sorted(set(existing) - set(ids))
+    return changes
+
+
+def has_changes(changes: dict) -> bool:
+    return any(changes[kind] for kind in ("new", "changed", "payload_only", "removed"))
+
+
+def describe(changes: dict) -> str:
+    return ", ".join(f"{len(changes[kind])} {kind.replace('_', ' ')}"
+                     for kind in ("new", "changed", "payload_only", "removed", "unchanged"))
+
+
+def build_points(ids: list, dense: list, sparse: list, payloads: list) -> List[PointStruct]:
+    return [
+        PointStruct(
+            id=idx,
+            vector = {
+                "dense": dense_vec.tolist(),
+                "sparse": SparseVector(
+                    indices = sparse_vec.indices.tolist(),
+                    values = sparse_vec.values.tolist()
+                )
+            },
+            payload = payload
+        )
+        for idx, dense_vec, sparse_vec, payload in zip(ids, dense, sparse, payloads)
+    ]
+
+
+def peak_rss_mb() -> tuple[float, float]:
+    # ru_maxrss is in KiB on Linux; RUSAGE_CHILDREN is the largest finished worker.
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--embedded-only", action="store_true",
+                        help="only write the embedded index artifact, leave the Qdrant collection alone")
+    parser.add_argument("--quantization", choices=QUANTIZATIONS, default=DENSE_QUANTIZATION,
+                        help="dense vector quantization for both backends (default DENSE_QUANTIZATION)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--parallel", type=int, default=None,
+                        help="embedding worker processes per model, 0 for all cores "
+                             f"(default: all cores from {PARALLEL_MIN_DOCS} documents, else in process)")
+    parser.add_argument("--sync", action="store_true",
+                        help="update the existing collection and artifact in place with only what changed")
+    parser.add_argument("--skip-verify", action="store_true", help="switch the alias without verifying the build")
+    parser.add_argument("--dry-run", action="store_true", help="embed only: no upload, no artifact")
+    parser.add_argument("--scale", type=int, default=None,
+                        help="with --dry-run, repeat the catalog to this many documents")
+    args = parser.parse_args()
+    if args.scale and not args.dry_run:
+        parser.error("--scale only makes sense with --dry-run")
+
+    with open(CATALOG_PATH, "rb") as f:
+        raw = f.read()
+    data = json.loads(raw)
+    print(f"Loaded {len(data)} records from catalog_cleaned.json")
+    if args.scale:
+        data = [{**data[i % len(data)], "url": f"{data[i % len(data)]['url']}#{i}"} for i in range(args.scale)]
+    parallel = args.parallel
+    if parallel is None and len(data) >= PARALLEL_MIN_DOCS:
+        parallel = 0
+
+    sync_start = time.perf_counter()
+    payloads = build_payloads(data)
+    # Same ids and fingerprint the API's catalog store derives, so it can
+    # hydrate id-only results from this version.
+    ids = point_ids(data)
+    fingerprint = catalog_fingerprint(raw)
+    index_version = f"{fingerprint}-{int(time.time())}"
+
+    client = None
+    collection = None
+    qdrant_changes = None
+    current_version = None
+    if not args.embedded_only and not args.dry_run:
+        client = QdrantClient(
+            url=QDRANT_URL,
+            api_key=QDRANT_API_KEY
+        )
+        collection = live_collection(client) if args.sync else None
+        native_ids = {}
+        if collection is not None:
+            existing, native_ids = qdrant_hashes(client, collection)
+            if not has_uuid_ids(native_ids):
+                # Its ids can't be matched (or deleted) by URL-derived id:
+                # rebuild into a new version and switch the alias instead.
+                print(f"{collection} predates URL-derived point ids; doing a full build instead of a sync")
+                collection = None
+        if collection is not None:
+            qdrant_changes = diff(ids, payloads, existing)
+            metadata = client.get_collection(collection).config.metadata or {}
+            current_version = metadata.get(INDEX_VERSION_KEY)
+            print(f"Qdrant ({collection}): {describe(qdrant_changes)}")
+        else:
+            # A full build goes to a fresh collection; the live one keeps
+            # serving until the alias is switched.
+            collection = versioned_name(index_version)
+            create_collection(client, collection, args.quantization)
+
+    old_index = None
+    artifact_changes = None
+    if args.sync and not args.dry_run and os.path.exists(os.path.join(EMBEDDED_INDEX_PATH, "meta.json")):
+        old_index = EmbeddedIndex(EMBEDDED_INDEX_PATH)
+        artifact_changes = diff(ids, payloads, artifact_hashes(old_index))
+        if client is None:
+            current_version = old_index.metadata.get(INDEX_VERSION_KEY)
+        print(f"Embedded index: {describe(artifact_changes)}")
+
+    # Vectors of documents whose text did not change are reused from the old artifact.
+    reusable = {}
+    if artifact_changes is not None:
+        old_rows = {str(pid): row for row, pid in enumerate(old_index.ids)}
+        reusable = {pid: old_rows[pid] for pid in artifact_changes["unchanged"] + artifact_changes["payload_only"]}
+    upload_ids = set(ids) if qdrant_changes is None else set(qdrant_changes["new"] + qdrant_changes["changed"])
+    if client is None:
+        upload_ids = set()
+    to_embed = [row for row, pid in enumerate(ids)
+                if args.dry_run or pid in upload_ids or pid not in reusable]
+
+    up_to_date = (
+        args.sync
+        and not to_embed
+        and not any(has_changes(c) for c in (qdrant_changes, artifact_changes) if c is not None)
+        and (current_version or "").split("-", 1)[0] == fingerprint
+    )
+    if up_to_date:
+        print(f"Already up to date (index version {current_version}) in {time.perf_counter() - sync_start:.1f}s")
+        return
+
+    # The artifact holds every vector anyway; filling preallocated arrays keeps
+    # that the only full copy.
+    dense_matrix = np.empty((0 if args.dry_run else len(data), DENSE_DIM), dtype=np.float32)
+    sparse_rows = [None] * (0 if args.dry_run else len(data))
+    if not args.dry_run and reusable:
+        old_sparse = old_index.sparse_rows()
+        for row, pid in enumerate(ids):
+            if pid in reusable:
+                dense_matrix[row] = old_index.dense[reusable[pid]]
+                sparse_rows[row] = old_sparse[reusable[pid]]
+
+    start_time = time.perf_counter()
+    if to_embed:
+        print(f"Embedding {len(to_embed)} documents (batch size {args.batch_size}, parallel {parallel})...")
+        dense_model = TextEmbedding(DENSE_MODEL_NAME)
+        sparse_model = SparseTextEmbedding(SPARSE_MODEL_NAME)
+        batches = embed_batches([data[row] for row in to_embed], dense_model, sparse_model, args.batch_size, parallel)
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=1) as uploader:
+            for start, dense, sparse in batches:
+                rows = to_embed[start:start + len(dense)]
+                upload = [i for i, row in enumerate(rows) if ids[row] in upload_ids]
+                if upload:
+                    if len(pending) >= UPLOAD_QUEUE_DEPTH:
+                        pending.popleft().result()
+                    points = build_points([ids[rows[i]] for i in upload], [dense[i] for i in upload],
+                                          [sparse[i] for i in upload], [payloads[rows[i]] for i in upload])
+                    pending.append(uploader.submit(
+                        client.upsert, collection_name=collection, points=points, wait=True))
+                if not args.dry_run:
+                    dense_matrix[rows] = dense
+                    for row, e in zip(rows, sparse):
+                        sparse_rows[row] = (e.indices.astype(np.int32), e.values.astype(np.float32))
+                done = start + len(dense)
+                elapsed = time.perf_counter() - start_time
+                print(f"  {done}/{len(to_embed)} documents, {done / elapsed:.1f} docs/s", end="\r")
+            for future in pending:
+                future.result()
+        elapsed = time.perf_counter() - start_time
+        main_rss, worker_rss = peak_rss_mb()
+        print(f"\nEmbedded {len(to_embed)} documents and uploaded {len(upload_ids)} in {elapsed:.1f}s "
+              f"({len(to_embed) / elapsed:.1f} docs/s); peak RSS {main_rss:.0f} MB"
+              + (f", largest worker {worker_rss:.0f} MB" if parallel is not None else ""))
+    if args.dry_run:
+        return
+
+    if client is not None:
+        if qdrant_changes is not None:
+            payload_by_id = dict(zip(ids, payloads))
+            if qdrant_changes["payload_only"]:
+                client.batch_update_points(
+                    collection_name=collection,
+                    update_operations=[
+                        models.OverwritePayloadOperation(
+                            overwrite_payload=models.SetPayload(payload=payload_by_id[pid], points=[native_ids[pid]]))
+                        for pid in qdrant_changes["payload_only"]
+                    ],
+                    wait=True,
+                )
+            if qdrant_changes["removed"]:
+                client.delete(collection_name=collection,
+                              points_selector=models.PointIdsList(
+                                  points=[native_ids[pid] for pid in qdrant_changes["removed"]]),
+                              wait=True)
+        # Stamped only after the upload completes so API result caches switch over to
+        # the new version (and drop entries built from the old one) once it is whole.
+        client.update_collection(
+            collection_name=collection,
+            metadata={INDEX_VERSION_KEY: index_version}
+        )
+        print(f"Uploaded to {collection} (index version {index_version})")
+        if qdrant_changes is None:
+            problems = [] if args.skip_verify else verify_collection(client, collection, ids)
+            if problems:
+                client.delete_collection(collection)
+                raise SystemExit(f"Not switching to {collection}, deleted it: " + "; ".join(problems))
+            switch_alias(client, collection)
+            prune(client)
+
+    write_index(
+        EMBEDDED_INDEX_PATH,
+        ids,
+        dense_matrix,
+        sparse_rows,
+        payloads,
+        {INDEX_VERSION_KEY: index_version, "dense_model": DENSE_MODEL_NAME, "sparse_model": SPARSE_MODEL_NAME},
+        quantization=args.quantization,
+    )
+    print(f"Wrote embedded index to {EMBEDDED_INDEX_PATH} (index version {index_version})")
+    if args.sync:
+        print(f"Synced in {time.perf_counter() - sync_start:.1f}s")
+
+if __name__ == "__main__":
+    main()
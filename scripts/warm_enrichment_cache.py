@@ -0,0 +1,71 @@
+"""Pre-warm the persistent LLM enrichment cache and report its hit rate.
+
+Runs parse_intent + enrich_with_llm (LLM only, the local intent model is
+skipped) for every query in the train/test CSVs, so those queries are served
+from the cache afterwards. With --report it only
+prints the cache's lifetime stats.
+
+Usage:
+    python -m scripts.warm_enrichment_cache
+    python -m scripts.warm_enrichment_cache --report
+"""
+import argparse
+import csv
+import json
+import time
+
+from app.core.llm_client import LLM_MODEL
+from app.services.enrichment_cache import enrichment_cache, enrichment_key
+from app.services.intent_enrichment import enrich_with_llm, prompt_template
+from app.services.intent_service import parse_intent
+
+QUERY_FILES = ["data/train_set.csv", "data/test_set.csv"]
+
+
+def load_queries() -> list[str]:
+    queries = []
+    for path in QUERY_FILES:
+        with open(path, "r", encoding="cp1252") as f:
+            for row in csv.DictReader(f):
+                q = row["Query"].strip()
+                if q not in queries:
+                    queries.append(q)
+    return queries
+
+
+def warm():
+    queries = load_queries()
+    cached = failed = 0
+    for i, query in enumerate(queries, 1):
+        intent = parse_intent(query)
+        key = enrichment_key(query, intent, prompt_template(), LLM_MODEL)
+        if enrichment_cache.contains(key):
+            cached += 1
+            print(f"[{i}/{len(queries)}] cached")
+            continue
+
+        start = time.perf_counter()
+        enrich_with_llm(intent, query, use_local=False)
+        if not enrichment_cache.contains(key):
+            failed += 1
+            print(f"[{i}/{len(queries)}] failed after {time.perf_counter() - start:.1f}s")
+            continue
+        print(f"[{i}/{len(queries)}] enriched in {time.perf_counter() - start:.1f}s")
+
+    print(f"{cached}/{len(queries)} queries were already cached, {failed} could not be enriched")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--report", action="store_true", help="only print cache stats")
+    args = parser.parse_args()
+
+    if not enrichment_cache.enabled:
+        raise SystemExit("ENRICHMENT_CACHE_PATH is empty; the enrichment cache is disabled")
+    if not args.report:
+        warm()
+    print(json.dumps(enrichment_cache.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()